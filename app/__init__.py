@@ -4,20 +4,38 @@ from flask_migrate import Migrate
 from authlib.integrations.flask_client import OAuth
 import os
 from dotenv import load_dotenv
+from app.tokens import GoogleKeySet, TokenCache
+from app.sessions import SessionStore
+from app.audit import AuditSink
+from app.events import EventHub
+from app.storage import BlobStore
+from app.scheduler import Scheduler
+from app.uploads import UploadRequest
+from app.replicas import ReplicaRouter, RoutingSession
+from app import database
 
 # Load environment variables FIRST
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 oauth = OAuth()
+google_keys = GoogleKeySet()
+token_cache = TokenCache()
+session_store = SessionStore()
+audit_sink = AuditSink()
+event_hub = EventHub()
+blob_store = BlobStore()
+scheduler = Scheduler()
+replica_router = ReplicaRouter()
 
 def create_app(config_class=None):
     """Application factory"""
     from config import Config
     
     app = Flask(__name__)
+    app.request_class = UploadRequest
     
     # Load configuration
     if config_class is None:
@@ -28,9 +46,21 @@ def create_app(config_class=None):
     config_class.init_app(app)
     
     # Initialize extensions with app
+    database.init_app(app)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            database.tune_engine(engine, app.config)
     migrate.init_app(app, db)
     oauth.init_app(app)
+    google_keys.init_app(app)
+    token_cache.init_app(app)
+    session_store.init_app(app)
+    audit_sink.init_app(app)
+    event_hub.init_app(app)
+    blob_store.init_app(app)
+    scheduler.init_app(app)
+    replica_router.init_app(app)
     
     # Register OAuth
     if app.config.get('GOOGLE_CLIENT_ID') and app.config.get('GOOGLE_CLIENT_SECRET'):
@@ -54,6 +84,33 @@ def create_app(config_class=None):
     app.register_blueprint(auth_blueprint)
     app.register_blueprint(lost_and_found_blueprint)
     
+    from app.assets import assets as assets_blueprint
+    app.register_blueprint(assets_blueprint)
+    
+    # Register CLI commands
+    from app.lost_and_found.search import search_cli
+    app.cli.add_command(search_cli)
+    from app.lost_and_found.image_jobs import images_cli
+    app.cli.add_command(images_cli)
+    from app.lost_and_found.notification_sync import notifications_cli
+    from app.lost_and_found import retention  # adds `flask notifications prune`
+    app.cli.add_command(notifications_cli)
+    from app.lost_and_found.claim_expiry import claims_cli, expire_claims
+    app.cli.add_command(claims_cli)
+    
+    # Scheduled jobs (see app/scheduler.py)
+    scheduler.add_job('expire_claims', app.config.get('CLAIM_EXPIRY_INTERVAL', 300), expire_claims)
+    scheduler.add_job('prune_notifications', app.config.get('NOTIFICATION_PRUNE_INTERVAL', 0), retention.prune)
+    if replica_router.binds:
+        heartbeat_interval = app.config.get('REPLICA_HEARTBEAT_INTERVAL', 5)
+        scheduler.add_job('replica_heartbeat', heartbeat_interval, replica_router.beat)
+        if not heartbeat_interval or not (scheduler.enabled or app.config.get('SCHEDULER_EXTERNAL')):
+            # Without heartbeats replica lag is unknown and every read stays on the primary
+            app.logger.warning(
+                "REPLICA_URLS is set but nothing writes the replica heartbeat: set SCHEDULER_ENABLED=true, "
+                "or run `flask scheduler run` and set SCHEDULER_EXTERNAL=true (REPLICA_HEARTBEAT_INTERVAL must not be 0)"
+            )
+    
     # Security headers
     @app.after_request
     def add_security_headers(response):
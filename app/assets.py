@@ -0,0 +1,67 @@
+# app/assets.py
+"""
+Serving of uploaded image renditions.
+
+Renditions are stored by the content hash of their upload (see app/storage.py),
+so their URLs never change meaning:
+
+    /assets/<sha256>_<rendition>.<ext>
+
+They are served with `Cache-Control: immutable` and a strong ETag, and answer
+conditional requests with 304. With ASSET_SENDFILE set, the response only
+carries a header telling the front proxy which file to send:
+
+    x-accel   - nginx; X-Accel-Redirect: ASSET_ACCEL_PREFIX/ab/cd/<file>
+                (an `internal` location aliased to UPLOAD_FOLDER)
+    x-sendfile - Apache mod_xsendfile / lighttpd; X-Sendfile: <absolute path>
+"""
+import os
+import re
+
+from flask import Blueprint, abort, current_app, request, send_file
+
+from app import blob_store
+
+assets = Blueprint('assets', __name__)
+
+ASSET_NAME = re.compile(r'^(?P<hash>[0-9a-f]{64})_(?P<rendition>[a-z]+)\.(?P<ext>webp|jpg)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+MIMETYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+
+def asset_url(path):
+    """Public URL of a rendition stored in the blob layout, or None"""
+    match = ASSET_NAME.match(os.path.basename(path))
+    if not match or os.path.dirname(path) != os.path.dirname(blob_store.rendition_stem(match['hash'])):
+        return None
+    return f"/assets/{match.group(0)}"
+
+
+@assets.route('/assets/<filename>')
+def serve(filename):
+    match = ASSET_NAME.match(filename)
+    if not match:
+        abort(404)
+
+    path = os.path.join(os.path.dirname(blob_store.rendition_stem(match['hash'])), filename)
+    if not os.path.isfile(path):
+        abort(404)
+
+    etag = filename.rsplit('.', 1)[0]
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        mode = current_app.config.get('ASSET_SENDFILE')
+        if mode == 'x-accel':
+            response = current_app.response_class(mimetype=MIMETYPES[match['ext']])
+            relative = os.path.relpath(path, blob_store.public_root).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = f"{current_app.config['ASSET_ACCEL_PREFIX'].rstrip('/')}/{relative}"
+        elif mode == 'x-sendfile':
+            response = current_app.response_class(mimetype=MIMETYPES[match['ext']])
+            response.headers['X-Sendfile'] = path
+        else:
+            response = send_file(path, mimetype=MIMETYPES[match['ext']], etag=False, conditional=False)
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = IMMUTABLE
+    return response
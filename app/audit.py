@@ -0,0 +1,168 @@
+# app/audit.py
+"""
+Buffered audit log writer.
+
+Audit rows used to be added and committed inline by every audited action,
+doubling the commits on hot paths such as login. `AuditSink` keeps records in
+an in-memory queue instead and a background thread bulk-inserts them once
+AUDIT_BATCH_SIZE records are waiting or AUDIT_FLUSH_INTERVAL seconds have
+passed. The queue is flushed when the worker exits.
+
+Records that belong to a caller's transaction (`record(..., session=...)`) are
+held on that session and only queued once it commits; a rollback drops them.
+
+Set AUDIT_SYNC to write every record immediately (tests, one-off scripts).
+"""
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import discard_on_rollback
+from app.threads import ProcessThread
+
+PENDING_KEY = 'audit_pending'
+
+
+class AuditSink:
+    """In-memory audit queue, bulk-inserted by a background thread"""
+
+    def __init__(self, app=None):
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = ProcessThread(self._run, 'audit-sink')
+        self._stopping = False
+        self.app = None
+        self.sync = False
+        self.batch_size = 100
+        self.flush_interval = 2.0
+        self.max_queue = 10000
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.sync = app.config.get('AUDIT_SYNC', self.sync)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', self.flush_interval)
+        self.max_queue = app.config.get('AUDIT_QUEUE_SIZE', self.max_queue)
+        atexit.register(self.shutdown)
+        app.extensions['audit_sink'] = self
+
+    # ---------- Recording ---------- #
+
+    def record(self, performed_by, table_name, record_id, action, changes=None, session=None):
+        """Queue one audit row; with `session` it waits for that session to commit"""
+        row = {
+            'performed_by': performed_by,
+            'table_name': table_name,
+            'record_id': record_id,
+            'action': action,
+            'changes': changes,
+            'performed_at': datetime.utcnow(),
+        }
+        if session is not None:
+            session.info.setdefault(PENDING_KEY, []).append(row)
+        else:
+            self.enqueue([row])
+
+    def enqueue(self, rows):
+        if not rows:
+            return
+        if self.sync:
+            self._write(rows)
+            return
+
+        with self._lock:
+            room = self.max_queue - len(self._queue)
+            if len(rows) > room:
+                self.dropped += len(rows) - max(room, 0)
+                rows = rows[:max(room, 0)]
+            self._queue.extend(rows)
+            if len(self._queue) >= self.batch_size:
+                self._wakeup.notify()
+        self._thread.ensure(before_start=self._resume)
+
+    # ---------- Flushing ---------- #
+
+    def _resume(self):
+        with self._lock:
+            self._stopping = False
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if len(self._queue) < self.batch_size and not self._stopping:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopping and not self._queue:
+                    return
+            self.flush()
+
+    def _take_batch(self):
+        with self._lock:
+            count = min(len(self._queue), self.batch_size)
+            return [self._queue.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows written."""
+        written = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return written
+            if self._write(batch):
+                written += len(batch)
+
+    def _write(self, rows):
+        from app import db
+        from app.auth.models import AuditLog
+
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(AuditLog.__table__.insert(), rows)
+        except Exception:
+            self.failed_batches += 1
+            self.dropped += len(rows)
+            if self.app is not None:
+                self.app.logger.exception("Failed to write %d audit record(s)", len(rows))
+            return False
+        self.written += len(rows)
+        return True
+
+    def shutdown(self):
+        """Flush the queue and stop the writer thread (worker exit)"""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        self._thread.join(timeout=10)
+        if self.app is not None:
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            queued = len(self._queue)
+        return {
+            'queued': queued,
+            'max_queue': self.max_queue,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed_batches': self.failed_batches,
+        }
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_committed(session):
+    from app import audit_sink
+
+    audit_sink.enqueue(session.info.pop(PENDING_KEY, None))
+
+
+discard_on_rollback(PENDING_KEY)
@@ -1,4 +1,4 @@
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app import db
 
 class User(db.Model):
@@ -70,8 +70,9 @@ class User(db.Model):
     def __repr__(self):
         return f"<User id={self.id} name={self.name!r}>"
 
-    def to_dict(self):
-        base = {
+    def to_session_dict(self):
+        """Lightweight projection handed to views by login_required (no collection loads)"""
+        return {
             'id': self.id,
             'name': self.name,
             'profile_pic': self.profile_pic,
@@ -80,12 +81,30 @@ class User(db.Model):
             'google_id': self.google_id,
             'is_active': self.is_active,
             'last_login_at': self.last_login_at.isoformat() if self.last_login_at else None,
-            # Stats
-            'items_reported_count': len(self.items_reported) if self.items_reported else 0,
-            'items_found_count': len(self.items_found) if self.items_found else 0,
-            'notifications_count': len(self.notifications) if self.notifications else 0,
-            'pending_claims_count': len([c for c in self.claims_received if c.status == 'pending']) if self.claims_received else 0,
         }
+
+    @staticmethod
+    def get_stats(user_id):
+        """Activity counters for a user, computed in a single aggregate query"""
+        from app.lost_and_found.models import Item, Notification, Claim
+
+        def count_where(*criteria):
+            return select(func.count()).where(*criteria).scalar_subquery()
+
+        stmt = select(
+            count_where(Item.reporter_id == user_id).label('items_reported_count'),
+            count_where(Item.found_by_id == user_id).label('items_found_count'),
+            count_where(Item.claimed_by_id == user_id).label('items_claimed'),
+            count_where(Item.reporter_id == user_id, Item.claimed_by_id.is_(None)).label('active_items'),
+            count_where(Notification.user_id == user_id).label('notifications_count'),
+            count_where(Claim.reporter_id == user_id, Claim.status == 'pending').label('pending_claims_count'),
+        )
+        return dict(db.session.execute(stmt).one()._mapping)
+
+    def to_dict(self):
+        base = self.to_session_dict()
+        # Stats
+        base.update(User.get_stats(self.id))
         return base
     
 
@@ -113,4 +132,22 @@ class AuditLog(db.Model):
             'performed_at': self.performed_at.isoformat() if self.performed_at else None,
             'changes': self.changes,
             'performer_name': self.user.name if self.user else 'System'
-        }
\ No newline at end of file
+        }
+
+
+class SchedulerLease(db.Model):
+    """Who may run a scheduled job until when (see app/scheduler.py)"""
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(100), primary_key=True)
+    holder = db.Column(db.String(255), nullable=False)
+    acquired_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+
+class ReplicaHeartbeat(db.Model):
+    """Last heartbeat written on the primary; replicas lag by how far behind their copy is (see app/replicas.py)"""
+    __tablename__ = 'replica_heartbeats'
+
+    name = db.Column(db.String(50), primary_key=True)
+    beat_at = db.Column(db.DateTime(timezone=True), nullable=False)
@@ -1,5 +1,6 @@
 from flask import redirect, url_for, flash, make_response, request, render_template, current_app
-from app import db, oauth
+from app import db, oauth, google_keys, session_store, token_cache
+from app.tokens import InvalidTokenError
 from .models import User
 from authlib.integrations.base_client.errors import AuthlibBaseError
 import os
@@ -14,7 +15,7 @@ import requests
 @auth.route('/login', methods=['GET', 'POST'])
 def login():
     # If user is already logged in, redirect them
-    if request.cookies.get('id_token'):
+    if session_store.load(request.cookies.get(session_store.cookie_name)):
         flash("Already logged in", "info")
         return redirect(url_for("lost_and_found.lost_and_found_page"))
     
@@ -53,6 +54,18 @@ def callback():
             flash("Failed to retrieve token/profile", "danger")
             return redirect(url_for('auth.login'))
 
+        # Verify the id_token once here; the session replaces it afterwards
+        try:
+            token_data = google_keys.verify(id_token)
+        except InvalidTokenError:
+            current_app.logger.warning("id_token failed verification in /callback")
+            flash("Authentication failed. Please try again.", "danger")
+            return redirect(url_for('auth.login'))
+        if token_data['sub'] != profile.get('sub'):
+            current_app.logger.warning("id_token subject does not match userinfo in /callback")
+            flash("Authentication failed. Please try again.", "danger")
+            return redirect(url_for('auth.login'))
+
         # Enforce email domain
         """domain = os.getenv('LAGH_UNI_DOMAIN')
         if not profile.get('email') or not domain:
@@ -107,13 +120,16 @@ def callback():
 
         # Process User info and create a response
         try:
+            session_id = session_store.create({'sub': profile['sub'], 'user_id': user.id})
             response = make_response(redirect(url_for("lost_and_found.lost_and_found_page")))
             # set cookie (httponly+secure may break local dev on http, but preserving your settings)
-            response.set_cookie("id_token", id_token, httponly=True, secure=True, samesite="Lax")
+            session_store.set_cookie(response, session_id)
+            # Drop the raw id_token cookie older logins used to carry
+            response.set_cookie("id_token", "", expires=0)
             flash("Logged in successfully", "success")
             return response
         except Exception:
-            current_app.logger.exception("Failed while setting cookie/creating response in callback")
+            current_app.logger.exception("Failed while creating session/response in callback")
             flash("An internal error occurred. Please try again later.", "danger")
             return redirect(url_for('auth.login'))
 
@@ -136,7 +152,10 @@ def callback():
 def logout(user):
     try:
         response = make_response(redirect(url_for("main.index")))
-        response.set_cookie("id_token", "", expires=0)
+        session_id = request.cookies.get(session_store.cookie_name, '')
+        session_store.destroy(session_id)
+        token_cache.invalidate(session_id)
+        session_store.clear_cookie(response)
         flash("Logged out successfully", "success")
         log_action(user['id'], 'users', user['id'], 'logout', changes=f"User {user['email']} logged out.")
         current_app.logger.info("User %s logged out", user['email'])
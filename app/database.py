@@ -0,0 +1,107 @@
+# app/database.py
+"""
+Database engine settings.
+
+`init_app` fills in SQLALCHEMY_ENGINE_OPTIONS before Flask-SQLAlchemy creates
+the engine (options already set in the config win):
+
+- the pool is sized from the gunicorn layout: each worker gets GUNICORN_THREADS
+  connections, but all workers together stay within DB_MAX_CONNECTIONS;
+- connections are pre-pinged and recycled after DB_POOL_RECYCLE seconds, so a
+  database restart or an idle timeout doesn't surface as a failed request;
+- on PostgreSQL every connection gets a `statement_timeout` of
+  DB_STATEMENT_TIMEOUT ms, so a runaway query fails the request instead of
+  outliving the gunicorn timeout.
+
+Read replicas (REPLICA_URLS, see replicas.py) are added as binds with the
+same options.
+
+`tune_engine` sets the SQLite pragmas on each new connection: WAL (readers no
+longer block the writer), synchronous=NORMAL, a busy timeout instead of
+immediate "database is locked" errors, and memory-mapped reads.
+
+`discard_on_rollback` is for the modules that park work in `session.info`
+until the transaction commits (audit rows, stream events, reference changes).
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.replicas import replica_binds
+
+
+def _is_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def pool_size(config):
+    """Connections per worker: one per thread, within the shared connection budget"""
+    if config.get('DB_POOL_SIZE'):
+        return config['DB_POOL_SIZE']
+    workers = max(1, config.get('GUNICORN_WORKERS', 4))
+    threads = max(1, config.get('GUNICORN_THREADS', 32))
+    return max(1, min(threads, config.get('DB_MAX_CONNECTIONS', 90) // workers))
+
+
+def engine_options(config, url=None):
+    url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+    options = {'pool_pre_ping': True}
+    if _is_memory(url):
+        # Flask-SQLAlchemy uses a single static connection here
+        return options
+
+    options.update({
+        'pool_size': pool_size(config),
+        'max_overflow': config.get('DB_POOL_OVERFLOW', 0),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+    })
+    timeout = config.get('DB_STATEMENT_TIMEOUT', 0)
+    if url.get_backend_name() == 'postgresql' and timeout:
+        options['connect_args'] = {'options': f"-c statement_timeout={int(timeout)}"}
+    return options
+
+
+def init_app(app):
+    """Set the engine options and replica binds; call before db.init_app"""
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for bind, url in replica_binds(app.config).items():
+        binds.setdefault(bind, {'url': url, **engine_options(app.config, url)})
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def tune_engine(engine, config):
+    """Set the SQLite pragmas on every new connection of `engine`"""
+    if engine.dialect.name != 'sqlite' or _is_memory(engine.url):
+        return
+
+    pragmas = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={int(config.get('DB_SQLITE_BUSY_TIMEOUT', 5000))}",
+        f"PRAGMA mmap_size={int(config.get('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def discard_on_rollback(key):
+    """Drop `session.info[key]` when a session's transaction rolls back"""
+    @event.listens_for(Session, 'after_soft_rollback')
+    def _discard(session, previous_transaction):
+        # A savepoint rollback (e.g. register_blob's dedupe race) leaves the
+        # outer transaction free to commit, so only the outermost one counts
+        if not previous_transaction.nested and previous_transaction.parent is None:
+            session.info.pop(key, None)
+    return _discard
@@ -1,54 +1,58 @@
 # app/decorators.py
 from flask import request, redirect, url_for, flash, make_response, current_app
 from functools import wraps
-import requests
-import time
-import os
+from werkzeug.exceptions import HTTPException
+from app import db, session_store, token_cache
 
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        token = request.cookies.get('id_token')
+        session_id = request.cookies.get(session_store.cookie_name)
 
-        if not token:
+        if not session_id:
             flash("Please login first", "danger")
             return redirect(url_for('auth.login'))
 
         try:
-            # Verify the token using Google's public keys
-            token_info = requests.get(os.getenv("GOOGLE_TOKEN_INFO") + token)
+            # Repeat requests in the same worker skip the session backend entirely
+            cached = token_cache.get(session_id)
+            if cached:
+                # Views update the user dict they get; keep the cached one intact
+                return f(dict(cached[1]), *args, **kwargs)
 
-            if token_info.status_code != 200:
-                flash("Invalid token. Please log in again.", "danger")
+            session = session_store.load(session_id)
+
+            if not session:
+                flash("Your session has expired. Please log in again.", "danger")
                 response = make_response(redirect(url_for('auth.login')))
-                response.set_cookie("id_token", "", expires=0)
+                session_store.clear_cookie(response)
                 return response
 
-            token_data = token_info.json()
+            # The session only names the user; reload the projection so a
+            # deactivated or deleted account loses access on the next miss
+            from app.auth.models import User
 
-            # Check if token has expired
-            if int(token_data.get('exp')) < time.time():
-                flash("Token has expired. Please log in again.", "danger")
+            session_data = session['data']
+            user = db.session.get(User, session_data.get('user_id')) if session_data.get('user_id') else None
+            if user is None or not user.is_active or user.google_id != session_data.get('sub'):
+                session_store.destroy(session_id)
+                flash("Your session is no longer valid. Please log in again.", "danger")
                 response = make_response(redirect(url_for('auth.login')))
-                response.set_cookie("id_token", "", expires=0)
+                session_store.clear_cookie(response)
                 return response
 
-            # Retrieve User using Google ID from token_data
-            from app.auth.models import User    
-            user = User.query.filter_by(google_id=token_data['sub']).first()
-
-            if not user:
-                flash("Invalid token. Please log in again.", "danger")
-                Response = make_response(redirect(url_for('auth.login')))
-                Response.set_cookie("id_token", "", expires=0)
-                return Response
-            return f(user.to_dict(), *args, **kwargs)
+            user_dict = user.to_session_dict()
+            token_cache.put(session_id, session_data['sub'], user_dict, session['expires_at'])
+            return f(dict(user_dict), *args, **kwargs)
 
+        except HTTPException:
+            # Raised by the view (e.g. 413/415 while parsing an upload), not by the session
+            raise
         except Exception as e:
-            current_app.logger.exception("Error verifying token in login_required decorator: %s", e)
+            current_app.logger.exception("Error loading session in login_required decorator: %s", e)
             Response = make_response(redirect(url_for('auth.login')))
-            Response.set_cookie("id_token", "", expires=0)
+            session_store.clear_cookie(Response)
             flash("An error occurred. Please log in again.", "danger")
             return Response
 
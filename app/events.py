@@ -0,0 +1,307 @@
+# app/events.py
+"""
+Push events to open browser tabs.
+
+Every tab used to poll the notifications API every 30 seconds, so the load
+grew with open tabs rather than with activity. Tabs now hold a Server-Sent
+Events stream instead (see routes/notifications.py) and handlers publish to
+the user's channel when something changes:
+
+    event_hub.publish(user_id, 'notification', {...}, session=db.session)
+
+With a session, the event waits for that session to commit and is dropped on
+rollback, so a tab never refetches data that isn't there yet.
+
+Each worker process keeps its open streams in an in-process hub. The broker
+carries events between processes:
+
+    local    - this process only; single-process dev and tests
+    sqlite   - an append-only table in a local SQLite file that each worker
+               polls every EVENTS_POLL_INTERVAL seconds (one host)
+    postgres - LISTEN/NOTIFY on the application database (requires psycopg2)
+
+Streams hold a worker thread while open, so each worker accepts at most
+EVENTS_MAX_STREAMS of them; past that the stream is refused with 503 and the
+client falls back to polling.
+"""
+import json
+import os
+import queue
+import select
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import discard_on_rollback
+
+PENDING_KEY = 'events_pending'
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+# ---------- Brokers ---------- #
+
+class LocalBroker:
+    """Delivers straight to this process' subscribers"""
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, message):
+        if self._deliver is not None:
+            self._deliver(message)
+
+
+class SQLiteBroker:
+    def __init__(self, path, poll_interval=1.0, retention=300, logger=None):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.logger = logger
+        self._local = threading.local()
+        self._last_prune = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " message TEXT NOT NULL,"
+                " created_at REAL NOT NULL"
+                ")"
+            )
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def publish(self, message):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT INTO events (message, created_at) VALUES (?, ?)", (json.dumps(message), now))
+            if now - self._last_prune > self.retention:
+                self._last_prune = now
+                conn.execute("DELETE FROM events WHERE created_at < ?", (now - self.retention,))
+
+    def start(self, deliver):
+        last_id = self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        thread = threading.Thread(target=self._poll, args=(deliver, last_id), name='events-sqlite', daemon=True)
+        thread.start()
+
+    def _poll(self, deliver, last_id):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                rows = self._connect().execute(
+                    "SELECT id, message FROM events WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+            except sqlite3.Error:
+                if self.logger is not None:
+                    self.logger.exception("Failed to read events from %s", self.path)
+                continue
+            for event_id, raw in rows:
+                last_id = event_id
+                deliver(json.loads(raw))
+
+
+class PostgresBroker:
+    CHANNEL = 'app_events'
+
+    def __init__(self, app, logger=None):
+        self.app = app
+        self.logger = logger
+
+    def _engine(self):
+        from app import db
+
+        with self.app.app_context():
+            return db.engine
+
+    def publish(self, message):
+        from sqlalchemy import text
+
+        # NOTIFY payloads are limited to 8000 bytes; events only say what changed
+        with self._engine().begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {'channel': self.CHANNEL, 'payload': json.dumps(message)})
+
+    def start(self, deliver):
+        thread = threading.Thread(target=self._listen, args=(deliver,), name='events-postgres', daemon=True)
+        thread.start()
+
+    def _listen(self, deliver):
+        while True:
+            try:
+                # A dedicated connection, outside the pool
+                raw = self._engine().raw_connection()
+                raw.detach()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        deliver(json.loads(conn.notifies.pop(0).payload))
+            except Exception:
+                if self.logger is not None:
+                    self.logger.exception("Event listener lost its connection, reconnecting")
+                time.sleep(5)
+
+
+# ---------- Hub ---------- #
+
+class Subscription:
+    """One open stream's queue of events"""
+
+    def __init__(self, hub, channel, maxsize):
+        self.hub = hub
+        self.channel = channel
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # The client is told to refetch instead
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.hub._unsubscribe(self)
+
+
+class EventHub:
+    """Fans broker events out to the open streams of this process"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.broker = None
+        self.max_streams = 24
+        self.queue_size = 100
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._streams = 0
+        self._listener_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, broker=None):
+        self.app = app
+        self.max_streams = app.config.get('EVENTS_MAX_STREAMS', self.max_streams)
+        self.queue_size = app.config.get('EVENTS_QUEUE_SIZE', self.queue_size)
+        self.broker = broker or self._make_broker(app)
+        app.extensions['event_hub'] = self
+
+    @staticmethod
+    def _make_broker(app):
+        name = app.config.get('EVENTS_BROKER', 'sqlite')
+        if name == 'local':
+            return LocalBroker()
+        if name == 'sqlite':
+            path = app.config.get('EVENTS_SQLITE_PATH') or os.path.join(app.instance_path, 'events.db')
+            return SQLiteBroker(path, poll_interval=app.config.get('EVENTS_POLL_INTERVAL', 1.0), logger=app.logger)
+        if name == 'postgres':
+            try:
+                import psycopg2  # noqa: F401
+            except ImportError:
+                raise RuntimeError("EVENTS_BROKER=postgres requires the 'psycopg2' package")
+            return PostgresBroker(app, logger=app.logger)
+        raise ValueError(f"Unknown EVENTS_BROKER: {name}")
+
+    # ---------- Publishing ---------- #
+
+    def publish(self, user_id, event_name, data=None, session=None):
+        """Send an event to a user's open streams; with `session`, once it commits"""
+        message = {'channel': user_channel(user_id), 'event': event_name, 'data': data or {}}
+        if session is not None:
+            session.info.setdefault(PENDING_KEY, []).append(message)
+        else:
+            self.send([message])
+
+    def send(self, messages):
+        for message in messages or ():
+            try:
+                self.broker.publish(message)
+            except Exception:
+                # Clients catch up on their next reconnect or poll
+                self.app.logger.exception("Failed to publish %s event", message['event'])
+
+    # ---------- Subscribing ---------- #
+
+    def _ensure_listener(self):
+        # A worker forked from the master starts its own listener, with none
+        # of the master's subscribers
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._subscribers = {}
+            self._streams = 0
+        self.broker.start(self._deliver)
+
+    def subscribe(self, user_id):
+        """Open a subscription to a user's channel, or None when this worker is full"""
+        self._ensure_listener()
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return None
+            subscription = Subscription(self, user_channel(user_id), self.queue_size)
+            self._subscribers.setdefault(subscription.channel, set()).add(subscription)
+            self._streams += 1
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers and subscription in subscribers:
+                subscribers.discard(subscription)
+                self._streams -= 1
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def _deliver(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message.get('channel'), ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def stats(self):
+        with self._lock:
+            return {'streams': self._streams, 'max_streams': self.max_streams, 'channels': len(self._subscribers)}
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed(session):
+    from app import event_hub
+
+    event_hub.send(session.info.pop(PENDING_KEY, None))
+
+
+discard_on_rollback(PENDING_KEY)
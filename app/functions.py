@@ -1,17 +1,20 @@
 from app.constants import ALLOWED_EXTENSIONS
-from app import db
-from app.auth.models import AuditLog
+from app import db, audit_sink
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def log_action(user_id, table_name, record_id, action, changes=None):
-    log = AuditLog(
+def log_action(user_id, table_name, record_id, action, changes=None, commit=True):
+    """
+    Queue an audit row for the buffered writer (see app/audit.py).
+    With commit=False the row belongs to the caller's db.session transaction:
+    it is queued when that commits and dropped if it rolls back.
+    """
+    audit_sink.record(
         performed_by=user_id,
         table_name=table_name,
         record_id=record_id,
         action=action,
-        changes=changes
+        changes=changes,
+        session=None if commit else db.session()
     )
-    db.session.add(log)
-    db.session.commit()
@@ -0,0 +1,111 @@
+# app/lost_and_found/autocomplete.py
+"""
+In-memory autocomplete over location names and descriptions.
+
+Every word of a location's name and description is folded (see `fold`) and
+stored in one sorted list, so the locations matching a prefix are one bisect
+away. A query matches the locations where each of its words is the prefix of
+some word, in either field:
+
+    "bib cent"  -> "Bibliothèque centrale"
+    "مكتب"      -> "المكتبة المركزية"
+
+Results whose folded name starts with the whole query come first, then name
+matches, then description-only matches, each in name order.
+
+The index is part of the reference snapshot (see reference.py), so it is
+rebuilt whenever the locations change and never queries the database.
+"""
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+
+NAME, DESCRIPTION = 0, 1
+
+# Spellings used interchangeably in Arabic place names
+ARABIC_FOLDS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',  # alef variants
+    'ة': 'ه',  # ta marbuta
+    'ى': 'ي',  # alef maksura
+    'ـ': None,  # tatweel
+})
+# Letters NFKD leaves alone
+LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'ß': 'ss'})
+ARABIC_ARTICLE = 'ال'
+
+
+def fold(text):
+    """Lowercase `text` and drop accents, harakat and Arabic spelling variants"""
+    decomposed = unicodedata.normalize('NFKD', (text or '').casefold())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return stripped.translate(ARABIC_FOLDS).translate(LIGATURES)
+
+
+def tokens(text):
+    return re.findall(r'\w+', fold(text))
+
+
+def _index_words(text):
+    """Words to index for `text`; Arabic words are indexed with and without 'ال'"""
+    words = set()
+    for word in tokens(text):
+        words.add(word)
+        if word.startswith(ARABIC_ARTICLE) and len(word) > len(ARABIC_ARTICLE) + 1:
+            words.add(word[len(ARABIC_ARTICLE):])
+    return words
+
+
+class LocationIndex:
+    """Prefix index over a sequence of locations (anything with .name and .description)"""
+
+    def __init__(self, locations):
+        self.locations = tuple(locations)
+        self._names = [' '.join(tokens(location.name)) for location in self.locations]
+
+        entries = []
+        for position, location in enumerate(self.locations):
+            name_words = _index_words(location.name)
+            entries.extend((word, position, NAME) for word in name_words)
+            entries.extend(
+                (word, position, DESCRIPTION)
+                for word in _index_words(location.description) - name_words
+            )
+        entries.sort()
+        self._words = [word for word, _, _ in entries]
+        self._entries = [(position, field) for _, position, field in entries]
+
+    def _prefixed(self, prefix):
+        """{position: best field} of the locations with a word starting with `prefix`"""
+        start = bisect_left(self._words, prefix)
+        end = bisect_left(self._words, prefix + '\U0010ffff', start)
+        matched = {}
+        for position, field in self._entries[start:end]:
+            if field < matched.get(position, DESCRIPTION + 1):
+                matched[position] = field
+        return matched
+
+    def search(self, query, limit=20):
+        """Best `limit` locations for an autocomplete query"""
+        terms = tokens(query)
+        if not terms:
+            return list(self.locations[:limit])
+
+        matched = None
+        for term in terms:
+            hits = self._prefixed(term)
+            if matched is None:
+                matched = hits
+            else:
+                matched = {position: max(field, matched[position]) for position, field in hits.items() if position in matched}
+            if not matched:
+                return []
+
+        phrase = ' '.join(terms)
+
+        def rank(position):
+            if self._names[position].startswith(phrase):
+                return (-1, position)
+            return (matched[position], position)
+
+        return [self.locations[position] for position in heapq.nsmallest(limit, matched, key=rank)]
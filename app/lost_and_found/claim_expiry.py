@@ -0,0 +1,89 @@
+# app/lost_and_found/claim_expiry.py
+"""
+Expiry of unanswered claims.
+
+Claims are created with `expires_at` a week out. The sweeper moves pending
+claims past that point to the terminal 'expired' status, CLAIM_EXPIRY_BATCH
+at a time (oldest first, through `ix_claims_status_expires`), and notifies
+claimant and reporter in one batch per item.
+
+The UPDATE only touches claims that are still pending, so a claim accepted
+or cancelled while the sweeper runs keeps its status. The sweeper runs from
+the scheduler (see app/scheduler.py) or `flask claims expire`.
+"""
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select, update
+
+from app import db
+from app.lost_and_found.models import Claim, Item
+from app.lost_and_found.notifier import notify
+
+
+def _notify_expired(rows):
+    by_item = {}
+    for claim_id, item_id, item_name, claimant_id, reporter_id in rows:
+        entry = by_item.setdefault(item_id, (item_name, [], []))
+        entry[1].append((claimant_id, claim_id))
+        entry[2].append((reporter_id, claim_id))
+
+    for item_id, (item_name, claimants, reporters) in by_item.items():
+        notify('claim_expired', claimants, item_id=item_id, item=item_name)
+        notify('claim_expired_reporter', reporters, item_id=item_id, item=item_name)
+
+
+def expire_claims(batch_size=None):
+    """Expire pending claims past their expiry. Returns the number expired."""
+    batch_size = batch_size or current_app.config.get('CLAIM_EXPIRY_BATCH', 200)
+    expired = 0
+    while True:
+        now = datetime.utcnow()
+        ids = db.session.scalars(
+            select(Claim.id)
+            .where(Claim.status == 'pending', Claim.expires_at <= now)
+            .order_by(Claim.expires_at)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        db.session.execute(
+            update(Claim)
+            .where(Claim.id.in_(ids), Claim.status == 'pending')
+            .values(status='expired', resolved_at=now, reason="Claim expired")
+            .execution_options(synchronize_session=False)
+        )
+        # Only the claims this batch moved (resolved_at is this batch's marker)
+        rows = db.session.execute(
+            select(Claim.id, Claim.item_id, Item.name, Claim.claimant_id, Claim.reporter_id)
+            .join(Item, Item.id == Claim.item_id)
+            .where(Claim.id.in_(ids), Claim.status == 'expired', Claim.resolved_at == now)
+        ).all()
+        _notify_expired(rows)
+        db.session.commit()
+        expired += len(rows)
+
+        if len(ids) < batch_size:
+            break
+    return expired
+
+
+# ---------- CLI ---------- #
+
+claims_cli = AppGroup('claims', help='Maintain claims.')
+
+
+@claims_cli.command('expire')
+@click.option('--dry-run', is_flag=True, help='Only count the claims that are due.')
+def expire_command(dry_run):
+    """Expire pending claims past their expiry date."""
+    if dry_run:
+        due = db.session.scalar(
+            select(func.count()).where(Claim.status == 'pending', Claim.expires_at <= datetime.utcnow())
+        )
+        click.echo(f"{due} claim(s) are due to expire.")
+        return
+    click.echo(f"Expired {expire_claims()} claim(s).")
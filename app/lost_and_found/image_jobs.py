@@ -0,0 +1,252 @@
+# app/lost_and_found/image_jobs.py
+"""
+Database-backed queue for image processing.
+
+Decoding and resizing a large upload takes long enough to tie up a gunicorn
+sync worker, so requests only store the original in the blob store (see
+app/storage.py) and queue an `ImageJob`.
+The image row is created with status 'processing' (serving a placeholder) and
+a worker fills in the renditions: by default a thread in each gunicorn worker
+(`start_worker`, see gunicorn.conf.py), or `flask images worker` as a separate
+process with IMAGE_WORKER_EMBEDDED=false.
+
+Jobs are claimed with a conditional UPDATE, so several workers can share the
+queue. A failed job is retried with exponential backoff; after
+IMAGE_JOB_MAX_ATTEMPTS (or immediately, for files that aren't images) it goes
+to the dead-letter list, where `flask images dead` / `flask images retry`
+can inspect and requeue it. Jobs whose worker died mid-way are picked up
+again once IMAGE_JOB_TIMEOUT has passed.
+
+With IMAGE_JOBS_INLINE set, queued jobs are processed right after the request
+commits instead (development, tests).
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, or_, update
+
+from app import blob_store, db
+from app.lost_and_found.images import InvalidImageError, remove_files, save_renditions
+from app.lost_and_found.models import ImageJob, ItemImage
+from app.storage import register_blob
+
+RENDITION_COLUMNS = ('image_url', 'thumb_url', 'card_url', 'full_url')
+
+
+def stage_upload(file_storage, item_id):
+    """
+    Store the original upload in the blob store and add an ItemImage for it to
+    the session. A photo that was already processed reuses its renditions;
+    otherwise the image starts out 'processing' with a queued job.
+    """
+    blob_hash, size = blob_store.put_upload(file_storage)
+    register_blob(db.session, blob_hash, size, file_storage.mimetype)
+
+    image = ItemImage(item_id=item_id, blob_hash=blob_hash, image_url=blob_store.path(blob_hash))
+    processed = ItemImage.query.filter_by(blob_hash=blob_hash, status='ready').first()
+    if processed:
+        image.status = 'ready'
+        for column in RENDITION_COLUMNS:
+            setattr(image, column, getattr(processed, column))
+    else:
+        image.status = 'processing'
+        image.jobs.append(ImageJob(source_path=blob_store.path(blob_hash)))
+    db.session.add(image)
+    return image
+
+
+# ---------- Worker ---------- #
+
+def _claim_next():
+    """Atomically take the next runnable job, or return None"""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config.get('IMAGE_JOB_TIMEOUT', 300))
+    runnable = or_(
+        and_(ImageJob.status == 'queued', ImageJob.run_after <= now),
+        and_(ImageJob.status == 'processing', ImageJob.locked_at < stale)
+    )
+
+    candidates = db.session.scalars(
+        db.select(ImageJob.id).where(runnable).order_by(ImageJob.run_after, ImageJob.id).limit(10)
+    ).all()
+    for job_id in candidates:
+        claimed = db.session.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job_id, runnable)
+            .values(status='processing', locked_at=now, attempts=ImageJob.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(ImageJob, job_id)
+    return None
+
+
+def _fail(job, error, retryable=True):
+    max_attempts = current_app.config.get('IMAGE_JOB_MAX_ATTEMPTS', 5)
+    job.last_error = str(error)[:2000]
+    job.locked_at = None
+    if retryable and job.attempts < max_attempts:
+        backoff = current_app.config.get('IMAGE_JOB_BACKOFF', 30) * 2 ** (job.attempts - 1)
+        job.status = 'queued'
+        job.run_after = datetime.utcnow() + timedelta(seconds=backoff)
+        current_app.logger.warning("Image job %s failed (attempt %s), retrying in %ss: %s", job.id, job.attempts, backoff, error)
+    else:
+        job.status = 'dead'
+        db.session.execute(update(ItemImage).where(ItemImage.id == job.image_id).values(status='failed'))
+        current_app.logger.error("Image job %s moved to the dead-letter list: %s", job.id, error)
+    db.session.commit()
+
+
+def process_job(job):
+    """Write the renditions of one claimed job and mark the image ready"""
+    image = db.session.get(ItemImage, job.image_id)
+    # Blob files may be shared with other images and are only removed by the GC
+    shared = blob_store.owns(job.source_path)
+    written = []
+    try:
+        processed = None
+        if image is not None and image.blob_hash:
+            processed = ItemImage.query.filter_by(blob_hash=image.blob_hash, status='ready').first()
+
+        if image is None:
+            renditions = None
+        elif processed:
+            # Another upload of the same photo has been processed already
+            renditions = {column: getattr(processed, column) for column in RENDITION_COLUMNS}
+        else:
+            stem = (blob_store.rendition_stem(image.blob_hash) if image.blob_hash
+                    else os.path.join(current_app.config['UPLOAD_FOLDER'], uuid.uuid4().hex))
+            renditions = save_renditions(job.source_path, stem)
+            written = renditions.pop('paths')
+
+        updated = 0
+        if renditions:
+            updated = db.session.execute(
+                update(ItemImage)
+                .where(ItemImage.id == job.image_id, ItemImage.status != 'ready')
+                .values(status='ready', **renditions)
+            ).rowcount
+        if not updated and not shared:
+            # The image was deleted (or already done) while we worked
+            remove_files(written)
+        job.status = 'done'
+        job.locked_at = None
+        job.last_error = None
+        db.session.commit()
+    except InvalidImageError as e:
+        db.session.rollback()
+        _fail(job, e, retryable=False)
+        return False
+    except Exception as e:
+        db.session.rollback()
+        if not shared:
+            remove_files(written)
+        _fail(job, e)
+        return False
+
+    if not shared:
+        # Staged before uploads went to the blob store
+        remove_files([job.source_path])
+    return bool(updated)
+
+
+def run_pending(limit=None):
+    """Process runnable jobs until the queue is empty (or `limit` is reached)"""
+    processed = 0
+    while limit is None or processed < limit:
+        job = _claim_next()
+        if job is None:
+            break
+        process_job(job)
+        processed += 1
+    return processed
+
+
+def run_inline():
+    """Process the queue in-request when IMAGE_JOBS_INLINE is set"""
+    if current_app.config.get('IMAGE_JOBS_INLINE'):
+        try:
+            run_pending()
+        except Exception:
+            current_app.logger.exception("Inline image processing failed")
+
+
+def start_worker(app):
+    """Drain the queue from a daemon thread of this process"""
+    interval = app.config.get('IMAGE_WORKER_POLL_INTERVAL', 2.0)
+
+    def work():
+        while True:
+            with app.app_context():
+                try:
+                    processed = run_pending()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Image worker thread failed")
+                    processed = 0
+                finally:
+                    db.session.remove()
+            if not processed:
+                time.sleep(interval)
+
+    thread = threading.Thread(target=work, name='image-worker', daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------- CLI ---------- #
+
+images_cli = AppGroup('images', help='Process uploaded images.')
+
+
+@images_cli.command('worker')
+@click.option('--once', is_flag=True, help='Drain the queue and exit.')
+@click.option('--interval', default=None, type=float, help='Seconds to sleep when the queue is empty.')
+def worker_command(once, interval):
+    """Run the image worker."""
+    interval = interval or current_app.config.get('IMAGE_WORKER_POLL_INTERVAL', 2.0)
+    click.echo(f"Image worker started (pid {os.getpid()}).")
+    try:
+        while True:
+            processed = run_pending()
+            if once:
+                click.echo(f"Processed {processed} job(s).")
+                return
+            if not processed:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        click.echo("Image worker stopped.")
+
+
+@images_cli.command('dead')
+def dead_command():
+    """List dead-lettered image jobs."""
+    jobs = ImageJob.query.filter_by(status='dead').order_by(ImageJob.id).all()
+    for job in jobs:
+        click.echo(f"{job.id}\timage={job.image_id}\tattempts={job.attempts}\t{job.last_error}")
+    click.echo(f"{len(jobs)} dead job(s).")
+
+
+@images_cli.command('retry')
+@click.argument('job_ids', nargs=-1, type=int)
+def retry_command(job_ids):
+    """Requeue dead-lettered jobs (all of them when no JOB_IDS are given)."""
+    query = ImageJob.query.filter_by(status='dead')
+    if job_ids:
+        query = query.filter(ImageJob.id.in_(job_ids))
+
+    jobs = query.all()
+    for job in jobs:
+        job.status = 'queued'
+        job.attempts = 0
+        job.run_after = datetime.utcnow()
+        if job.image:
+            job.image.status = 'processing'
+    db.session.commit()
+    click.echo(f"Requeued {len(jobs)} job(s).")
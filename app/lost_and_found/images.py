@@ -0,0 +1,143 @@
+# app/lost_and_found/images.py
+"""
+Upload image pipeline.
+
+Every upload is decoded once, turned upright from its EXIF orientation and
+re-encoded into fixed-size renditions:
+
+    thumb - 160px, thumbnails and small previews
+    card  - 480px, cards in the listing grid
+    full  - 1600px, the item detail page
+
+Renditions are WebP (JPEG when Pillow was built without WebP support). Nothing
+of the original file is kept, so EXIF data (GPS position, camera serial...) is
+stripped. Files are written next to each other as `<stem>_<rendition>.<ext>`,
+the stem being the upload's content hash (see app/storage.py);
+`ItemImage.image_url` keeps the path of the full rendition and the public URL
+of each rendition is stored on the row.
+"""
+import os
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from app.assets import asset_url
+
+# Longest side in pixels; images are never upscaled
+RENDITIONS = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1600,
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+class InvalidImageError(ValueError):
+    """The upload could not be decoded as an image"""
+
+
+def _output_format():
+    if features.check('webp'):
+        return 'WEBP', '.webp'
+    return 'JPEG', '.jpg'
+
+
+def _normalize_mode(image, image_format):
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if not has_alpha:
+        return image if image.mode == 'RGB' else image.convert('RGB')
+
+    image = image.convert('RGBA')
+    if image_format != 'JPEG':
+        return image
+    # JPEG has no alpha channel: flatten onto white
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.split()[-1])
+    return background
+
+
+def _public_url(path):
+    url = asset_url(path)
+    if url:
+        return url
+    # Files outside the blob layout are served from the static folder
+    relative = os.path.relpath(os.path.realpath(path), os.path.realpath(current_app.static_folder))
+    return f"{current_app.static_url_path}/{relative.replace(os.sep, '/')}"
+
+
+def check_image(file_storage):
+    """
+    Cheap upfront check that an upload looks like an image: only the header is
+    parsed, the pixels are decoded later by the image worker.
+    """
+    try:
+        with Image.open(file_storage.stream) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"Could not read image {file_storage.filename!r}") from e
+    finally:
+        file_storage.stream.seek(0)
+    return image_format
+
+
+def save_renditions(source, stem):
+    """
+    Decode `source` (a path or file object) and write all renditions as
+    `<stem>_<rendition>.<ext>`. Returns the ItemImage column values plus
+    'paths', the files written. Raises InvalidImageError when it is not a
+    readable image.
+    """
+    try:
+        with Image.open(source) as original:
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(f"Could not read image {getattr(source, 'name', source)!r}") from e
+
+    image_format, extension = _output_format()
+    image = _normalize_mode(image, image_format)
+    save_options = (
+        {'quality': WEBP_QUALITY, 'method': 4} if image_format == 'WEBP'
+        else {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+    )
+
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    values = {'paths': []}
+    try:
+        # Largest first so each smaller rendition is resized from the previous one
+        for name, size in sorted(RENDITIONS.items(), key=lambda rendition: -rendition[1]):
+            image.thumbnail((size, size), Image.LANCZOS)
+            path = f"{stem}_{name}{extension}"
+            values['paths'].append(path)
+            # Write then rename, so a shared rendition is never seen half-written
+            image.save(path + '.tmp', image_format, **save_options)
+            os.replace(path + '.tmp', path)
+            values[f"{name}_url"] = _public_url(path)
+            if name == 'full':
+                values['image_url'] = path
+    except Exception:
+        remove_files(values['paths'] + [path + '.tmp' for path in values['paths']])
+        raise
+    return values
+
+
+def rendition_files(image_url):
+    """All files belonging to an image, given its stored image_url"""
+    directory, filename = os.path.split(image_url)
+    stem, extension = os.path.splitext(filename)
+    if not stem.endswith('_full'):
+        # Uploaded before renditions existed: a single original file
+        return [image_url]
+    stem = stem[:-len('_full')]
+    return [os.path.join(directory, f"{stem}_{name}{extension}") for name in RENDITIONS]
+
+
+def remove_files(paths):
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            current_app.logger.error(f"Failed to delete image file {path}: {e}")
@@ -0,0 +1,70 @@
+# app/lost_and_found/listing.py
+"""
+Item listing helpers shared by the feed and the search endpoint.
+
+Listings are built in two steps so every page costs a fixed number of queries
+and holds exactly `per_page` items:
+
+1. filter, order and page over item ids only. Report/location filters are
+   EXISTS subqueries, so nothing multiplies the rows LIMIT counts.
+2. load the page's items by id, with their collections fetched by selectinload
+   (one extra query per collection instead of a joined cartesian product).
+"""
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, lazyload, selectinload
+
+from app import db
+from app.lost_and_found.models import Item, Location, Report
+
+LISTED_STATUSES = ('lost', 'found')
+
+
+def listing_ids_query():
+    """Base (id, created_at) query over the items a listing may show"""
+    return db.session.query(Item.id, Item.created_at).filter(Item.status.in_(LISTED_STATUSES))
+
+
+def report_matches(*criteria):
+    """EXISTS filter on the item's reports"""
+    return Item.reports.any(*criteria)
+
+
+def location_matches(term):
+    """EXISTS filter on the report location name or specific spot"""
+    return report_matches(or_(
+        Report.location.has(Location.name.ilike(term)),
+        Report.specific_spot.ilike(term)
+    ))
+
+
+def text_matches(term):
+    """ILIKE fallback for databases without a full-text index"""
+    return or_(
+        Item.name.ilike(term),
+        Item.description.ilike(term),
+        report_matches(or_(
+            Report.additional_details.ilike(term),
+            Report.location.has(Location.name.ilike(term)),
+            Report.specific_spot.ilike(term)
+        ))
+    )
+
+
+def load_items(item_ids):
+    """Load items by id with everything to_dict() touches, preserving order"""
+    if not item_ids:
+        return []
+
+    items = Item.query.options(
+        selectinload(Item.images).lazyload('*'),
+        selectinload(Item.claims).lazyload('*'),
+        selectinload(Item.reports).options(
+            joinedload(Report.location),
+            # the item is already in the identity map; the reporter isn't shown
+            lazyload(Report.item),
+            lazyload(Report.reporter),
+        ),
+    ).filter(Item.id.in_(item_ids)).all()
+
+    by_id = {item.id: item for item in items}
+    return [by_id[item_id] for item_id in item_ids if item_id in by_id]
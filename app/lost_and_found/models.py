@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from sqlalchemy import func, Index, CheckConstraint, text, UniqueConstraint, Enum
 from app import db
@@ -25,6 +25,7 @@ class ClaimStatus(enum.Enum):
     ACCEPTED = 'accepted'
     REJECTED = 'rejected'
     CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
 
 
 class NotificationType(enum.Enum):
@@ -34,6 +35,7 @@ class NotificationType(enum.Enum):
     CLAIM_ACCEPTED = 'claim_accepted'
     CLAIM_REJECTED = 'claim_rejected'
     CLAIM_CANCELLED = 'claim_cancelled'
+    CLAIM_EXPIRED = 'claim_expired'
     CLAIM_ACCEPTED_CONFIRMATION = 'claim_accepted_confirmation'
     ITEM_RETURNED = 'item_returned'
 
@@ -111,8 +113,8 @@ class Item(db.Model):
     def __repr__(self):
         return f"<Item id={self.id} name={self.name!r} status={self.status}>"
 
-    def to_dict(self):
-        images = [img.to_dict() for img in (self.images or [])]
+    def to_dict(self, image_rendition=None):
+        images = [img.to_dict(image_rendition) for img in (self.images or [])]
         
         found_by_user = None
         if self.found_by:
@@ -273,6 +275,15 @@ class Location(db.Model):
             'description': self.description,
         }
 
+
+class ReferenceVersion(db.Model):
+    """Version stamps for cached reference data (see app/lost_and_found/reference.py)"""
+    __tablename__ = 'reference_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+
 # ---------- Claim ---------- #
 class Claim(db.Model):
     __tablename__ = 'claims'
@@ -281,8 +292,10 @@ class Claim(db.Model):
         Index('ix_claims_status_created', 'status', 'created_at'),
         Index('ix_claims_item_status', 'item_id', 'status'),
         Index('ix_claims_claimant_created', 'claimant_id', 'created_at'),
+        # Pending claims past their expiry (see app/lost_and_found/claim_expiry.py)
+        Index('ix_claims_status_expires', 'status', 'expires_at'),
         CheckConstraint(
-            "status IN ('pending', 'accepted', 'rejected', 'cancelled')",
+            "status IN ('pending', 'accepted', 'rejected', 'cancelled', 'expired')",
             name='ck_claims_valid_status'
         ),
     )
@@ -333,9 +346,13 @@ class Claim(db.Model):
         }
     
     def is_expired(self):
+        if self.status == 'expired':
+            return True
+        # Pending claims past expires_at that the sweeper hasn't reached yet
         if not self.expires_at or self.status != 'pending':
             return False
-        return datetime.now() > self.expires_at
+        now = datetime.now(timezone.utc) if self.expires_at.tzinfo else datetime.utcnow()
+        return now > self.expires_at
     
     def is_claimable_by_user(self, user_id):
         if self.status != 'pending':
@@ -362,16 +379,20 @@ class Notification(db.Model):
     message = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # The user's UserStats.notifications_version when this was created or last changed
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     user = db.relationship('User', back_populates='notifications', lazy='joined')
     item = db.relationship('Item', lazy='joined')
     claim = db.relationship('Claim', lazy='joined')
 
     __table_args__ = (
-        Index('ix_notifications_is_read', 'is_read'),
+        Index('ix_notifications_user_unread', 'user_id', 'is_read'),
         Index('ix_notifications_user_created', 'user_id', 'created_at'),
+        Index('ix_notifications_user_version', 'user_id', 'version'),
+        Index('ix_notifications_read_created', 'is_read', 'created_at'),
         CheckConstraint(
-            "notification_type IN ('item_found', 'claim_request', 'claim_request_anonymous', 'claim_accepted', 'claim_rejected', 'claim_cancelled', 'claim_accepted_confirmation', 'item_returned', 'item_claimed', 'item_recovered')",
+            "notification_type IN ('item_found', 'claim_request', 'claim_request_anonymous', 'claim_accepted', 'claim_rejected', 'claim_cancelled', 'claim_accepted_confirmation', 'item_returned', 'item_claimed', 'item_recovered', 'claim_expired')",
             name='ck_notifications_valid_type'
         ),
     )
@@ -390,24 +411,145 @@ class Notification(db.Model):
         }
 
 
+# ---------- NotificationArchive ---------- #
+class NotificationArchive(db.Model):
+    """Pruned notifications, kept when NOTIFICATION_ARCHIVE is set (see app/lost_and_found/retention.py)"""
+    __tablename__ = 'notifications_archive'
+    __table_args__ = (
+        Index('ix_notifications_archive_user_created', 'user_id', 'created_at'),
+    )
+
+    # Same ids as in `notifications`; no foreign keys, so archived rows outlive what they point at
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    item_id = db.Column(db.Integer, nullable=True)
+    claim_id = db.Column(db.Integer, nullable=True)
+    notification_type = db.Column(db.String(30), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    archived_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# ---------- UserStats ---------- #
+class UserStats(db.Model):
+    """Per-user notification counters, see app/lost_and_found/notification_sync.py"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0)
+    # Bumped on every change to the user's notifications; the sync token and ETag
+    notifications_version = db.Column(db.Integer, nullable=False, default=0)
+    # Version of the last deletion; a delta can't express one, so older clients resync
+    notifications_removed_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
 # ---------- ItemImage ---------- #
 class ItemImage(db.Model):
     __tablename__ = 'item_images'
     id = db.Column(db.Integer, primary_key=True)
     item_id = db.Column(db.Integer, db.ForeignKey('items.id', ondelete='CASCADE'), nullable=False, index=True)
     image_url = db.Column(db.String(2000), nullable=False)
+    # SHA-256 of the original upload (see app/storage.py); NULL for older uploads
+    blob_hash = db.Column(db.String(64), db.ForeignKey('blobs.hash'), nullable=True, index=True)
+    # Public URLs of the resized renditions (see app/lost_and_found/images.py)
+    thumb_url = db.Column(db.String(2000))
+    card_url = db.Column(db.String(2000))
+    full_url = db.Column(db.String(2000))
+    # processing until the image worker has written the renditions
+    status = db.Column(db.String(20), default='ready', server_default='ready', nullable=False)
     uploaded_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     item = db.relationship('Item', back_populates='images', lazy='joined')
+    jobs = db.relationship('ImageJob', back_populates='image', lazy='select', cascade='all, delete-orphan', passive_deletes=True)
 
     __table_args__ = (
         Index('ix_item_images_uploaded', 'uploaded_at'),
+        CheckConstraint(
+            "status IN ('processing', 'ready', 'failed')",
+            name='ck_item_images_valid_status'
+        ),
     )
 
-    def to_dict(self):
+    PLACEHOLDER_URL = '/static/images/default.png'
+
+    def url(self, rendition='full'):
+        """URL of a rendition, falling back to the original for older uploads"""
+        if self.status != 'ready':
+            return self.PLACEHOLDER_URL
+        return getattr(self, f'{rendition}_url', None) or self.full_url or self._original_url()
+
+    def _original_url(self):
+        # Uploads from before renditions only stored their path on disk
+        path = self.image_url.replace('\\', '/')
+        if path.startswith('static/'):
+            return '/' + path
+        if '/static/' in path:
+            return path[path.index('/static/'):]
+        return path
+
+    def to_dict(self, rendition=None):
         return {
             'id': self.id,
             'item_id': self.item_id,
-            'image_url': self.image_url,
+            'image_url': self.url(rendition or 'full'),
+            'thumb_url': self.url('thumb'),
+            'card_url': self.url('card'),
+            'full_url': self.url('full'),
+            'status': self.status,
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
+        }
+
+
+# ---------- Blob ---------- #
+class Blob(db.Model):
+    """A stored upload, shared by every ItemImage with the same content"""
+    __tablename__ = 'blobs'
+    __table_args__ = (
+        Index('ix_blobs_ref_count_released', 'ref_count', 'released_at'),
+    )
+
+    hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Set while nothing references the blob; `flask storage gc` removes it after a grace period
+    released_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+
+# ---------- ImageJob ---------- #
+class ImageJob(db.Model):
+    """Queued rendition work for an uploaded image (see app/lost_and_found/image_jobs.py)"""
+    __tablename__ = 'image_jobs'
+    __table_args__ = (
+        Index('ix_image_jobs_status_run_after', 'status', 'run_after'),
+        CheckConstraint(
+            "status IN ('queued', 'processing', 'done', 'dead')",
+            name='ck_image_jobs_valid_status'
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    image_id = db.Column(db.Integer, db.ForeignKey('item_images.id', ondelete='CASCADE'), nullable=False, index=True)
+    source_path = db.Column(db.String(2000), nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    image = db.relationship('ItemImage', back_populates='jobs', lazy='select')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'image_id': self.image_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
         }
\ No newline at end of file
@@ -0,0 +1,173 @@
+# app/lost_and_found/notification_sync.py
+"""
+Per-user notification sync state.
+
+Each user has a `UserStats` row holding their unread count and a version
+number that is bumped whenever one of their notifications is created, read or
+deleted. The changed notifications are stamped with the new version, so:
+
+- the version doubles as the ETag of the notifications API, and a poll with
+  nothing new is answered from that single row with 304;
+- a client that sends back the version it last saw (`since`) only receives
+  notifications with a higher version, or the full list when some were
+  deleted since (`notifications_removed_version`).
+
+The row is updated from a session `before_flush` hook, in the same transaction
+as the notifications. The UPDATE locks the row until commit, so concurrent
+writers for the same user get increasing versions in commit order. Bulk
+updates skip the hook and call `bump` themselves (mark-read, mark-all-read).
+
+Should a counter drift anyway (rows changed by hand, cascaded deletes),
+`flask notifications repair-counts` recomputes them.
+"""
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, inspect, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.lost_and_found.models import Notification, UserStats
+
+
+def bump(session, user_id, unread_delta=0, unread=None, removed=False):
+    """
+    Move a user's notifications to a new version and adjust their unread count
+    (or set it, with `unread`). Pass `removed` when notifications were deleted.
+    Returns the new version.
+    """
+    conn = session.connection()
+    new_unread = UserStats.unread_notifications + unread_delta if unread is None else unread
+    version = _advance(conn, user_id, new_unread, removed)
+    if version is not None:
+        return version
+
+    # First notification activity for this user: start from what is stored
+    stored = conn.execute(
+        select(func.count()).where(Notification.user_id == user_id, Notification.is_read.is_(False))
+    ).scalar()
+    error = None
+    savepoint = conn.begin_nested()
+    try:
+        conn.execute(insert(UserStats).values(
+            user_id=user_id, unread_notifications=stored, notifications_version=0
+        ))
+        savepoint.commit()
+    except IntegrityError as e:
+        # Possibly created concurrently; then the update below finds that row
+        savepoint.rollback()
+        error = e
+
+    version = _advance(conn, user_id, new_unread, removed)
+    if version is None:
+        # Still no row, so the insert failed for another reason (e.g. no such user)
+        raise error
+    return version
+
+
+def _advance(conn, user_id, new_unread, removed=False):
+    """Bump the version of an existing row; None when the user has no row"""
+    values = {'notifications_version': UserStats.notifications_version + 1, 'unread_notifications': new_unread}
+    if removed:
+        values['notifications_removed_version'] = UserStats.notifications_version + 1
+    updated = conn.execute(
+        update(UserStats).where(UserStats.user_id == user_id).values(**values)
+    ).rowcount
+    if not updated:
+        return None
+    return conn.execute(
+        select(UserStats.notifications_version).where(UserStats.user_id == user_id)
+    ).scalar()
+
+
+def get_stats(user_id):
+    """(unread count, version) for a user"""
+    return get_sync_state(user_id)[:2]
+
+
+def get_sync_state(user_id):
+    """(unread count, version, version of the last deletion) for a user"""
+    from app import db
+
+    row = db.session.execute(
+        select(UserStats.unread_notifications, UserStats.notifications_version,
+               UserStats.notifications_removed_version)
+        .where(UserStats.user_id == user_id)
+    ).first()
+    return tuple(row) if row else (0, 0, 0)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_changes(session, flush_context, instances):
+    changes = {}
+
+    for obj in session.new:
+        if isinstance(obj, Notification) and obj.user_id is not None:
+            entry = changes.setdefault(obj.user_id, [0, [], False])
+            if not obj.is_read:
+                entry[0] += 1
+            entry[1].append(obj)
+
+    for obj in session.dirty:
+        if isinstance(obj, Notification) and session.is_modified(obj):
+            entry = changes.setdefault(obj.user_id, [0, [], False])
+            history = inspect(obj).attrs.is_read.history
+            if history.deleted:
+                was_read, is_read = bool(history.deleted[0]), bool(obj.is_read)
+                if was_read != is_read:
+                    entry[0] += -1 if is_read else 1
+            entry[1].append(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, Notification):
+            entry = changes.setdefault(obj.user_id, [0, [], False])
+            if not obj.is_read:
+                entry[0] -= 1
+            entry[2] = True
+
+    for user_id, (unread_delta, stamped, removed) in changes.items():
+        version = bump(session, user_id, unread_delta, removed=removed)
+        for obj in stamped:
+            obj.version = version
+
+
+# ---------- CLI ---------- #
+
+notifications_cli = AppGroup('notifications', help='Maintain notification counters.')
+
+
+def _unread_count(user_id):
+    return (
+        select(func.count())
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .scalar_subquery()
+    )
+
+
+@notifications_cli.command('repair-counts')
+@click.option('--dry-run', is_flag=True, help='Only report the counters that are off.')
+def repair_counts_command(dry_run):
+    """Recompute unread notification counters."""
+    from app import db
+
+    actual = dict(db.session.execute(
+        select(Notification.user_id, func.count())
+        .where(Notification.is_read.is_(False))
+        .group_by(Notification.user_id)
+    ).all())
+    stored = dict(db.session.execute(
+        select(UserStats.user_id, UserStats.unread_notifications)
+    ).all())
+
+    wrong = sorted(
+        user_id for user_id in set(actual) | set(stored)
+        if actual.get(user_id, 0) != stored.get(user_id, 0)
+    )
+    for user_id in wrong:
+        click.echo(f"user {user_id}: stored {stored.get(user_id, 0)}, actual {actual.get(user_id, 0)}")
+        if not dry_run:
+            # Recounted under the row lock, so changes made since the scan are included
+            bump(db.session, user_id, unread=_unread_count(user_id))
+            db.session.commit()
+
+    verb = 'Would repair' if dry_run else 'Repaired'
+    click.echo(f"{verb} {len(wrong)} counter(s).")
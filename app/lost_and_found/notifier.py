@@ -0,0 +1,112 @@
+# app/lost_and_found/notifier.py
+"""
+Creating notifications.
+
+Routes describe a notification by template name and parameters and hand over
+every recipient at once:
+
+    notify('claim_superseded', [(claimant_id, claim_id), ...], item_id=item.id, item=item.name)
+
+The batch is written with one bulk INSERT in the caller's transaction. Each
+recipient's UserStats row is bumped once for the batch (see
+notification_sync.py; a bulk insert skips the flush hook) and the push
+channel is told once the transaction commits (see app/events.py).
+
+A notification identical to one the recipient got within
+NOTIFICATION_DEDUPE_WINDOW seconds (same type, item, claim and message) is
+dropped, so retried requests and double submits don't notify twice.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, tuple_
+
+from app import db, event_hub
+from app.lost_and_found.models import Notification
+from app.lost_and_found.notification_sync import bump
+
+# name -> (notification type, message)
+TEMPLATES = {
+    'lost_item_found': ('claim_request', "{claimant} found your lost item '{item}'."),
+    'claim_request': ('claim_request', "{claimant} wants to claim your found item '{item}'."),
+    'claim_accepted': ('claim_accepted', "Your claim for item '{item}' has been accepted! {details}"),
+    'claim_accepted_confirmation': ('claim_accepted_confirmation', "You accepted the claim for item '{item}' by {claimant}.{details}"),
+    'item_returned': ('item_returned', "You accepted the claim for item '{item}' by {claimant}.{details}"),
+    'claim_rejected': ('claim_rejected', "Your claim for item '{item}' was rejected.{details}"),
+    'claim_superseded': ('claim_rejected', "Your claim for item '{item}' was rejected because another claim was accepted."),
+    'claim_cancelled': ('claim_cancelled', "Claim for item '{item}' was cancelled by the claimant."),
+    'claim_expired': ('claim_expired', "Your claim for item '{item}' expired before the reporter responded."),
+    'claim_expired_reporter': ('claim_expired', "A claim for your item '{item}' expired without a response."),
+}
+
+
+def render(template, **params):
+    """(notification type, message) for a template"""
+    notification_type, message = TEMPLATES[template]
+    return notification_type, message.format(**params).strip()
+
+
+def _recent(rows, window):
+    """Keys of rows the recipients were already sent within the window"""
+    cutoff = datetime.utcnow() - timedelta(seconds=window)
+    key = tuple_(Notification.user_id, Notification.notification_type, Notification.message)
+    candidates = db.session.execute(
+        select(Notification.user_id, Notification.notification_type, Notification.message,
+               Notification.item_id, Notification.claim_id)
+        .where(
+            key.in_({(row['user_id'], row['notification_type'], row['message']) for row in rows}),
+            Notification.created_at >= cutoff
+        )
+    ).all()
+    return {tuple(candidate) for candidate in candidates}
+
+
+def notify(template, recipients, item_id=None, claim_id=None, **params):
+    """
+    Add one notification per recipient to the current transaction. Recipients
+    are user ids or (user id, claim id) pairs. Returns the number written.
+    """
+    notification_type, message = render(template, **params)
+
+    rows = []
+    seen = set()
+    for recipient in recipients:
+        user_id, recipient_claim_id = recipient if isinstance(recipient, tuple) else (recipient, claim_id)
+        key = (user_id, notification_type, message, item_id, recipient_claim_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append({
+            'user_id': user_id,
+            'item_id': item_id,
+            'claim_id': recipient_claim_id,
+            'notification_type': notification_type,
+            'message': message,
+            'is_read': False,
+        })
+    if not rows:
+        return 0
+
+    window = current_app.config.get('NOTIFICATION_DEDUPE_WINDOW', 300)
+    if window:
+        recent = _recent(rows, window)
+        rows = [row for row in rows if (row['user_id'], notification_type, message, item_id, row['claim_id']) not in recent]
+        if not rows:
+            return 0
+
+    # One bump per recipient, in a fixed order so concurrent batches can't deadlock
+    versions = {}
+    for user_id in sorted({row['user_id'] for row in rows}):
+        versions[user_id] = bump(db.session, user_id, unread_delta=sum(1 for row in rows if row['user_id'] == user_id))
+    for row in rows:
+        row['version'] = versions[row['user_id']]
+
+    db.session.execute(insert(Notification), rows)
+
+    for row in rows:
+        event_hub.publish(row['user_id'], 'notification', {
+            'notification_type': notification_type,
+            'item_id': item_id,
+            'claim_id': row['claim_id'],
+        }, session=db.session)
+    return len(rows)
@@ -0,0 +1,72 @@
+# app/lost_and_found/pagination.py
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+A cursor is an opaque URL-safe token holding the sort key of the last row a
+client has seen. The next page is simply "rows sorting after that key", so it
+costs the same at any depth and does not shift when new items are inserted.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import String, and_, func, literal, or_
+
+
+def encode_cursor(created_at, row_id):
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id); raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _sort_key(dialect_name, created_col):
+    if dialect_name != 'sqlite':
+        return created_col
+    # SQLite keeps timestamps as text in two formats: CURRENT_TIMESTAMP defaults
+    # have no fractional part, values written from Python always have
+    # microseconds. Equal times can then compare unequal as strings (and sort
+    # apart), so order and compare by julianday() instead.
+    return func.julianday(created_col)
+
+
+def _timestamp_param(dialect_name, created_at):
+    if dialect_name != 'sqlite':
+        return created_at
+    return func.julianday(literal(created_at.strftime('%Y-%m-%d %H:%M:%S.%f'), String))
+
+
+def keyset_page(query, created_col, id_col, cursor, per_page, dialect_name, offset=0):
+    """
+    Apply the newest-first keyset ordering to `query` and fetch one page.
+    `offset` skips rows for legacy `?page=N` requests and is ignored with a
+    cursor. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    sort_key = _sort_key(dialect_name, created_col)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        ts = _timestamp_param(dialect_name, created_at)
+        query = query.filter(or_(
+            sort_key < ts,
+            and_(sort_key == ts, id_col < row_id)
+        ))
+
+    query = query.order_by(sort_key.desc(), id_col.desc())
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
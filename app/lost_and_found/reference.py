@@ -0,0 +1,140 @@
+# app/lost_and_found/reference.py
+"""
+Process-local cache of the reference data: categories and locations.
+
+Both tables are read on most report pages but almost never written. Each
+worker keeps one immutable `ReferenceSnapshot` of them (tuples, id-keyed
+dicts and id sets) and reloads it only when the version stamp in
+`reference_versions` has moved:
+
+- a session `after_flush` hook bumps the stamp in the same transaction as any
+  Category/Location write, whichever worker or script makes it;
+- workers read the stamp at most once every REFERENCE_CHECK_INTERVAL seconds,
+  so another worker's change shows up within that interval (the writing
+  worker sees it right after commit).
+
+The version also names the HTTP representation: the categories and locations
+endpoints use `snapshot.etag` as their ETag and serve JSON bytes serialized
+once per snapshot (`snapshot.serialized`). Location autocomplete is answered
+by the snapshot's `location_index` (see autocomplete.py).
+"""
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.database import discard_on_rollback
+from app.lost_and_found.autocomplete import LocationIndex
+from app.lost_and_found.models import Category, Location, ReferenceVersion
+
+STAMP = 'reference'
+CHANGED_KEY = 'reference_changed'
+# Serialized responses kept per snapshot (one per distinct location search)
+SERIALIZED_LIMIT = 512
+
+CategoryRef = namedtuple('CategoryRef', 'id name description')
+LocationRef = namedtuple('LocationRef', 'id name description')
+
+
+class ReferenceSnapshot:
+    """Categories and locations as loaded at one version"""
+
+    def __init__(self, version, categories, locations):
+        self.version = version
+        # Sorted by name, as shown in dropdowns
+        self.categories = tuple(sorted(categories, key=lambda c: c.name.casefold()))
+        self.locations = tuple(sorted(locations, key=lambda l: l.name.casefold()))
+        self.categories_by_id = {c.id: c for c in self.categories}
+        self.locations_by_id = {l.id: l for l in self.locations}
+        self.category_ids = frozenset(self.categories_by_id)
+        self.location_ids = frozenset(self.locations_by_id)
+        self.category_choices = tuple((c.id, c.name) for c in self.categories)
+        self.location_choices = tuple((l.id, l.name) for l in self.locations)
+        self.location_index = LocationIndex(self.locations)
+        self.etag = f"ref{version}"
+        self._serialized = {}
+
+    def serialized(self, key, build):
+        """JSON bytes of `build()`, built once per snapshot and key"""
+        body = self._serialized.get(key)
+        if body is None:
+            body = current_app.json.dumps(build()).encode() + b'\n'
+            if len(self._serialized) < SERIALIZED_LIMIT:
+                self._serialized[key] = body
+        return body
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._snapshot = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The current snapshot, reloaded if the version stamp moved"""
+        snapshot = self._snapshot
+        interval = current_app.config.get('REFERENCE_CHECK_INTERVAL', 5)
+        if snapshot is not None and time.monotonic() - self._checked_at < interval:
+            return snapshot
+
+        with self._lock:
+            version = db.session.scalar(
+                select(ReferenceVersion.version).where(ReferenceVersion.name == STAMP)
+            ) or 0
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._load(version)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    @staticmethod
+    def _load(version):
+        categories = db.session.execute(select(Category.id, Category.name, Category.description)).all()
+        locations = db.session.execute(select(Location.id, Location.name, Location.description)).all()
+        return ReferenceSnapshot(
+            version,
+            [CategoryRef(*row) for row in categories],
+            [LocationRef(*row) for row in locations]
+        )
+
+    def invalidate(self):
+        """Re-check the version stamp on the next read"""
+        self._checked_at = 0
+
+
+reference_data = ReferenceCache()
+
+
+# ---------- Invalidation ---------- #
+
+def bump_version(connection):
+    bumped = connection.execute(
+        update(ReferenceVersion)
+        .where(ReferenceVersion.name == STAMP)
+        .values(version=ReferenceVersion.version + 1)
+    ).rowcount
+    if not bumped:
+        connection.execute(insert(ReferenceVersion).values(name=STAMP, version=1))
+
+
+@event.listens_for(Session, 'after_flush')
+def _stamp_reference_changes(session, flush_context):
+    changed = any(
+        isinstance(obj, (Category, Location))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    )
+    if changed:
+        bump_version(session.connection())
+        session.info[CHANGED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _reload_after_commit(session):
+    if session.info.pop(CHANGED_KEY, False):
+        reference_data.invalidate()
+
+
+discard_on_rollback(CHANGED_KEY)
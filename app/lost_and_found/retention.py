@@ -0,0 +1,169 @@
+# app/lost_and_found/retention.py
+"""
+Notification retention.
+
+Read notifications are pruned by two policies:
+
+    NOTIFICATION_RETENTION_DAYS  - read notifications older than this go
+    NOTIFICATION_KEEP_PER_USER   - only the newest this many read ones are
+                                   kept per user
+
+Unread notifications are never pruned, so the unread counters (see
+notification_sync.py) stay correct. Each batch bumps the version of the users
+it touches, marked as a deletion, so their `?since=` clients resync without
+the pruned rows. With NOTIFICATION_ARCHIVE set, pruned rows are copied to
+`notifications_archive` in the same transaction as the delete.
+
+Rows are removed NOTIFICATION_PRUNE_BATCH at a time, each batch in its own
+short transaction with a pause in between, so a large backlog never holds
+locks long enough to stall the site. Run it from cron or the scheduler:
+
+    flask notifications prune [--dry-run]
+"""
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+from app import db
+from app.lost_and_found.models import Notification, NotificationArchive
+from app.lost_and_found.notification_sync import bump, notifications_cli
+
+ARCHIVED_COLUMNS = ('id', 'user_id', 'item_id', 'claim_id', 'notification_type', 'message', 'is_read', 'created_at')
+
+
+def _remove(ids, archive):
+    """Archive (optionally) and delete one batch. Returns the number deleted."""
+    user_ids = db.session.scalars(
+        select(Notification.user_id).distinct()
+        .where(Notification.id.in_(ids), Notification.is_read.is_(True))
+    ).all()
+    for user_id in sorted(user_ids):
+        bump(db.session, user_id, removed=True)
+    if archive:
+        db.session.execute(
+            insert(NotificationArchive).from_select(
+                ARCHIVED_COLUMNS,
+                select(*(getattr(Notification, column) for column in ARCHIVED_COLUMNS))
+                .where(Notification.id.in_(ids), Notification.is_read.is_(True))
+            )
+        )
+    deleted = db.session.execute(
+        delete(Notification)
+        .where(Notification.id.in_(ids), Notification.is_read.is_(True))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def _drain(next_batch, batch_size, pause, archive):
+    removed = 0
+    while True:
+        ids = next_batch(batch_size)
+        if not ids:
+            return removed
+        removed += _remove(ids, archive)
+        if len(ids) < batch_size:
+            return removed
+        time.sleep(pause)
+
+
+def prune_older_than(days, batch_size, pause=0, archive=False):
+    """Remove read notifications created more than `days` ago"""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    def next_batch(limit):
+        return db.session.scalars(
+            select(Notification.id)
+            .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+            .order_by(Notification.created_at)
+            .limit(limit)
+        ).all()
+
+    return _drain(next_batch, batch_size, pause, archive)
+
+
+def prune_beyond(keep, batch_size, pause=0, archive=False):
+    """Remove all but the newest `keep` read notifications of each user"""
+    user_ids = db.session.scalars(
+        select(Notification.user_id)
+        .where(Notification.is_read.is_(True))
+        .group_by(Notification.user_id)
+        .having(func.count() > keep)
+    ).all()
+
+    removed = 0
+    for user_id in user_ids:
+        def next_batch(limit, user_id=user_id):
+            return db.session.scalars(
+                select(Notification.id)
+                .where(Notification.user_id == user_id, Notification.is_read.is_(True))
+                .order_by(Notification.created_at.desc(), Notification.id.desc())
+                .offset(keep)
+                .limit(limit)
+            ).all()
+
+        removed += _drain(next_batch, batch_size, pause, archive)
+    return removed
+
+
+def count_prunable(days, keep):
+    """How many read notifications each policy would remove right now"""
+    by_age = 0
+    if days:
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        by_age = db.session.scalar(
+            select(func.count()).where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+        )
+    beyond = 0
+    if keep:
+        per_user = (
+            select(func.count().label('read_count'))
+            .where(Notification.is_read.is_(True))
+            .group_by(Notification.user_id)
+            .subquery()
+        )
+        beyond = db.session.scalar(
+            select(func.coalesce(func.sum(per_user.c.read_count - keep), 0)).where(per_user.c.read_count > keep)
+        )
+    return by_age, beyond
+
+
+def prune(days=None, keep=None, batch_size=None, pause=None, archive=None):
+    """Apply the configured policies (arguments override the config). Returns (by age, beyond keep)."""
+    config = current_app.config
+    days = config.get('NOTIFICATION_RETENTION_DAYS', 90) if days is None else days
+    keep = config.get('NOTIFICATION_KEEP_PER_USER', 200) if keep is None else keep
+    batch_size = batch_size or config.get('NOTIFICATION_PRUNE_BATCH', 500)
+    pause = config.get('NOTIFICATION_PRUNE_PAUSE', 0.1) if pause is None else pause
+    archive = config.get('NOTIFICATION_ARCHIVE', False) if archive is None else archive
+
+    by_age = prune_older_than(days, batch_size, pause, archive) if days else 0
+    beyond = prune_beyond(keep, batch_size, pause, archive) if keep else 0
+    return by_age, beyond
+
+
+# ---------- CLI ---------- #
+
+@notifications_cli.command('prune')
+@click.option('--days', default=None, type=int, help='Remove read notifications older than this (0 to skip).')
+@click.option('--keep', default=None, type=int, help='Read notifications to keep per user (0 for no limit).')
+@click.option('--batch-size', default=None, type=int, help='Rows deleted per transaction.')
+@click.option('--archive/--no-archive', default=None, help='Copy pruned rows to notifications_archive.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed.')
+def prune_command(days, keep, batch_size, archive, dry_run):
+    """Prune old read notifications."""
+    if dry_run:
+        config = current_app.config
+        days = config.get('NOTIFICATION_RETENTION_DAYS', 90) if days is None else days
+        keep = config.get('NOTIFICATION_KEEP_PER_USER', 200) if keep is None else keep
+        by_age, beyond = count_prunable(days, keep)
+        # A notification can match both policies, so the total may be lower
+        click.echo(f"Would remove {by_age} read notification(s) by age and {beyond} beyond the per-user limit.")
+        return
+
+    by_age, beyond = prune(days=days, keep=keep, batch_size=batch_size, archive=archive)
+    click.echo(f"Removed {by_age} read notification(s) by age and {beyond} beyond the per-user limit.")
@@ -4,7 +4,9 @@ from flask import jsonify, request, current_app, render_template, flash, redirec
 from sqlalchemy.orm import joinedload
 from .. import lost_and_found
 from app.decorators import login_required
-from app.lost_and_found.models import Item, Report, User, Notification, Claim
+from app.replicas import replica_reads
+from app.lost_and_found.models import Item, Report, User, Claim
+from app.lost_and_found.notifier import notify
 from app import db
 from datetime import datetime
 from sqlalchemy.orm import joinedload
@@ -64,18 +66,8 @@ def report_found_item(user, item_id):
             db.session.flush()
             
             # Create notification for reporter - include claimant's info
-            notification_message = f"{claimant_user.name} found your lost item '{item.name}'. "
-            
-            # Add claimant contact info to notification
-            
-            notification = Notification(
-                user_id=report.reporter_id,
-                item_id=item_id,
-                claim_id=claim.id,
-                notification_type='claim_request',
-                message=notification_message
-            )
-            db.session.add(notification)
+            notify('lost_item_found', [report.reporter_id], item_id=item_id, claim_id=claim.id,
+                   claimant=claimant_user.name, item=item.name)
             
             db.session.commit()
             
@@ -165,16 +157,8 @@ def claim_item(user, item_id):
         db.session.flush()
         
         # Create notification for reporter - ALWAYS include claimant's name and contact
-        notification_message = f"{claimant_user.name} wants to claim your found item '{item.name}'. "
-        
-        notification = Notification(
-            user_id=report.reporter_id,
-            item_id=item_id,
-            claim_id=claim.id,
-            notification_type='claim_request',
-            message=notification_message
-        )
-        db.session.add(notification)
+        notify('claim_request', [report.reporter_id], item_id=item_id, claim_id=claim.id,
+               claimant=claimant_user.name, item=item.name)
         
         db.session.commit()
         
@@ -243,6 +227,10 @@ def respond_to_claim(user, claim_id):
         if claim.status != 'pending':
             return jsonify({'error': 'Claim is not pending'}), 400
         
+        # Past its expiry but not swept yet
+        if claim.is_expired():
+            return jsonify({'error': 'Claim has expired'}), 400
+        
         item = claim.item
         if not item.reports:
             return jsonify({'error': 'Item report not found'}), 404
@@ -279,16 +267,10 @@ def respond_to_claim(user, claim_id):
                 other_claim.status = 'rejected'
                 other_claim.resolved_at = datetime.utcnow()
                 other_claim.reason = "Another claim was accepted"
-                
-                # Notify other claimants
-                notification = Notification(
-                    user_id=other_claim.claimant_id,
-                    item_id=item.id,
-                    claim_id=other_claim.id,
-                    notification_type='claim_rejected',
-                    message=f"Your claim for item '{item.name}' was rejected because another claim was accepted."
-                )
-                db.session.add(notification)
+            
+            # Notify other claimants
+            notify('claim_superseded', [(other_claim.claimant_id, other_claim.id) for other_claim in other_claims],
+                   item_id=item.id, item=item.name)
             
             # Get reporter's contact info from the report
             reporter_contact_info = report.contact_info if report.contact_info else "Not provided"
@@ -296,35 +278,27 @@ def respond_to_claim(user, claim_id):
             # Check if report is anonymous
             if report.is_anonymous:
                 # For anonymous reports, share the reporter's contact info with claimant
-                notification_message = f"Your claim for item '{item.name}' has been accepted! "
-                notification_message += f"The reporter's contact info: {reporter_contact_info}"
+                claimant_details = f"The reporter's contact info: {reporter_contact_info}"
                 
                 # Also share reporter's name and email (since report was anonymous)
                 reporter_user = User.query.get(claim.reporter_id)
                 if reporter_user:
-                    notification_message += f"\nReporter: {reporter_user.name} ({reporter_user.email})"
+                    claimant_details += f"\nReporter: {reporter_user.name} ({reporter_user.email})"
             else:
                 # For non-anonymous reports, claimant already has contact info
-                notification_message = f"Your claim for item '{item.name}' has been accepted! "
-                notification_message += "Please contact the reporter using the contact information provided in the original report."
+                claimant_details = "Please contact the reporter using the contact information provided in the original report."
             
             # Notify claimant
-            claimant_notification = Notification(
-                user_id=claim.claimant_id,
-                item_id=item.id,
-                claim_id=claim.id,
-                notification_type='claim_accepted',
-                message=notification_message
-            )
-            db.session.add(claimant_notification)
+            notify('claim_accepted', [claim.claimant_id], item_id=item.id, claim_id=claim.id,
+                   item=item.name, details=claimant_details)
             
             # Notify reporter of acceptance
-            reporter_notification_message = f"You accepted the claim for item '{item.name}' by {claim.claimant.name}."
+            reporter_details = ""
             
             # Add claimant's contact info for reporter
             claimant_user = User.query.get(claim.claimant_id)
             if claimant_user:
-                reporter_notification_message += f"\nClaimant contact: {claimant_user.name} ({claimant_user.email})"
+                reporter_details += f"\nClaimant contact: {claimant_user.name} ({claimant_user.email})"
             
             # Check if claimant provided additional contact info in verification answers
             if claim.verification_answers:
@@ -335,18 +309,13 @@ def respond_to_claim(user, claim_id):
                         # Look for contact info in answers
                         for key, value in answers.items():
                             if 'contact' in key.lower() or 'phone' in key.lower() or 'email' in key.lower():
-                                reporter_notification_message += f"\nAdditional contact info: {key}: {value}"
+                                reporter_details += f"\nAdditional contact info: {key}: {value}"
                 except:
                     pass
             
-            reporter_notification = Notification(
-                user_id=claim.reporter_id,
-                item_id=item.id,
-                claim_id=claim.id,
-                notification_type='item_returned' if report.report_type == 'lost' else 'claim_accepted_confirmation',
-                message=reporter_notification_message
-            )
-            db.session.add(reporter_notification)
+            notify('item_returned' if report.report_type == 'lost' else 'claim_accepted_confirmation',
+                   [claim.reporter_id], item_id=item.id, claim_id=claim.id,
+                   item=item.name, claimant=claim.claimant.name, details=reporter_details)
             
             db.session.commit()
             
@@ -361,18 +330,8 @@ def respond_to_claim(user, claim_id):
             claim.reason = reason if reason else "Claim rejected"
             
             # Notify claimant
-            notification_message = f"Your claim for item '{item.name}' was rejected."
-            if reason:
-                notification_message += f" Reason: {reason}"
-            
-            notification = Notification(
-                user_id=claim.claimant_id,
-                item_id=item.id,
-                claim_id=claim.id,
-                notification_type='claim_rejected',
-                message=notification_message
-            )
-            db.session.add(notification)
+            notify('claim_rejected', [claim.claimant_id], item_id=item.id, claim_id=claim.id,
+                   item=item.name, details=f" Reason: {reason}" if reason else "")
             
             db.session.commit()
             
@@ -393,6 +352,7 @@ def respond_to_claim(user, claim_id):
 # ---------- Get User's Claims ---------- #
 @lost_and_found.route("/lost_and_found/api/my_claims", methods=['GET'])
 @login_required
+@replica_reads()
 def get_my_claims(user):
     """
     Get all claims made by or for the current user
@@ -489,14 +449,8 @@ def cancel_claim(user, claim_id):
         claim.reason = "Cancelled by claimant"
         
         # Notify reporter
-        notification = Notification(
-            user_id=claim.reporter_id,
-            item_id=claim.item_id,
-            claim_id=claim.id,
-            notification_type='claim_cancelled',
-            message=f"Claim for item '{claim.item.name}' was cancelled by the claimant."
-        )
-        db.session.add(notification)
+        notify('claim_cancelled', [claim.reporter_id], item_id=claim.item_id, claim_id=claim.id,
+               item=claim.item.name)
         
         db.session.commit()
         
@@ -548,7 +502,7 @@ def claims_management(user):
                 'id': claim.item.id,
                 'name': claim.item.name,
                 'images': [img.to_dict() for img in item_images],  # Store all images
-                'first_image_url': first_image.image_url if first_image else None,  # Store first image URL
+                'first_image_url': first_image.url() if first_image else None,  # Store first image URL
                 'description': claim.item.description,
                 'category_id': claim.item.category_id,
                 'category_name': claim.item.category.name if claim.item.category else None
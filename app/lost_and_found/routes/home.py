@@ -2,9 +2,14 @@ from flask import jsonify, request, render_template, flash, redirect, url_for, m
 from .. import lost_and_found
 from config import Config
 from app.decorators import login_required
-from app.lost_and_found.models import Category, Item, Report, Location, User, Notification
+from app.replicas import replica_reads
+from app.lost_and_found.search import match_items
+from app.lost_and_found.listing import listing_ids_query, load_items, report_matches, text_matches
+from app.lost_and_found.models import Item, Report, User, Notification
+from app.lost_and_found.reference import reference_data
+from app.lost_and_found.autocomplete import fold
 from app import db
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 from datetime import datetime
 from sqlalchemy.orm import joinedload
 
@@ -30,6 +35,35 @@ def lost_and_found_page(user):
     return render_template('lost_and_found.html', user=user)
 
 
+def reference_response(reference, key, build):
+    """
+    JSON response for reference data. The body is serialized once per
+    snapshot, and the snapshot version is the ETag, so a revalidation that
+    still matches gets a 304.
+    """
+    if request.if_none_match.contains(reference.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(reference.serialized(key, build), mimetype='application/json')
+    response.set_etag(reference.etag)
+    response.headers['Cache-Control'] = 'private, max-age={}, stale-while-revalidate={}'.format(
+        current_app.config.get('REFERENCE_MAX_AGE', 60),
+        current_app.config.get('REFERENCE_STALE_WHILE_REVALIDATE', 600)
+    )
+    return response
+
+
+def serialize_reference(rows):
+    return [
+        {
+            'id': row.id,
+            'name': row.name,
+            'description': row.description
+        }
+        for row in rows
+    ]
+
+
 @lost_and_found.route('/lost_and_found/categories', methods=['GET'])
 @login_required
 def get_categories(user):
@@ -37,19 +71,8 @@ def get_categories(user):
     Get all categories for filter dropdown.
     """
     try:
-        categories = Category.query.order_by(Category.name).all()
-        
-        # Return minimal data needed for dropdown
-        serialized_categories = [
-            {
-                'id': category.id,
-                'name': category.name,
-                'description': category.description
-            }
-            for category in categories
-        ]
-        
-        return jsonify(serialized_categories), 200
+        reference = reference_data.get()
+        return reference_response(reference, 'categories', lambda: serialize_reference(reference.categories))
         
     except Exception as e:
         current_app.logger.error(f"Error fetching categories: {str(e)}")
@@ -60,6 +83,7 @@ def get_categories(user):
         
 @lost_and_found.route('/items/search', methods=['POST'])
 @login_required
+@replica_reads(methods=('POST',))
 def search_items(user):
     """
     Alternative search endpoint with POST for complex queries.
@@ -75,7 +99,7 @@ def search_items(user):
             },
             "location_ids": [1, 2]
         },
-        "sort_by": "recent"|"oldest"|"name",
+        "sort_by": "relevance"|"recent"|"oldest"|"name",
         "page": 1,
         "per_page": 12
     }
@@ -88,30 +112,26 @@ def search_items(user):
         # Parse parameters with defaults
         search_text = data.get('search', '').strip()
         filters = data.get('filters', {})
-        sort_by = data.get('sort_by', 'recent')
+        sort_by = data.get('sort_by', 'relevance' if search_text else 'recent')
         page = data.get('page', 1)
         per_page = data.get('per_page', 12)
         
-        # Build query
-        query = Item.query.join(Report).outerjoin(Location)
-        
-        # Apply text search
-        if search_text:
-            search_term = f"%{search_text}%"
-            query = query.filter(
-                or_(
-                    Item.name.ilike(search_term),
-                    Item.description.ilike(search_term),
-                    Report.additional_details.ilike(search_term)
-                )
-            )
-        
-        # Apply status filter
+        # Filter, sort and paginate over item ids only; nothing here multiplies rows
         status = filters.get('status')
         if status in ['lost', 'found']:
-            query = query.filter(Item.status == status)
+            query = db.session.query(Item.id, Item.created_at).filter(Item.status == status)
         else:
-            query = query.filter(Item.status.in_(['lost', 'found']))
+            query = listing_ids_query()
+        
+        # Apply text search
+        matches = None
+        if search_text:
+            matches = match_items(search_text)
+            if matches is not None:
+                query = query.join(matches, Item.id == matches.c.item_id)
+            else:
+                # No full-text index on this database
+                query = query.filter(text_matches(f"%{search_text}%"))
         
         # Apply category filter
         category_ids = filters.get('category_ids', [])
@@ -139,26 +159,23 @@ def search_items(user):
         # Apply location filter
         location_ids = filters.get('location_ids', [])
         if location_ids:
-            query = query.filter(Report.location_id.in_(location_ids))
+            query = query.filter(report_matches(Report.location_id.in_(location_ids)))
         
-        # Apply sorting
-        if sort_by == 'oldest':
-            query = query.order_by(Item.created_at.asc())
+        # Apply sorting (id breaks ties so pages never overlap)
+        if sort_by == 'relevance' and matches is not None:
+            query = query.order_by(matches.c.rank.asc(), Item.created_at.desc(), Item.id.desc())
+        elif sort_by == 'oldest':
+            query = query.order_by(Item.created_at.asc(), Item.id.asc())
         elif sort_by == 'name':
-            query = query.order_by(Item.name.asc())
+            query = query.order_by(Item.name.asc(), Item.id.asc())
         else:  # default: recent
-            query = query.order_by(Item.created_at.desc())
+            query = query.order_by(Item.created_at.desc(), Item.id.desc())
         
         # Paginate
         paginated = query.paginate(page=page, per_page=per_page, error_out=False)
         
-        # Serialize results
-
-        items = []
-        for item in paginated.items:
-            if item.status not in ['lost', 'found']:
-                continue
-            items.append(item.to_dict())
+        # Load the page's items and their collections in a fixed number of queries
+        items = [item.to_dict(image_rendition='card') for item in load_items([row.id for row in paginated.items])]
         return jsonify({
             'items': items,
             'has_more': paginated.has_next,
@@ -178,25 +195,14 @@ def get_locations(user):
     """
     try:
         search = request.args.get('search', '').strip()
+        reference = reference_data.get()
         
-        query = Location.query
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(Location.name.ilike(search_term))
-        
-        locations = query.order_by(Location.name).limit(20).all()
-        
-        serialized_locations = [
-            {
-                'id': loc.id,
-                'name': loc.name,
-                'description': loc.description
-            }
-            for loc in locations
-        ]
-        
-        return jsonify(serialized_locations), 200
+        # Prefix search over the in-memory index; an empty search lists the first 20
+        return reference_response(
+            reference,
+            ('locations', fold(search)),
+            lambda: serialize_reference(reference.location_index.search(search))
+        )
         
     except Exception as e:
         current_app.logger.error(f"Error fetching locations: {str(e)}")
@@ -204,6 +210,7 @@ def get_locations(user):
 
 @lost_and_found.route("/lost_and_found/item", methods=['GET'])
 @login_required
+@replica_reads()
 def item(user):
     try:
         item_id = request.args.get('id')
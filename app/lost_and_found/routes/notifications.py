@@ -1,51 +1,81 @@
-from sqlalchemy import desc
-from flask import jsonify, current_app
+import json
+import time
+from sqlalchemy import desc, update
+from flask import jsonify, current_app, request
 from .. import lost_and_found
 from app.decorators import login_required
+from app.replicas import replica_reads
 from app.lost_and_found.models import Notification
-from app import db
+from app.lost_and_found.notification_sync import bump, get_stats, get_sync_state
+from app import db, event_hub
+
+NOTIFICATIONS_LIMIT = 50  # most recent notifications sent in a full sync
+
+
 # ---------- Notifications ---------- #
+def notification_payload(notification):
+    """Notification as sent to the client, with the link it opens"""
+    notification_dict = notification.to_dict()
+    
+    # Add link based on notification type
+    if notification.notification_type == 'claim_request' and notification.claim_id:
+        notification_dict['link'] = f"/lost_and_found/claims/manage?claim_id={notification.claim_id}"
+    elif notification.notification_type == 'claim_request_anonymous' and notification.claim_id:
+        notification_dict['link'] = f"/lost_and_found/claims/manage?claim_id={notification.claim_id}"
+    elif notification.item_id:
+        notification_dict['link'] = f"/lost_and_found/item?id={notification.item_id}"
+    else:
+        notification_dict['link'] = ""
+    
+    return notification_dict
+
+
 @lost_and_found.route("/lost_and_found/api/notifications", methods=['GET'])
 @login_required
+@replica_reads()
 def get_notifications(user):
     """
-    Get all notifications for the current user
+    Get the current user's notifications.
+
+    `since` (a previous sync_token) returns only notifications created or
+    changed after it, unless some were deleted since; `If-None-Match` with the last ETag returns 304 when
+    nothing changed at all.
     """
     try:
-        # Get notifications for the user, ordered by most recent
-        notifications = Notification.query.filter_by(
-            user_id=user['id']
-        ).order_by(
-            desc(Notification.created_at)
-        ).limit(50).all()  # Limit to 50 most recent notifications
-        
-        # Count unread notifications
-        unread_count = Notification.query.filter_by(
-            user_id=user['id'],
-            is_read=False
-        ).count()
+        unread_count, version, removed_version = get_sync_state(user['id'])
+        etag = f"n{user['id']}-{version}"
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
         
-        # Prepare notifications data
-        notifications_data = []
-        for notification in notifications:
-            notification_dict = notification.to_dict()
-            
-            # Add link based on notification type
-            if notification.notification_type == 'claim_request' and notification.claim_id:
-                notification_dict['link'] = f"/lost_and_found/claims/manage?claim_id={notification.claim_id}"
-            elif notification.notification_type == 'claim_request_anonymous' and notification.claim_id:
-                notification_dict['link'] = f"/lost_and_found/claims/manage?claim_id={notification.claim_id}"
-            elif notification.item_id:
-                notification_dict['link'] = f"/lost_and_found/item?id={notification.item_id}"
-            else:
-                notification_dict['link'] = ""
-            
-            notifications_data.append(notification_dict)
+        since = request.args.get('since', type=int)
+        query = Notification.query.filter_by(user_id=user['id'])
+        full = since is None or since > version or since < removed_version
+        if since == version:
+            notifications = []
+        elif not full:
+            # Only what changed; too many changes and the client is better off with the full list
+            changed = query.filter(Notification.version > since).order_by(
+                desc(Notification.created_at)
+            ).limit(NOTIFICATIONS_LIMIT + 1).all()
+            full = len(changed) > NOTIFICATIONS_LIMIT
+            notifications = changed
+        if full:
+            notifications = query.order_by(
+                desc(Notification.created_at)
+            ).limit(NOTIFICATIONS_LIMIT).all()
         
-        return jsonify({
-            'notifications': notifications_data,
-            'unread_count': unread_count
-        }), 200
+        response = jsonify({
+            'notifications': [notification_payload(notification) for notification in notifications],
+            'unread_count': unread_count,
+            'sync_token': version,
+            'full': full
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response, 200
         
     except Exception as e:
         current_app.logger.exception(f"Error getting notifications: {str(e)}")
@@ -59,22 +89,31 @@ def mark_notification_as_read(user, notification_id):
     Mark a single notification as read
     """
     try:
-        notification = Notification.query.filter_by(
-            id=notification_id,
-            user_id=user['id']
-        ).first()
+        is_read = db.session.scalar(
+            db.select(Notification.is_read).where(
+                Notification.id == notification_id,
+                Notification.user_id == user['id']
+            )
+        )
         
-        if not notification:
+        if is_read is None:
             return jsonify({'error': 'Notification not found'}), 404
         
-        notification.is_read = True
-        db.session.commit()
+        if not is_read:
+            # Conditional update: when another request got there first, the counter is left alone
+            version = bump(db.session, user['id'], unread_delta=-1)
+            marked = db.session.execute(
+                update(Notification)
+                .where(Notification.id == notification_id, Notification.is_read.is_(False))
+                .values(is_read=True, version=version)
+            ).rowcount
+            if marked:
+                db.session.commit()
+            else:
+                db.session.rollback()
         
         # Return updated unread count
-        unread_count = Notification.query.filter_by(
-            user_id=user['id'],
-            is_read=False
-        ).count()
+        unread_count, _ = get_stats(user['id'])
         
         return jsonify({
             'success': True,
@@ -94,11 +133,12 @@ def mark_all_notifications_as_read(user):
     Mark all notifications as read for the current user
     """
     try:
-        # Update all unread notifications for this user
+        # Update all unread notifications for this user (a bulk update skips the flush hook)
+        version = bump(db.session, user['id'], unread=0)
         Notification.query.filter_by(
             user_id=user['id'],
             is_read=False
-        ).update({'is_read': True})
+        ).update({'is_read': True, 'version': version}, synchronize_session=False)
         
         db.session.commit()
         
@@ -120,10 +160,7 @@ def get_notification_count(user):
     Get only the count of unread notifications (for polling)
     """
     try:
-        unread_count = Notification.query.filter_by(
-            user_id=user['id'],
-            is_read=False
-        ).count()
+        unread_count, _ = get_stats(user['id'])
         
         return jsonify({
             'unread_count': unread_count
@@ -131,4 +168,43 @@ def get_notification_count(user):
         
     except Exception as e:
         current_app.logger.exception(f"Error getting notification count: {str(e)}")
-        return jsonify({'error': 'Failed to get notification count'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to get notification count'}), 500
+
+
+@lost_and_found.route("/lost_and_found/api/notifications/stream", methods=['GET'])
+@login_required
+def notification_stream(user):
+    """
+    Server-Sent Events stream of the current user's notification events
+    """
+    subscription = event_hub.subscribe(user['id'])
+    if subscription is None:
+        # Every stream slot of this worker is taken; the client polls instead
+        return jsonify({'error': 'Too many open streams'}), 503
+
+    heartbeat = current_app.config.get('EVENTS_HEARTBEAT', 15)
+    max_age = current_app.config.get('EVENTS_STREAM_MAX_AGE', 300)
+
+    def generate():
+        yield f"retry: {heartbeat * 1000}\n\n"
+        deadline = time.monotonic() + max_age
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Ending the stream makes the browser reconnect, spreading tabs over the workers
+                return
+            message = subscription.get(timeout=min(heartbeat, remaining))
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield "event: resync\ndata: {}\n\n"
+            if message is None:
+                # Also how a closed connection gets noticed
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {message['event']}\ndata: {json.dumps(message['data'])}\n\n"
+
+    response = current_app.response_class(generate(), mimetype='text/event-stream')
+    response.call_on_close(subscription.close)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
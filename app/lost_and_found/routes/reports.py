@@ -1,18 +1,21 @@
 from flask import render_template, request, redirect, url_for, flash, jsonify, make_response, current_app
-from werkzeug.utils import secure_filename
 from app.lost_and_found import lost_and_found
-from config import Config
 from app.decorators import login_required
-from app.lost_and_found.models import Category, Location, Item, ItemImage, Report, VerificationQuestion, Claim
-from app import db
+from app.replicas import replica_reads
+from app.lost_and_found.models import Item, ItemImage, Report, VerificationQuestion, Claim
+from app import db, event_hub
 from datetime import datetime, timedelta
 from app.functions import allowed_file, log_action
 import os
-import uuid
 from app.constants import NAME_LIMIT, DESCRIPTION_LIMIT, REPORT_TYPES
 from app.lost_and_found.forms import ReportItemForm
-from sqlalchemy import or_, func
-from PIL import Image
+from app.lost_and_found.search import match_items
+from app.lost_and_found.pagination import keyset_page
+from app.lost_and_found.images import InvalidImageError, check_image, rendition_files
+from app.lost_and_found.image_jobs import run_inline, stage_upload
+from app.lost_and_found.listing import listing_ids_query, load_items, location_matches, text_matches
+from app.lost_and_found.reference import reference_data
+from sqlalchemy import func
 
 @lost_and_found.route('/report/new', methods=['GET'])
 @login_required
@@ -20,8 +23,9 @@ def new_report(user):
     """Render the multi-step report form"""
     form = ReportItemForm()
     try:
-        form.category_id.choices = [(c.id, c.name) for c in Category.query.all()]
-        form.location_id.choices = [(l.id, l.name) for l in Location.query.all()]
+        reference = reference_data.get()
+        form.category_id.choices = reference.category_choices
+        form.location_id.choices = reference.location_choices
     except Exception as e:
         current_app.logger.error(f"Failed to load categories/locations: {e}")
         flash("Failed to load form data. Please try again.", "danger")
@@ -31,6 +35,7 @@ def new_report(user):
 
 @lost_and_found.route('/lost_and_found/api', methods=['POST', 'GET', 'PUT', 'DELETE'])
 @login_required
+@replica_reads()
 def report_item(user):
     if request.method == 'POST':
         # Use request.form AND request.files for form data
@@ -38,8 +43,9 @@ def report_item(user):
         
         # Set choices for category field (must be done before validation)
         try:
-            form.category_id.choices = [(category.id, category.name) for category in Category.query.all()]
-            form.location_id.choices = [(l.id, l.name) for l in Location.query.all()]
+            reference = reference_data.get()
+            form.category_id.choices = reference.category_choices
+            form.location_id.choices = reference.location_choices
         except Exception:
             current_app.logger.exception("Failed to load categories or locations for ReportItemForm")
             flash("An error occurred while preparing the form. Please try again.", "danger")
@@ -81,16 +87,12 @@ def report_item(user):
                 return render_template('report_form.html', form=form, user=user)
 
             # Category validation
-            categories = Category.query.all()
-            category_ids = [category.id for category in categories]
-            if form.category_id.data not in category_ids:
+            if form.category_id.data not in reference.category_ids:
                 flash("Invalid category", "danger")
                 return render_template('report_form.html', form=form, user=user)
             
             # Location validation
-            locations = Location.query.all()
-            location_ids = [location.id for location in locations]
-            if form.location_id.data and form.location_id.data not in location_ids:
+            if form.location_id.data and form.location_id.data not in reference.location_ids:
                 flash("Invalid location", "danger")
                 return render_template('report_form.html', form=form, user=user)
 
@@ -105,6 +107,32 @@ def report_item(user):
                 flash("You can upload a maximum of 5 images", "danger")
                 return render_template('report_form.html', form=form, user=user)
 
+            # Check for lost reports - cannot be anonymous
+            if form.report_type.data == 'lost' and form.is_anonymous.data:
+                flash("Lost reports cannot be anonymous", "danger")
+                return render_template('report_form.html', form=form, user=user)
+            
+            # Check contact info requirements
+            if form.report_type.data == 'lost' and not form.contact_info.data:
+                flash("Contact info is required for lost reports", "danger")
+                return render_template('report_form.html', form=form, user=user)
+
+            image_files = []
+            for image_file in request.files.getlist('images'):
+                if image_file and image_file.filename:
+                    if not allowed_file(image_file.filename):
+                        flash("Invalid file type", "danger")
+                        continue
+                    try:
+                        check_image(image_file)
+                    except InvalidImageError:
+                        flash(f"{image_file.filename} is not a valid image", "danger")
+                        return render_template('report_form.html', form=form, user=user)
+                    image_files.append(image_file)
+
+            # Everything below is one unit of work: ids come from flush, the
+            # audit rows ride in the same transaction and there is a single commit
+
             # ===== CREATE ITEM =====
             
             new_item = Item(
@@ -121,44 +149,17 @@ def report_item(user):
                 new_item.found_at = form.event_datetime.data or datetime.now()
             
             db.session.add(new_item)
-            db.session.commit()
-            log_action(user['id'], 'items', new_item.id, 'create', changes=f"Item {new_item.name} created.")
+            db.session.flush()
 
             # ===== HANDLE IMAGES =====
             
-            for image_file in request.files.getlist('images'):
-                if image_file and image_file.filename:
-                    if not allowed_file(image_file.filename):
-                        flash("Invalid file type", "danger")
-                        continue
-
-                    original_filename = secure_filename(image_file.filename)
-                    file_extension = os.path.splitext(original_filename)[1]
-                    unique_filename = str(uuid.uuid4()) + file_extension
-                    image_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-                    image_file.save(image_path)
-
-                    # Create a new ItemImage entry for each uploaded image
-                    new_image = ItemImage(
-                        item_id=new_item.id,
-                        image_url=image_path,
-                    )
-                    db.session.add(new_image)
-                    db.session.commit()
-                    log_action(user['id'], 'item_images', new_image.id, 'create', changes=f"Image for item {new_item.name} added.")
+            new_images = []
+            for image_file in image_files:
+                # Stored by content hash; renditions are made by the image worker
+                new_images.append(stage_upload(image_file, new_item.id))
 
             # ===== CREATE REPORT =====
             
-            # Check for lost reports - cannot be anonymous
-            if form.report_type.data == 'lost' and form.is_anonymous.data:
-                flash("Lost reports cannot be anonymous", "danger")
-                return render_template('report_form.html', form=form, user=user)
-            
-            # Check contact info requirements
-            if form.report_type.data == 'lost' and not form.contact_info.data:
-                flash("Contact info is required for lost reports", "danger")
-                return render_template('report_form.html', form=form, user=user)
-            
             current_app.logger.info("Creating report with contact info: %s", form.contact_info.data)
             
             new_report = Report(
@@ -173,26 +174,38 @@ def report_item(user):
                 contact_info=form.contact_info.data 
             )
             db.session.add(new_report)
-            db.session.commit()
-            log_action(user['id'], 'reports', new_report.id, 'create', changes=f"Report for item {new_item.name} created.")
+            db.session.flush()
             
             # ===== CREATE VERIFICATION QUESTION =====
             
             # Only for found reports (not lost)
+            verification_question = None
             if form.report_type.data == 'found' and form.verification_question.data:
                 verification_question = VerificationQuestion(
                     report_id=new_report.id,
                     question=form.verification_question.data
                 )
                 db.session.add(verification_question)
-                db.session.commit()
-                log_action(user['id'], 'verification_questions', verification_question.id, 'create', changes=f"Verification question for item {new_item.name} created.")
+                db.session.flush()
+
+            # ===== AUDIT + COMMIT =====
+
+            log_action(user['id'], 'items', new_item.id, 'create', changes=f"Item {new_item.name} created.", commit=False)
+            for new_image in new_images:
+                log_action(user['id'], 'item_images', new_image.id, 'create', changes=f"Image for item {new_item.name} added.", commit=False)
+            log_action(user['id'], 'reports', new_report.id, 'create', changes=f"Report for item {new_item.name} created.", commit=False)
+            if verification_question:
+                log_action(user['id'], 'verification_questions', verification_question.id, 'create', changes=f"Verification question for item {new_item.name} created.", commit=False)
+
+            db.session.commit()
+            run_inline()
 
             flash("Report successfully submitted", "success")
             return redirect(url_for('lost_and_found.lost_and_found_page', show=form.report_type.data.lower()))
 
         except Exception as e:
             current_app.logger.exception("Failed while processing report_item POST")
+            # Uploads already in the blob store stay unreferenced; `flask storage gc` sweeps them
             db.session.rollback()
             flash(f"An error occurred: {str(e)}", "danger")
             return render_template('report_form.html', form=form, user=user)
@@ -223,14 +236,18 @@ def report_item(user):
             image_urls = []
             
             if item:
-                # Get images and extract URLs before any deletion
+                # Get images and extract URLs before any deletion. Blob-backed images
+                # only drop a reference here; the files go when the GC finds them unused
                 images_to_delete = ItemImage.query.filter_by(item_id=item.id).all()
-                image_urls = [img.image_url for img in images_to_delete]
+                image_urls = [path for img in images_to_delete if not img.blob_hash
+                              for path in rendition_files(img.image_url)]
                 
                 # Delete all claims for this item
                 claims_to_delete = Claim.query.filter_by(item_id=item.id).all()
                 for claim in claims_to_delete:
                     db.session.delete(claim)
+                    # Open claims pages of the claimant drop the claim
+                    event_hub.publish(claim.claimant_id, 'claims', {'item_id': item.id}, session=db.session)
                 for image in images_to_delete:
                     db.session.delete(image)
             
@@ -268,7 +285,9 @@ def report_item(user):
         # This part looks mostly correct, but need to update for new fields
         try:
             # Parse query parameters with defaults
-            page = request.args.get('page', 1, type=int)
+            cursor = request.args.get('cursor', '').strip()
+            page = request.args.get('page', 1, type=int)  # legacy offset paging
+            include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
             per_page = request.args.get('per_page', 12, type=int)
             search_text = request.args.get('search', '').strip()
             status_filter = request.args.get('status', '').strip()
@@ -284,41 +303,20 @@ def report_item(user):
             if per_page > 100:
                 per_page = 100
             
-            # Start building the query
-            query = Item.query
-            
-            # Join necessary tables for filtering and eager loading
-            query = query.join(Report, Item.id == Report.item_id)
-            query = query.outerjoin(Location, Report.location_id == Location.id)
-            query = query.join(Category, Item.category_id == Category.id)
-            query = query.outerjoin(ItemImage, Item.id == ItemImage.item_id)
-            
-            # Eager load relationships to prevent N+1 queries
-            query = query.options(
-                db.joinedload(Item.reporter),
-                db.joinedload(Item.claimed_by),
-                db.joinedload(Item.found_by),
-                db.joinedload(Item.category),
-                db.joinedload(Item.images),
-                db.joinedload(Item.reports).joinedload(Report.location)
-            )
+            # Filter and page over item ids only; nothing here multiplies rows
+            if status_filter in ['lost', 'found']:
+                query = db.session.query(Item.id, Item.created_at).filter(Item.status == status_filter)
+            else:
+                query = listing_ids_query()
             
             # Apply text search if provided
             if search_text:
-                search_term = f"%{search_text}%"
-                query = query.filter(
-                    or_(
-                        Item.name.ilike(search_term),
-                        Item.description.ilike(search_term),
-                        Report.additional_details.ilike(search_term),
-                        Location.name.ilike(search_term),
-                        Report.specific_spot.ilike(search_term)
-                    )
-                )
-            
-            # Apply status filter (now includes more statuses)
-            if status_filter in ['lost', 'found']:
-                query = query.filter(Item.status == status_filter)
+                matches = match_items(search_text)
+                if matches is not None:
+                    query = query.join(matches, Item.id == matches.c.item_id)
+                else:
+                    # No full-text index on this database
+                    query = query.filter(text_matches(f"%{search_text}%"))
             
             # Apply category filter
             if category_filter and category_filter.isdigit():
@@ -334,26 +332,28 @@ def report_item(user):
                         
             # Apply location filter
             if location_filter:
-                location_term = f"%{location_filter}%"
-                query = query.filter(
-                    or_(
-                        Location.name.ilike(location_term),
-                        Report.specific_spot.ilike(location_term)
-                    )
-                )
+                query = query.filter(location_matches(f"%{location_filter}%"))
             
-            # Order by most recent first
-            query = query.order_by(Item.created_at.desc())
+            # Counting the whole filtered set is the expensive part, so only on request
+            total = query.order_by(None).count() if include_total else None
+
+            # Keyset pagination on (created_at, id), newest first
+            try:
+                page_rows, next_cursor = keyset_page(
+                    query, Item.created_at, Item.id, cursor, per_page,
+                    db.session.get_bind().dialect.name,
+                    offset=(page - 1) * per_page
+                )
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
             
-            # Apply pagination
-            items = query.paginate(page=page, per_page=per_page, error_out=False)
+            # Load the page's items and their collections in a fixed number of queries
+            page_items = load_items([row.id for row in page_rows])
             
             # Serialize items
             serialized_items = []
-            for item in items.items:
-                if item.status not in ['lost', 'found']:
-                    continue
-                item_dict = item.to_dict()
+            for item in page_items:
+                item_dict = item.to_dict(image_rendition='card')
                 
                 # Add location_name from the first report
                 if item.reports:
@@ -380,12 +380,12 @@ def report_item(user):
             # Build response
             response = {
                 'items': serialized_items,
-                'has_more': items.has_next,
-                'total': items.total,
-                'page': items.page,
-                'pages': items.pages,
-                'per_page': items.per_page
+                'has_more': next_cursor is not None,
+                'next_cursor': next_cursor,
+                'per_page': per_page
             }
+            if include_total:
+                response['total'] = total
             
             return jsonify(response), 200
             
@@ -422,11 +422,9 @@ def update_report(user):
         form = ReportItemForm()
         
         # Populate choices for validation
-        categories = Category.query.all()
-        form.category_id.choices = [(c.id, c.name) for c in categories]
-        
-        locations = Location.query.all()
-        form.location_id.choices = [(l.id, l.name) for l in locations]
+        reference = reference_data.get()
+        form.category_id.choices = reference.category_choices
+        form.location_id.choices = reference.location_choices
         
         # Get report type from form or use existing
         report_type = request.form.get('report_type', report.report_type)
@@ -454,8 +452,7 @@ def update_report(user):
                                  report=report)
 
         # Category validation
-        category_ids = [category.id for category in categories]
-        if form.category_id.data not in category_ids:
+        if form.category_id.data not in reference.category_ids:
             flash("Invalid category", "danger")
             return render_template('lost_and_found/_edit_form_fields.html', 
                                  form=form, 
@@ -463,8 +460,7 @@ def update_report(user):
 
         # Location validation
         if form.location_id.data:
-            location_ids = [location.id for location in locations]
-            if form.location_id.data not in location_ids:
+            if form.location_id.data not in reference.location_ids:
                 flash("Invalid location", "danger")
                 return render_template('lost_and_found/_edit_form_fields.html', 
                                      form=form, 
@@ -507,34 +503,27 @@ def update_report(user):
             ).all()
             
             for image in images_to_remove:
-                # Store relative path for cleanup
-                
-                removed_image_urls.append(image.image_url)
+                # Files of blob-backed images are shared and left to the GC
+                if not image.blob_hash:
+                    removed_image_urls.extend(rendition_files(image.image_url))
                 db.session.delete(image)
         
         # ===== HANDLE NEW IMAGE UPLOADS =====
         
-        uploaded_files = []
+        new_images = []
         for image_file in request.files.getlist('images'):
                 if image_file and image_file.filename:
                     if not allowed_file(image_file.filename):
                         flash("Invalid file type", "danger")
                         continue
+                    try:
+                        check_image(image_file)
+                    except InvalidImageError:
+                        flash(f"{image_file.filename} is not a valid image", "danger")
+                        continue
 
-                    original_filename = secure_filename(image_file.filename)
-                    file_extension = os.path.splitext(original_filename)[1]
-                    unique_filename = str(uuid.uuid4()) + file_extension
-                    image_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-                    image_file.save(image_path)
-
-                    # Create a new ItemImage entry for each uploaded image
-                    new_image = ItemImage(
-                        item_id=report.item_id,
-                        image_url=image_path,
-                    )
-                    db.session.add(new_image)
-                    db.session.commit()
-                    log_action(user['id'], 'item_images', new_image.id, 'create', changes=f"Image for item {report.item.name} added.")
+                    # Stored by content hash; renditions are made by the image worker
+                    new_images.append(stage_upload(image_file, report.item_id))
         
         # ===== UPDATE REPORT DATA =====
         
@@ -580,8 +569,15 @@ def update_report(user):
         report.updated_at = datetime.now()
         report.item.updated_at = datetime.now()
         
+        # Image ids come from flush so their audit rows share the commit
+        db.session.flush()
+        for new_image in new_images:
+            log_action(user['id'], 'item_images', new_image.id, 'create', changes=f"Image for item {report.item.name} added.", commit=False)
+        log_action(user['id'], 'reports', report.id, 'update', changes=f"Report for item {report.item.name} updated.", commit=False)
+        
         # SINGLE COMMIT FOR ALL DATABASE CHANGES
         db.session.commit()
+        run_inline()
         
         # CLEAN UP REMOVED IMAGE FILES AFTER SUCCESSFUL COMMIT
         for image_path in removed_image_urls:
@@ -590,8 +586,6 @@ def update_report(user):
                     os.remove(image_path)
             except OSError as e:
                 current_app.logger.error(f"Failed to delete image file {image_path}: {e}")
-                
-        log_action(user['id'], 'reports', report.id, 'update', changes=f"Report for item {report.item.name} updated.")
         
         flash('Report updated successfully!', 'success')
         return redirect(url_for('main.profile'))
@@ -600,15 +594,6 @@ def update_report(user):
         db.session.rollback()
         current_app.logger.error(f"Error updating report {report.id if report else 'unknown'}: {str(e)}")
         
-        # CLEAN UP ANY UPLOADED FILES ON ERROR
-        if 'uploaded_files' in locals():
-            for file_path in uploaded_files:
-                try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                except OSError as cleanup_error:
-                    current_app.logger.error(f"Failed to cleanup uploaded file {file_path}: {cleanup_error}")
-        
         flash('An error occurred while updating the report', 'error')
         return redirect(url_for('main.profile'))
 
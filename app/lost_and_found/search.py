@@ -0,0 +1,218 @@
+# app/lost_and_found/search.py
+"""
+Full-text search over items.
+
+Each item gets one search document made of its name, description and the text
+of its reports (details, specific spot, location name).
+
+    SQLite     - an FTS5 virtual table `items_fts` whose rowid is the item id
+    PostgreSQL - a weighted tsvector column `items.search_vector` with a GIN index
+
+Both are created by the migration. The index is kept in sync from a session
+`after_flush` hook, so it is written in the same transaction as the change
+that caused it. When neither index exists, `match_items` returns None and
+callers fall back to ILIKE filtering.
+"""
+import re
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import Float, Integer, event, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app import db
+from app.lost_and_found.models import Item, Location, Report
+
+FTS_TABLE = 'items_fts'
+REINDEX_BATCH_SIZE = 500
+
+# Per-column weights: name matters most, then description, then report text
+FTS5_RANK = f"bm25({FTS_TABLE}, 10.0, 4.0, 1.0)"
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', :name), 'A') || "
+    "setweight(to_tsvector('simple', :description), 'B') || "
+    "setweight(to_tsvector('simple', :details), 'C')"
+)
+
+# Query operator words, dropped from searches: every word is required, so
+# "wallet OR keys" would otherwise also require a word starting with "or"
+OPERATOR_WORDS = {'and', 'or', 'not', 'near'}
+
+# Detected once per database: 'fts5', 'postgres' or None
+_backends = {}
+
+
+def search_backend(conn):
+    url = str(conn.engine.url)
+    if url not in _backends:
+        backend = None
+        if conn.dialect.name == 'sqlite':
+            found = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first()
+            backend = 'fts5' if found else None
+        elif conn.dialect.name == 'postgresql':
+            columns = {c['name'] for c in inspect(conn).get_columns('items')}
+            backend = 'postgres' if 'search_vector' in columns else None
+        _backends[url] = backend
+    return _backends[url]
+
+
+def _tokens(search_text):
+    tokens = re.findall(r'\w+', search_text or '', re.UNICODE)
+    words = [token for token in tokens if token.lower() not in OPERATOR_WORDS]
+    # A search for just "or" (or "NOT") is still a search for that word
+    return words or tokens
+
+
+def match_items(search_text):
+    """
+    Return a subquery of (item_id, rank) for items matching every word of
+    `search_text` (as prefixes), lower rank meaning more relevant. Returns
+    None when no full-text index is available.
+    """
+    conn = db.session.connection()
+    backend = search_backend(conn)
+    if backend is None:
+        return None
+
+    tokens = _tokens(search_text)
+    if not tokens:
+        # Nothing searchable (e.g. only punctuation): match no items
+        stmt = text("SELECT 0 AS item_id, 0.0 AS rank WHERE 1 = 0")
+        return stmt.columns(item_id=Integer, rank=Float).subquery('search_matches')
+
+    if backend == 'fts5':
+        # Quote every token so user input can't inject FTS5 query syntax
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        stmt = text(
+            f"SELECT rowid AS item_id, {FTS5_RANK} AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query"
+        )
+    else:
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        stmt = text(
+            "SELECT id AS item_id, -ts_rank(search_vector, q) AS rank "
+            "FROM items, to_tsquery('simple', :query) AS q "
+            "WHERE search_vector @@ q"
+        )
+    return stmt.bindparams(query=query).columns(item_id=Integer, rank=Float).subquery('search_matches')
+
+
+# ---------- Indexing ---------- #
+
+def _documents(conn, item_ids):
+    """Build {item_id: (name, description, details)} for the given items"""
+    docs = {}
+    rows = conn.execute(
+        select(Item.id, Item.name, Item.description).where(Item.id.in_(item_ids))
+    )
+    for item_id, name, description in rows:
+        docs[item_id] = [name or '', description or '', []]
+
+    rows = conn.execute(
+        select(Report.item_id, Report.additional_details, Report.specific_spot, Location.name)
+        .outerjoin(Location, Report.location_id == Location.id)
+        .where(Report.item_id.in_(item_ids))
+    )
+    for item_id, details, spot, location_name in rows:
+        if item_id in docs:
+            docs[item_id][2].extend(part for part in (details, spot, location_name) if part)
+
+    return {item_id: (name, description, ' '.join(details)) for item_id, (name, description, details) in docs.items()}
+
+
+def reindex_items(conn, item_ids):
+    """Rewrite the search documents of `item_ids` (deleted items are dropped)"""
+    backend = search_backend(conn)
+    item_ids = list(item_ids)
+    if backend is None or not item_ids:
+        return
+
+    docs = _documents(conn, item_ids)
+    if backend == 'fts5':
+        conn.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :item_id"),
+            [{'item_id': item_id} for item_id in item_ids]
+        )
+        if docs:
+            conn.execute(
+                text(f"INSERT INTO {FTS_TABLE} (rowid, name, description, details) "
+                     "VALUES (:item_id, :name, :description, :details)"),
+                [{'item_id': item_id, 'name': name, 'description': description, 'details': details}
+                 for item_id, (name, description, details) in docs.items()]
+            )
+    elif docs:
+        conn.execute(
+            text(f"UPDATE items SET search_vector = {PG_DOCUMENT} WHERE id = :item_id"),
+            [{'item_id': item_id, 'name': name, 'description': description, 'details': details}
+             for item_id, (name, description, details) in docs.items()]
+        )
+
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    item_ids = set()
+
+    for obj in session.new:
+        if isinstance(obj, Item):
+            item_ids.add(obj.id)
+        elif isinstance(obj, Report):
+            item_ids.add(obj.item_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Item) and _changed(obj, 'name', 'description'):
+            item_ids.add(obj.id)
+        elif isinstance(obj, Report) and _changed(obj, 'additional_details', 'specific_spot', 'location_id', 'item_id'):
+            item_ids.add(obj.item_id)
+            item_ids.update(inspect(obj).attrs.item_id.history.deleted)
+        elif isinstance(obj, Location) and _changed(obj, 'name'):
+            item_ids.update(
+                row.item_id for row in session.connection().execute(
+                    select(Report.item_id).where(Report.location_id == obj.id)
+                )
+            )
+
+    for obj in session.deleted:
+        if isinstance(obj, Item):
+            item_ids.add(obj.id)
+        elif isinstance(obj, Report):
+            item_ids.add(obj.item_id)
+
+    item_ids.discard(None)
+    if item_ids:
+        reindex_items(session.connection(), item_ids)
+
+
+# ---------- CLI ---------- #
+
+search_cli = AppGroup('search', help='Manage the item full-text search index.')
+
+
+@search_cli.command('reindex')
+def reindex_command():
+    """Rebuild the search document of every item."""
+    conn = db.session.connection()
+    if search_backend(conn) is None:
+        click.echo("No full-text index found; run the database migrations first.")
+        return
+
+    last_id = 0
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(Item.id).where(Item.id > last_id).order_by(Item.id).limit(REINDEX_BATCH_SIZE)
+        ).all()
+        if not ids:
+            break
+        reindex_items(db.session.connection(), ids)
+        db.session.commit()
+        total += len(ids)
+        last_id = ids[-1]
+    click.echo(f"Reindexed {total} item(s).")
@@ -1,8 +1,11 @@
 from flask import render_template, flash, redirect, url_for, current_app
 from app.decorators import login_required
+from app.replicas import replica_reads
 from . import main
-from app.lost_and_found.models import Report, Item, Category, Location, VerificationQuestion
+from app.lost_and_found.models import Report, Item, VerificationQuestion
+from app.lost_and_found.reference import reference_data
 from app.lost_and_found.forms import ReportItemForm
+from app.auth.models import User
 from flask import request, jsonify, make_response
 
 
@@ -13,16 +16,13 @@ def index():
 
 @main.route('/profile')
 @login_required
+@replica_reads()
 def profile(user):
     try:
         
         reports = Report.query.filter_by(reporter_id=user['id']).all()
         current_app.logger.info("Fetched %d reports for user ID %s", len(reports), user['id'])
-        items_claimed = Item.query.filter_by(claimed_by_id=user['id']).count()
-        active_items = Item.query.filter_by(
-            reporter_id=user['id'], 
-            claimed_by_id=None
-        ).count()
+        user_stats = User.get_stats(user['id'])
     except (ValueError, TypeError) as e:
         current_app.logger.exception("Invalid user ID in session")
         flash("An error occurred while loading your profile", "danger")
@@ -52,16 +52,18 @@ def profile(user):
 
     stats = {
         'reports': treated,
-        'items_claimed': items_claimed,
-        'active_items': active_items
+        'items_claimed': user_stats['items_claimed'],
+        'active_items': user_stats['active_items']
     }
+    user.update(user_stats)
     form = ReportItemForm()
-    form.category_id.choices = [(category.id, category.name) for category in Category.query.all()]
+    form.category_id.choices = reference_data.get().category_choices
     return render_template('profile.html', user=user, stats=stats, form=form)
 
 
 @main.route('/profile/reports', methods=['GET'])
 @login_required
+@replica_reads()
 def profile_reports(user):
     """
     GET /profile/reports?page=1&page_size=8
@@ -158,11 +160,9 @@ def get_edit_form(user, report_id):
             verification_question=vq.question if vq else ''
         )
         
-        categories = Category.query.all()
-        form.category_id.choices = [(c.id, c.name) for c in categories]
-        
-        locations = Location.query.all()
-        form.location_id.choices = [(l.id, l.name) for l in locations]
+        reference = reference_data.get()
+        form.category_id.choices = reference.category_choices
+        form.location_id.choices = reference.location_choices
         
         return render_template('main/_edit_form_fields.html', 
                              form=form, 
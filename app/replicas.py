@@ -0,0 +1,225 @@
+# app/replicas.py
+"""
+Read-replica routing.
+
+REPLICA_URLS lists read replicas of the primary database, comma-separated.
+Each gets an engine under the bind key `replica_<n>` (see database.py), and
+the session class sends a SELECT to one of them when:
+
+- the view is marked with `@replica_reads()` (feed, search, item detail,
+  notifications, profile, my claims);
+- this request hasn't written yet: a flush or an INSERT/UPDATE/DELETE pins
+  the rest of the request to the primary;
+- the client didn't write in the last few seconds (a cookie is set after
+  every write), so the page a POST redirects to still shows its changes;
+- the replica is at most REPLICA_MAX_LAG seconds behind.
+
+Everything else (writes, SELECT ... FOR UPDATE, raw text statements,
+requests that aren't marked, background jobs) uses the primary.
+
+Lag is tracked with a timestamp: the `replica_heartbeat` scheduler job writes
+the current time to `replica_heartbeats` on the primary, and a replica is as
+far behind as its copy of that row is old. Workers check at most every
+REPLICA_CHECK_INTERVAL seconds. When the primary's own heartbeat is older than
+REPLICA_MAX_LAG (the job isn't running), lag is unknown; then, as when no
+replica is fresh enough, all reads go to the primary. A request picks one
+replica on its first read and stays on it.
+
+So replicas are only used while the scheduler runs: SCHEDULER_ENABLED=true,
+or a `flask scheduler run` process (with SCHEDULER_EXTERNAL=true to say so).
+create_app logs a warning when neither is configured.
+
+Two SQLite files can stand in for a primary and its replica:
+
+    DATABASE_URL=sqlite:///primary.db REPLICA_URLS=sqlite:///replica.db
+"""
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+import click
+from flask import current_app, g, has_request_context, request
+from flask.cli import AppGroup
+from flask_sqlalchemy.session import Session
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+HEARTBEAT = 'primary'
+PINNED_KEY = 'replica_pinned'
+REPLICA_KEY = 'replica_engine'
+STICKY_COOKIE = 'db_primary_until'
+
+
+def replica_binds(config):
+    """Bind key -> URL for each configured replica"""
+    urls = [url.strip() for url in (config.get('REPLICA_URLS') or '').split(',') if url.strip()]
+    return {f"replica_{n}": url for n, url in enumerate(urls)}
+
+
+def _is_read(clause):
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of `@replica_reads()` views to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info[PINNED_KEY] = True
+        elif bind is None and not self.info.get(PINNED_KEY) and _is_read(clause):
+            if has_request_context() and g.get('replica_reads'):
+                # One replica per request, so its reads share one point in time
+                if REPLICA_KEY not in self.info:
+                    self.info[REPLICA_KEY] = current_app.extensions['replicas'].choose(self._db)
+                engine = self.info[REPLICA_KEY]
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Tracks replica lag and picks a fresh replica for a request"""
+
+    def __init__(self, app=None):
+        self.binds = ()
+        self.max_lag = 10
+        self.check_interval = 5
+        self._fresh = ()
+        self._checked_at = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.binds = tuple(replica_binds(app.config))
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', self.max_lag)
+        self.check_interval = app.config.get('REPLICA_CHECK_INTERVAL', self.check_interval)
+        if self.binds:
+            app.after_request(self._remember_writes)
+        app.cli.add_command(replicas_cli)
+        app.extensions['replicas'] = self
+
+    # ---------- Routing ---------- #
+
+    def allowed(self):
+        """Whether the current request may read from a replica at all"""
+        if not self.binds:
+            return False
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        return primary_until < time.time()
+
+    def choose(self, db):
+        """Engine of a replica that is fresh enough, or None"""
+        fresh = self.fresh(db)
+        return db.engines[random.choice(fresh)] if fresh else None
+
+    def _remember_writes(self, response):
+        from app import db
+
+        # Keep this client on the primary until the replicas have caught up
+        if db.session.registry.has() and db.session.info.get(PINNED_KEY):
+            sticky = math.ceil(self.max_lag + self.check_interval)
+            response.set_cookie(
+                STICKY_COOKIE, str(int(time.time()) + sticky), max_age=sticky,
+                httponly=True, samesite='Lax', secure=current_app.config.get('SESSION_COOKIE_SECURE', False)
+            )
+        return response
+
+    # ---------- Lag ---------- #
+
+    def fresh(self, db):
+        """Bind keys of the replicas within REPLICA_MAX_LAG, re-checked every REPLICA_CHECK_INTERVAL"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return self._fresh
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self._fresh = tuple(
+                    bind for bind, lag in self.lags(db).items()
+                    if lag is not None and lag <= self.max_lag
+                )
+                self._checked_at = time.monotonic()
+        return self._fresh
+
+    def lags(self, db):
+        """Seconds each replica is behind (None when unknown)"""
+        now = datetime.utcnow()
+        primary = _heartbeat(db.engine)
+        if primary is None or _age(now, primary) > self.max_lag:
+            # The heartbeat job isn't running, so replica ages say nothing
+            return {bind: None for bind in self.binds}
+
+        lags = {}
+        for bind in self.binds:
+            try:
+                beat = _heartbeat(db.engines[bind])
+            except SQLAlchemyError:
+                current_app.logger.warning("Replica %s is unreachable", bind, exc_info=True)
+                beat = None
+            lags[bind] = None if beat is None else _age(now, beat)
+        return lags
+
+    @staticmethod
+    def beat():
+        """Write the heartbeat on the primary (the `replica_heartbeat` job)"""
+        from app import db
+        from app.auth.models import ReplicaHeartbeat
+
+        now = datetime.utcnow()
+        updated = db.session.execute(
+            update(ReplicaHeartbeat).where(ReplicaHeartbeat.name == HEARTBEAT).values(beat_at=now)
+        ).rowcount
+        if not updated:
+            db.session.add(ReplicaHeartbeat(name=HEARTBEAT, beat_at=now))
+        db.session.commit()
+
+
+def _age(now, beat):
+    """Seconds since a heartbeat (naive UTC, or aware from PostgreSQL)"""
+    if beat.tzinfo is not None:
+        beat = beat.astimezone(timezone.utc).replace(tzinfo=None)
+    return max(0.0, (now - beat).total_seconds())
+
+
+def _heartbeat(engine):
+    from app.auth.models import ReplicaHeartbeat
+
+    with engine.connect() as connection:
+        return connection.scalar(select(ReplicaHeartbeat.beat_at).where(ReplicaHeartbeat.name == HEARTBEAT))
+
+
+def replica_reads(methods=('GET', 'HEAD')):
+    """Let a view's `methods` requests read from a replica (apply below login_required)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method in methods:
+                g.replica_reads = current_app.extensions['replicas'].allowed()
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+# ---------- CLI ---------- #
+
+replicas_cli = AppGroup('replicas', help='Inspect read replicas.')
+
+
+@replicas_cli.command('status')
+def status_command():
+    """Show how far each replica is behind the primary."""
+    from app import db
+
+    router = current_app.extensions['replicas']
+    if not router.binds:
+        click.echo("No replicas configured (REPLICA_URLS).")
+        return
+    for bind, lag in router.lags(db).items():
+        state = 'unknown' if lag is None else f"{lag:.1f}s behind"
+        usable = lag is not None and lag <= router.max_lag
+        click.echo(f"{bind}\t{db.engines[bind].url.render_as_string()}\t{state}\t{'in use' if usable else 'skipped'}")
@@ -0,0 +1,151 @@
+# app/scheduler.py
+"""
+Periodic background jobs.
+
+Jobs are registered with an interval:
+
+    scheduler.add_job('expire_claims', 300, expire_claims)
+
+With SCHEDULER_ENABLED, every worker runs a timer thread that wakes up each
+SCHEDULER_TICK seconds (or more often when a job's interval is shorter). A job only runs in the worker that wins its lease: a
+row in `scheduler_leases` taken with a conditional UPDATE once the previous
+lease has run out. The lease is held for the job's interval, so each job runs
+once per interval across all workers and hosts, and a worker that dies just
+lets its lease expire.
+
+`flask scheduler run` runs the same loop in the foreground, for deployments
+that prefer a separate process (or cron with --once).
+"""
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.threads import ProcessThread
+
+
+class Scheduler:
+    """Interval jobs, each run by whichever process takes its lease"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.tick = 30
+        self.jobs = {}
+        self._thread = ProcessThread(self._run, 'scheduler')
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('SCHEDULER_ENABLED', self.enabled)
+        self.tick = app.config.get('SCHEDULER_TICK', self.tick)
+        if self.enabled:
+            app.before_request(self._ensure_thread)
+        app.cli.add_command(scheduler_cli)
+        app.extensions['scheduler'] = self
+
+    def add_job(self, name, interval, func):
+        """Run `func` (in an app context) every `interval` seconds; 0 disables it"""
+        if interval:
+            self.jobs[name] = (interval, func)
+
+    def wait(self):
+        """Seconds between checks: the tick, or the shortest job interval"""
+        return min([self.tick, *(interval for interval, _ in self.jobs.values())])
+
+    # ---------- Leases ---------- #
+
+    @staticmethod
+    def holder():
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def acquire(self, name, ttl):
+        """Take the lease for `name` for `ttl` seconds if nobody holds it"""
+        from app import db
+        from app.auth.models import SchedulerLease
+
+        now = datetime.utcnow()
+        values = {'holder': self.holder(), 'acquired_at': now, 'expires_at': now + timedelta(seconds=ttl)}
+        try:
+            taken = db.session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == name, SchedulerLease.expires_at <= now)
+                .values(**values)
+            ).rowcount
+            if not taken and db.session.get(SchedulerLease, name) is None:
+                db.session.add(SchedulerLease(name=name, **values))
+                db.session.flush()
+                taken = 1
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created the lease first
+            db.session.rollback()
+            return False
+        return bool(taken)
+
+    # ---------- Running ---------- #
+
+    def run_pending(self):
+        """Run every job whose lease this process can take. Returns the names run."""
+        from app import db
+
+        ran = []
+        with self.app.app_context():
+            for name, (interval, func) in self.jobs.items():
+                try:
+                    if not self.acquire(name, interval):
+                        continue
+                    func()
+                    ran.append(name)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Scheduled job %s failed", name)
+            db.session.remove()
+        return ran
+
+    def _ensure_thread(self):
+        self._thread.ensure()
+
+    def _run(self):
+        while True:
+            time.sleep(self.wait())
+            self.run_pending()
+
+
+# ---------- CLI ---------- #
+
+scheduler_cli = AppGroup('scheduler', help='Run scheduled jobs.')
+
+
+@scheduler_cli.command('run')
+@click.option('--once', is_flag=True, help='Run the jobs that are due and exit.')
+def run_command(once):
+    """Run the scheduler in the foreground."""
+    from app import scheduler
+
+    click.echo(f"Scheduler started with {len(scheduler.jobs)} job(s): {', '.join(scheduler.jobs) or 'none'}.")
+    try:
+        while True:
+            for name in scheduler.run_pending():
+                click.echo(f"Ran {name}.")
+            if once:
+                return
+            time.sleep(scheduler.wait())
+    except KeyboardInterrupt:
+        click.echo("Scheduler stopped.")
+
+
+@scheduler_cli.command('leases')
+def leases_command():
+    """Show who holds each job's lease."""
+    from app.auth.models import SchedulerLease
+
+    for lease in SchedulerLease.query.order_by(SchedulerLease.name).all():
+        click.echo(f"{lease.name}\t{lease.holder}\tacquired {lease.acquired_at}\texpires {lease.expires_at}")
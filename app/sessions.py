@@ -0,0 +1,267 @@
+# app/sessions.py
+"""
+Server-side login sessions.
+
+The browser only holds a signed, opaque session ID. The session behind it is
+just the Google subject and the user id; login_required loads the user itself
+(cached briefly per worker, see TokenCache). Sessions live in a pluggable
+backend:
+
+    memory  - a dict inside the process; single-process dev and tests only
+    sqlite  - a table in a local SQLite file shared by all workers
+    redis   - any client exposing the redis-py get/setex/expire/delete calls
+
+Sessions slide: each use pushes the expiry forward (at most once per
+SESSION_TOUCH_INTERVAL to keep writes down). Expired sessions are removed
+in bulk by `flask sessions purge` and opportunistically when new sessions
+are created.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import click
+from flask import g, request
+from flask.cli import AppGroup
+from itsdangerous import BadSignature, Signer
+
+
+# ---------- Backends ---------- #
+
+class MemorySessionBackend:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, sid):
+        with self._lock:
+            return self._sessions.get(sid)
+
+    def set(self, sid, data, expires_at):
+        with self._lock:
+            self._sessions[sid] = (data, expires_at)
+
+    def touch(self, sid, expires_at):
+        with self._lock:
+            if sid in self._sessions:
+                self._sessions[sid] = (self._sessions[sid][0], expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def purge_expired(self, now):
+        with self._lock:
+            expired = [sid for sid, (_, expires_at) in self._sessions.items() if expires_at <= now]
+            for sid in expired:
+                del self._sessions[sid]
+        return len(expired)
+
+
+class SQLiteSessionBackend:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, sid):
+        row = self._connect().execute(
+            "SELECT data, expires_at FROM sessions WHERE id = ?", (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, sid, data, expires_at):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (sid, json.dumps(data), expires_at)
+            )
+
+    def touch(self, sid, expires_at):
+        with self._connect() as conn:
+            conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (expires_at, sid))
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def purge_expired(self, now):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,)).rowcount
+
+
+class RedisSessionBackend:
+    def __init__(self, client=None, url=None, prefix='session:'):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_BACKEND=redis requires the 'redis' package")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, sid):
+        return self.prefix + sid
+
+    def get(self, sid):
+        raw = self.client.get(self._key(sid))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry['data'], entry['expires_at']
+
+    def set(self, sid, data, expires_at):
+        ttl = max(1, int(expires_at - time.time()))
+        self.client.setex(self._key(sid), ttl, json.dumps({'data': data, 'expires_at': expires_at}))
+
+    def touch(self, sid, expires_at):
+        entry = self.get(sid)
+        if entry is not None:
+            self.set(sid, entry[0], expires_at)
+
+    def delete(self, sid):
+        self.client.delete(self._key(sid))
+
+    def purge_expired(self, now):
+        # Redis evicts expired keys on its own
+        return 0
+
+
+# ---------- Store ---------- #
+
+class SessionStore:
+    """Creates, loads and destroys sessions in the configured backend"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.signer = None
+        self.cookie_name = 'sid'
+        self.lifetime = 7 * 24 * 3600
+        self.touch_interval = 300
+        self.purge_interval = 3600
+        self._last_purge = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        self.cookie_name = app.config.get('SESSION_ID_COOKIE', self.cookie_name)
+        self.lifetime = app.config.get('SESSION_LIFETIME', self.lifetime)
+        self.touch_interval = app.config.get('SESSION_TOUCH_INTERVAL', self.touch_interval)
+        self.purge_interval = app.config.get('SESSION_PURGE_INTERVAL', self.purge_interval)
+        self.signer = Signer(app.config['SECRET_KEY'], salt='session-id')
+        self.backend = backend or self._make_backend(app)
+        app.after_request(self._refresh_cookie)
+        app.cli.add_command(sessions_cli)
+        app.extensions['session_store'] = self
+
+    @staticmethod
+    def _make_backend(app):
+        name = app.config.get('SESSION_BACKEND', 'sqlite')
+        if name == 'memory':
+            return MemorySessionBackend()
+        if name == 'sqlite':
+            path = app.config.get('SESSION_SQLITE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+            return SQLiteSessionBackend(path)
+        if name == 'redis':
+            return RedisSessionBackend(url=app.config.get('SESSION_REDIS_URL'))
+        raise ValueError(f"Unknown SESSION_BACKEND: {name}")
+
+    def _unsign(self, cookie_value):
+        if not cookie_value:
+            return None
+        try:
+            return self.signer.unsign(cookie_value).decode('utf-8')
+        except BadSignature:
+            return None
+
+    def create(self, data):
+        """Store a new session and return the signed cookie value"""
+        now = time.time()
+        sid = secrets.token_urlsafe(32)
+        self.backend.set(sid, data, now + self.lifetime)
+        if now - self._last_purge > self.purge_interval:
+            self._last_purge = now
+            self.purge_expired()
+        return self.signer.sign(sid).decode('utf-8')
+
+    def load(self, cookie_value):
+        """Return {'data': ..., 'expires_at': ...} for a live session, or None"""
+        sid = self._unsign(cookie_value)
+        if sid is None:
+            return None
+        entry = self.backend.get(sid)
+        if entry is None:
+            return None
+
+        data, expires_at = entry
+        now = time.time()
+        if expires_at <= now:
+            self.backend.delete(sid)
+            return None
+
+        # Sliding expiry, written at most once per touch interval
+        if now + self.lifetime - expires_at >= self.touch_interval:
+            expires_at = now + self.lifetime
+            self.backend.touch(sid, expires_at)
+            g._session_refreshed = cookie_value
+        return {'data': data, 'expires_at': expires_at}
+
+    def destroy(self, cookie_value):
+        g.pop('_session_refreshed', None)
+        sid = self._unsign(cookie_value)
+        if sid is not None:
+            self.backend.delete(sid)
+
+    def purge_expired(self):
+        return self.backend.purge_expired(time.time())
+
+    def set_cookie(self, response, cookie_value):
+        response.set_cookie(self.cookie_name, cookie_value, max_age=self.lifetime,
+                            httponly=True, secure=True, samesite="Lax")
+
+    def clear_cookie(self, response):
+        response.set_cookie(self.cookie_name, "", expires=0)
+
+    def _refresh_cookie(self, response):
+        # Keep the browser cookie in step with the server-side sliding expiry
+        cookie_value = g.pop('_session_refreshed', None)
+        if cookie_value and request.cookies.get(self.cookie_name) == cookie_value:
+            self.set_cookie(response, cookie_value)
+        return response
+
+
+sessions_cli = AppGroup('sessions', help='Manage server-side login sessions.')
+
+
+@sessions_cli.command('purge')
+def purge_sessions():
+    """Delete all expired sessions."""
+    from app import session_store
+    removed = session_store.purge_expired()
+    click.echo(f"Removed {removed} expired session(s).")
@@ -3,13 +3,16 @@ class EnhancedNotificationManager {
             this.badge = document.getElementById('notificationCount');
             this.dropdown = document.getElementById('notificationList');
             this.unreadCount = 0;
+            this.notifications = [];
+            this.syncToken = null;
+            this.etag = null;
             this.initialize();
         }
         
         async initialize() {
             await this.loadNotifications();
             this.setupEventListeners();
-            this.startPolling();
+            this.connectStream();
         }
         
         setupEventListeners() {
@@ -24,6 +27,8 @@ class EnhancedNotificationManager {
             document.getElementById('refreshNotifications')?.addEventListener('click', (e) => {
                 e.preventDefault();
                 e.stopPropagation();
+                this.syncToken = null;
+                this.etag = null;
                 this.loadNotifications(true);
             });
         }
@@ -34,19 +39,43 @@ class EnhancedNotificationManager {
                     this.showLoading();
                 }
                 
-                const response = await fetch('/lost_and_found/api/notifications');
+                // Only ask for what changed since the last sync; 304 when nothing did
+                const url = this.syncToken === null
+                    ? '/lost_and_found/api/notifications'
+                    : `/lost_and_found/api/notifications?since=${this.syncToken}`;
+                const response = await fetch(url, {
+                    headers: this.etag ? { 'If-None-Match': this.etag } : {},
+                    cache: 'no-store'
+                });
+                if (response.status === 304) {
+                    if (showLoading) this.renderNotifications(this.notifications);
+                    return;
+                }
                 if (!response.ok) throw new Error('Failed to load notifications');
                 
                 const data = await response.json();
+                this.etag = response.headers.get('ETag');
+                this.syncToken = data.sync_token;
+                this.notifications = data.full
+                    ? (data.notifications || [])
+                    : this.mergeNotifications(data.notifications || []);
                 this.unreadCount = data.unread_count || 0;
                 this.updateBadge();
-                this.renderNotifications(data.notifications || []);
+                this.renderNotifications(this.notifications);
             } catch (error) {
                 console.error('Error loading notifications:', error);
                 this.showError();
             }
         }
         
+        mergeNotifications(changed) {
+            const byId = new Map(this.notifications.map(notif => [notif.id, notif]));
+            changed.forEach(notif => byId.set(notif.id, notif));
+            return [...byId.values()]
+                .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
+                .slice(0, 50);
+        }
+        
         updateBadge() {
             if (!this.badge) return;
             
@@ -134,6 +163,7 @@ class EnhancedNotificationManager {
                 'claim_accepted': 'bi-check-circle',
                 'claim_rejected': 'bi-x-circle',
                 'claim_cancelled': 'bi-slash-circle',
+                'claim_expired': 'bi-hourglass-bottom',
                 'claim_accepted_confirmation': 'bi-check-circle-fill',
                 'item_returned': 'bi-arrow-return-right',
                 'item_claimed': 'bi-hand-thumbs-up',
@@ -150,6 +180,7 @@ class EnhancedNotificationManager {
                 'claim_accepted': 'text-success',
                 'claim_rejected': 'text-danger',
                 'claim_cancelled': 'text-warning',
+                'claim_expired': 'text-secondary',
                 'claim_accepted_confirmation': 'text-success',
                 'item_returned': 'text-info',
                 'item_claimed': 'text-success',
@@ -246,8 +277,51 @@ class EnhancedNotificationManager {
             }
         }
         
+        connectStream() {
+            // Updates are pushed over Server-Sent Events; polling is only the fallback
+            if (!window.EventSource) {
+                this.startPolling();
+                return;
+            }
+            
+            const stream = new EventSource('/lost_and_found/api/notifications/stream');
+            let connected = false;
+            
+            stream.addEventListener('open', () => {
+                this.stopPolling();
+                // Catch up on anything sent while reconnecting
+                if (connected) this.loadNotifications();
+                connected = true;
+            });
+            stream.addEventListener('notification', (e) => {
+                this.loadNotifications();
+                const data = JSON.parse(e.data);
+                if (data.claim_id) {
+                    window.dispatchEvent(new CustomEvent('claims:changed', { detail: data }));
+                }
+            });
+            stream.addEventListener('claims', (e) => {
+                window.dispatchEvent(new CustomEvent('claims:changed', { detail: JSON.parse(e.data) }));
+            });
+            stream.addEventListener('resync', () => this.loadNotifications());
+            stream.addEventListener('error', () => {
+                // The browser reconnects on its own unless the stream was refused (e.g. 503)
+                if (stream.readyState === EventSource.CLOSED) {
+                    this.startPolling();
+                    setTimeout(() => this.connectStream(), 5 * 60 * 1000);
+                }
+            });
+        }
+        
         startPolling() {
-            setInterval(() => this.loadNotifications(), 30000); // Poll every 30 seconds
+            if (this.pollTimer) return;
+            this.pollTimer = setInterval(() => this.loadNotifications(), 30000); // Poll every 30 seconds
+        }
+        
+        stopPolling() {
+            if (!this.pollTimer) return;
+            clearInterval(this.pollTimer);
+            this.pollTimer = null;
         }
         
         showToast(message, type = 'info') {
@@ -0,0 +1,268 @@
+# app/storage.py
+"""
+Content-addressed storage for uploaded images.
+
+An upload is stored once, under the SHA-256 of its bytes, in a sharded layout
+so no directory grows too large:
+
+    BLOB_STORE_ROOT/ab/cd/abcd1234...          original upload (private)
+    UPLOAD_FOLDER/ab/cd/abcd1234..._card.webp  renditions (public, see images.py)
+
+The same photo attached to several reports, or uploaded again while editing a
+report, is therefore stored and processed once. Each `Blob` row counts the
+`ItemImage` rows pointing at it; the count is maintained from a session
+`after_flush` hook, in the same transaction as the image rows. Nothing is
+deleted when the count drops to zero: `flask storage gc` sweeps released blobs
+and stray files (e.g. from requests that failed after writing) once they are
+older than BLOB_GC_GRACE seconds.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, event, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """Sharded SHA-256 file store"""
+
+    def __init__(self, app=None):
+        self.root = None
+        self.public_root = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = app.config.get('BLOB_STORE_ROOT') or os.path.join(app.instance_path, 'blobs')
+        self.public_root = app.config['UPLOAD_FOLDER']
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        app.cli.add_command(storage_cli)
+        app.extensions['blob_store'] = self
+
+    @property
+    def tmp_dir(self):
+        # Same filesystem as the blobs, so finished uploads can be renamed into place
+        return os.path.join(self.root, 'tmp')
+
+    @staticmethod
+    def _shard(blob_hash):
+        return os.path.join(blob_hash[:2], blob_hash[2:4])
+
+    def path(self, blob_hash):
+        """Location of the original upload"""
+        return os.path.join(self.root, self._shard(blob_hash), blob_hash)
+
+    def rendition_stem(self, blob_hash):
+        """Path prefix of the public renditions: <stem>_<rendition>.<ext>"""
+        return os.path.join(self.public_root, self._shard(blob_hash), blob_hash)
+
+    def exists(self, blob_hash):
+        return os.path.exists(self.path(blob_hash))
+
+    def owns(self, path):
+        """Whether `path` is inside the blob store"""
+        root = os.path.realpath(self.root)
+        return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+    # ---------- Writing ---------- #
+
+    def put_stream(self, stream):
+        """Store the contents of a file object. Returns (hash, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            return self.commit_tmp(tmp_path, digest.hexdigest()), size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_upload(self, file_storage):
+        """
+        Store an uploaded file. Returns (hash, size). Uploads streamed to disk
+        by UploadRequest are already hashed and are simply renamed into place.
+        """
+        stream = file_storage.stream
+        if getattr(stream, 'sha256', None) and getattr(stream, 'path', None):
+            stream.finish()
+            stream.flush()
+            self.commit_tmp(stream.path, stream.sha256)
+            stream.committed = True
+            return stream.sha256, stream.size
+        return self.put_stream(stream)
+
+    def commit_tmp(self, tmp_path, blob_hash):
+        """Move a fully written temp file to its content address"""
+        target = self.path(blob_hash)
+        if os.path.exists(target):
+            # Already stored: keep the existing copy
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+        return blob_hash
+
+    def delete(self, blob_hash):
+        """Remove the original and every rendition of a blob"""
+        stem = self.rendition_stem(blob_hash)
+        directory = os.path.dirname(stem)
+        paths = [self.path(blob_hash)]
+        if os.path.isdir(directory):
+            prefix = os.path.basename(stem) + '_'
+            paths.extend(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def walk(self):
+        """Yield (hash, path, mtime) for every file in the sharded layout"""
+        for base in (self.root, self.public_root):
+            if not os.path.isdir(base):
+                continue
+            for first in os.listdir(base):
+                first_dir = os.path.join(base, first)
+                if len(first) != 2 or not os.path.isdir(first_dir):
+                    continue
+                for second in os.listdir(first_dir):
+                    second_dir = os.path.join(first_dir, second)
+                    if not os.path.isdir(second_dir):
+                        continue
+                    for name in os.listdir(second_dir):
+                        path = os.path.join(second_dir, name)
+                        yield name[:64], path, os.path.getmtime(path)
+
+
+# ---------- Reference counting ---------- #
+
+def register_blob(session, blob_hash, size, content_type=None):
+    """Make sure a Blob row exists for a stored upload (with no references yet)"""
+    from app.lost_and_found.models import Blob
+
+    if session.get(Blob, blob_hash) is not None:
+        return
+    try:
+        # Savepoint: a concurrent request may register the same upload first
+        with session.begin_nested():
+            session.add(Blob(
+                hash=blob_hash, size=size, content_type=content_type,
+                ref_count=0, released_at=datetime.utcnow()
+            ))
+    except IntegrityError:
+        pass
+
+
+def _adjust(session, counts):
+    from app.lost_and_found.models import Blob
+
+    now = datetime.utcnow()
+    for blob_hash, delta in counts.items():
+        if delta:
+            session.connection().execute(
+                update(Blob).where(Blob.hash == blob_hash).values(
+                    ref_count=Blob.ref_count + delta,
+                    # Remember when the last reference went away, for the GC grace period
+                    released_at=case((Blob.ref_count + delta <= 0, now), else_=None)
+                )
+            )
+
+
+@event.listens_for(Session, 'after_flush')
+def _count_references(session, flush_context):
+    from app.lost_and_found.models import ItemImage
+
+    counts = {}
+    for obj in session.new:
+        if isinstance(obj, ItemImage) and obj.blob_hash:
+            counts[obj.blob_hash] = counts.get(obj.blob_hash, 0) + 1
+    for obj in session.dirty:
+        if isinstance(obj, ItemImage):
+            history = inspect(obj).attrs.blob_hash.history
+            for blob_hash in history.added or ():
+                if blob_hash:
+                    counts[blob_hash] = counts.get(blob_hash, 0) + 1
+            for blob_hash in history.deleted or ():
+                if blob_hash:
+                    counts[blob_hash] = counts.get(blob_hash, 0) - 1
+    for obj in session.deleted:
+        if isinstance(obj, ItemImage) and obj.blob_hash:
+            counts[obj.blob_hash] = counts.get(obj.blob_hash, 0) - 1
+
+    if counts:
+        _adjust(session, counts)
+
+
+# ---------- CLI ---------- #
+
+storage_cli = AppGroup('storage', help='Manage stored uploads.')
+
+
+@storage_cli.command('gc')
+@click.option('--grace', default=None, type=int, help='Only sweep files and blobs unused for this many seconds.')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed.')
+def gc_command(grace, dry_run):
+    """Delete unreferenced blobs and orphaned files."""
+    from app import blob_store, db
+    from app.lost_and_found.models import Blob
+
+    grace = current_app.config.get('BLOB_GC_GRACE', 3600) if grace is None else grace
+    cutoff = datetime.utcnow() - timedelta(seconds=grace)
+
+    # Blobs whose last reference is gone
+    released = db.session.scalars(
+        db.select(Blob.hash).where(Blob.ref_count <= 0, Blob.released_at < cutoff)
+    ).all()
+    removed_blobs = 0
+    for blob_hash in released:
+        if dry_run:
+            click.echo(f"would remove blob {blob_hash}")
+            removed_blobs += 1
+            continue
+        # Conditional delete: a new reference may have appeared meanwhile
+        deleted = db.session.execute(
+            db.delete(Blob).where(Blob.hash == blob_hash, Blob.ref_count <= 0)
+        ).rowcount
+        db.session.commit()
+        if deleted:
+            blob_store.delete(blob_hash)
+            removed_blobs += 1
+
+    # Files nothing points at (failed requests, interrupted uploads)
+    known = set(db.session.scalars(db.select(Blob.hash)).all())
+    cutoff_ts = time.time() - grace
+    removed_files = 0
+    for blob_hash, path, mtime in blob_store.walk():
+        if blob_hash not in known and mtime < cutoff_ts:
+            if not dry_run:
+                os.remove(path)
+            removed_files += 1
+    if os.path.isdir(blob_store.tmp_dir):
+        for name in os.listdir(blob_store.tmp_dir):
+            path = os.path.join(blob_store.tmp_dir, name)
+            if os.path.getmtime(path) < cutoff_ts:
+                if not dry_run:
+                    shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+                removed_files += 1
+
+    verb = 'Would remove' if dry_run else 'Removed'
+    click.echo(f"{verb} {removed_blobs} released blob(s) and {removed_files} orphaned file(s).")
@@ -0,0 +1,43 @@
+# app/threads.py
+"""
+Background threads that belong to one process.
+
+Gunicorn forks its workers from the master, and a fork only copies the thread
+that called it: a `threading.Thread` object inherited from the master still
+looks started but nothing runs it. `ProcessThread` remembers which process
+started it, so the first caller in each worker starts a fresh one.
+"""
+import os
+import threading
+
+
+class ProcessThread:
+    """A daemon thread started on demand, at most once per process"""
+
+    def __init__(self, target, name):
+        self.target = target
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def is_alive(self):
+        thread = self._thread
+        return thread is not None and self._pid == os.getpid() and thread.is_alive()
+
+    def ensure(self, before_start=None):
+        """Start the thread unless this process already runs it"""
+        if self.is_alive():
+            return
+        with self._lock:
+            if self.is_alive():
+                return
+            if before_start is not None:
+                before_start()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self._thread.start()
+
+    def join(self, timeout=None):
+        if self.is_alive():
+            self._thread.join(timeout)
@@ -0,0 +1,241 @@
+# app/tokens.py
+"""
+Local verification of Google id_tokens.
+
+Google signs id_tokens with RS256 keys published as a JWKS document. Instead of
+asking the tokeninfo endpoint on every request, the key set is fetched once,
+kept in memory and refreshed in the background according to the Cache-Control
+max-age Google sends with it. Setting GOOGLE_JWKS_FILE loads the keys from a
+local file instead (useful offline and in tests).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from authlib.jose import JsonWebKey, JsonWebToken
+from authlib.jose.errors import ExpiredTokenError, JoseError
+
+GOOGLE_ISSUERS = ['accounts.google.com', 'https://accounts.google.com']
+DEFAULT_JWKS_URI = 'https://www.googleapis.com/oauth2/v3/certs'
+
+# Used when Google does not send a max-age, and as floor between forced refreshes
+DEFAULT_MAX_AGE = 3600
+MIN_REFRESH_INTERVAL = 60
+
+
+class InvalidTokenError(Exception):
+    """The id_token could not be verified"""
+
+
+class TokenExpiredError(InvalidTokenError):
+    """The id_token signature is valid but it has expired"""
+
+
+class GoogleKeySet:
+    """Google's JWKS signing keys, cached per process"""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._expires_at = 0
+        self._last_fetch = 0
+        self._timer = None
+        self._timer_pid = None
+        self._jwt = JsonWebToken(['RS256'])
+        self.jwks_uri = DEFAULT_JWKS_URI
+        self.jwks_file = None
+        self.audience = None
+        self.logger = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.jwks_uri = app.config.get('GOOGLE_JWKS_URI') or DEFAULT_JWKS_URI
+        self.jwks_file = app.config.get('GOOGLE_JWKS_FILE')
+        self.audience = app.config.get('GOOGLE_CLIENT_ID')
+        self.logger = app.logger
+        with self._lock:
+            # Keys loaded under a previous configuration don't apply
+            self._keys = {}
+            self._expires_at = 0
+            self._last_fetch = 0
+        app.extensions['google_keys'] = self
+
+    # ---------- Key loading ---------- #
+
+    def _load_file(self):
+        with open(self.jwks_file, 'r', encoding='utf-8') as fh:
+            return json.load(fh), None
+
+    def _fetch(self):
+        response = requests.get(self.jwks_uri, timeout=5)
+        response.raise_for_status()
+        max_age = DEFAULT_MAX_AGE
+        match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+        if match:
+            max_age = int(match.group(1))
+        return response.json(), max_age
+
+    def refresh(self):
+        """Reload the key set. Returns True when new keys were installed."""
+        try:
+            if self.jwks_file:
+                jwks, max_age = self._load_file()
+            else:
+                jwks, max_age = self._fetch()
+            keys = {jwk['kid']: JsonWebKey.import_key(jwk) for jwk in jwks.get('keys', []) if jwk.get('kid')}
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to refresh Google JWKS keys")
+            with self._lock:
+                self._last_fetch = time.time()
+            return False
+
+        with self._lock:
+            self._keys = keys
+            self._last_fetch = time.time()
+            # Keys from a file never go stale
+            self._expires_at = float('inf') if max_age is None else self._last_fetch + max_age
+        if max_age is not None:
+            self._schedule_refresh(max_age)
+        return True
+
+    def _schedule_refresh(self, max_age):
+        # Refresh a little before the keys expire so requests never wait on it
+        delay = max(MIN_REFRESH_INTERVAL, int(max_age * 0.9))
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.refresh)
+            self._timer.daemon = True
+            self._timer_pid = os.getpid()
+            self._timer.start()
+
+    def _ensure_keys(self):
+        # The master's refresh timer never fires in a forked worker, so refresh here
+        now = time.time()
+        forked = self._timer_pid is not None and self._timer_pid != os.getpid()
+        stale = not self._keys or now >= self._expires_at
+        recently_tried = now - self._last_fetch < MIN_REFRESH_INTERVAL
+        if forked or (stale and not recently_tried):
+            self.refresh()
+
+    def get_key(self, kid):
+        self._ensure_keys()
+        key = self._keys.get(kid)
+        if key is None and time.time() - self._last_fetch > MIN_REFRESH_INTERVAL:
+            # Google rotated its keys before our cached copy expired
+            self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    # ---------- Verification ---------- #
+
+    def _resolve_key(self, header, payload):
+        key = self.get_key(header.get('kid'))
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+    def verify(self, token):
+        """Verify signature, expiry, issuer and audience; return the claims."""
+        if not self.audience:
+            # Without it any Google-signed token, issued to any app, would pass
+            raise InvalidTokenError("GOOGLE_CLIENT_ID is not configured")
+        claims_options = {
+            'iss': {'essential': True, 'values': GOOGLE_ISSUERS},
+            'exp': {'essential': True},
+            'sub': {'essential': True},
+            'aud': {'essential': True, 'value': self.audience},
+        }
+
+        try:
+            claims = self._jwt.decode(token, self._resolve_key, claims_options=claims_options)
+            claims.validate()
+        except ExpiredTokenError as e:
+            raise TokenExpiredError(str(e)) from e
+        except (JoseError, ValueError) as e:
+            raise InvalidTokenError(str(e)) from e
+        return dict(claims)
+
+
+class TokenCache:
+    """
+    Per-worker LRU of verified credentials (session IDs).
+
+    Entries are keyed by a SHA-256 of the credential (the raw value is never
+    kept) and hold the Google subject plus the user dict that login_required
+    hands to views. An entry never outlives the credential's own expiry, and
+    TOKEN_CACHE_TTL bounds how long a logout in another worker can go unseen.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = 1024
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_size = app.config.get('TOKEN_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('TOKEN_CACHE_TTL', self.ttl)
+        app.extensions['token_cache'] = self
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """Return (sub, user) for a cached token, or None. Copy `user` before changing it."""
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, sub, user = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return sub, user
+
+    def put(self, token, sub, user, exp):
+        if self.max_size <= 0:
+            return
+        expires_at = min(float(exp), time.time() + self.ttl)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, sub, dict(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
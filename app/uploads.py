@@ -0,0 +1,117 @@
+# app/uploads.py
+"""
+Streaming upload handling.
+
+Werkzeug spools every uploaded file into a SpooledTemporaryFile, keeping up to
+500KB of each in worker memory before the view even runs. `UploadRequest`
+instead streams each file part straight to a temporary file in the blob
+store's tmp directory and, as chunks arrive:
+
+- hashes them, so the blob store can take the file by renaming it
+  (see BlobStore.put_upload) instead of reading it back;
+- counts them, aborting with 413 once a file exceeds MAX_UPLOAD_FILE_SIZE;
+- sniffs the first bytes, aborting with 415 when they aren't an image, before
+  the rest of the body is read. Files shorter than that are checked once
+  their part ends (and again before the blob store takes them).
+
+Temporary files that were not moved into the store are removed when the
+request is closed.
+"""
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+SNIFF_BYTES = 12
+
+
+def looks_like_image(head):
+    """Magic-byte check for the image formats accepted for upload"""
+    return (
+        head.startswith(b'\xff\xd8\xff')                        # JPEG
+        or head.startswith(b'\x89PNG\r\n\x1a\n')                # PNG
+        or head[:6] in (b'GIF87a', b'GIF89a')                   # GIF
+        or (head[:4] == b'RIFF' and head[8:12] == b'WEBP')      # WebP
+    )
+
+
+class HashingUpload:
+    """Disk-backed upload stream that hashes, size-checks and sniffs on write"""
+
+    def __init__(self, directory, max_size):
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', delete=False)
+        self.path = self._file.name
+        self.max_size = max_size
+        self.size = 0
+        self.committed = False
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self._sniffed = False
+
+    def _sniff(self):
+        self._sniffed = True
+        if not looks_like_image(self._head):
+            raise UnsupportedMediaType("Only image uploads are accepted")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise RequestEntityTooLarge(f"Each image must be at most {self.max_size // (1024 * 1024)}MB")
+
+        if not self._sniffed:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def finish(self):
+        """Sniff a file that ended before SNIFF_BYTES; 415 when it isn't an image"""
+        if not self._sniffed:
+            self._sniff()
+
+    def seek(self, *args):
+        # The form parser rewinds each file once its part has been written
+        self.finish()
+        return self._file.seek(*args)
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def close(self):
+        self._file.close()
+        if not self.committed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __getattr__(self, name):
+        # read, seek, tell, flush... go to the underlying file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class UploadRequest(Request):
+    # Non-file form fields are small; don't let them grow unbounded in memory
+    max_form_memory_size = 500 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        blob_store = current_app.extensions['blob_store']
+        stream = HashingUpload(blob_store.tmp_dir, current_app.config.get('MAX_UPLOAD_FILE_SIZE'))
+        # Tracked here too: a rejected upload never makes it into request.files
+        if not hasattr(self, '_upload_streams'):
+            self._upload_streams = []
+        self._upload_streams.append(stream)
+        return stream
+
+    def close(self):
+        super().close()
+        for stream in getattr(self, '_upload_streams', ()):
+            stream.close()
@@ -17,14 +17,103 @@ class Config:
     
     # Other settings
     LAGH_UNI_DOMAIN = os.getenv('LAGH_UNI_DOMAIN')
-    GOOGLE_TOKEN_INFO = os.getenv('GOOGLE_TOKEN_INFO')
+    
+    # Google id_token verification (keys are cached locally, see app/tokens.py)
+    GOOGLE_JWKS_URI = os.getenv('GOOGLE_JWKS_URI', 'https://www.googleapis.com/oauth2/v3/certs')
+    GOOGLE_JWKS_FILE = os.getenv('GOOGLE_JWKS_FILE')  # Load keys from a local file instead (offline/tests)
+    
+    # Verified-session cache (per worker)
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 1024))  # 0 disables the cache
+    TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 60))  # seconds, never past the session expiry
+    
+    # Server-side sessions (see app/sessions.py)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite')  # memory (single process only), sqlite, redis
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH')  # defaults to instance/sessions.db
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    SESSION_ID_COOKIE = 'sid'
+    SESSION_LIFETIME = int(os.getenv('SESSION_LIFETIME', 7 * 24 * 3600))  # sliding, in seconds
+    SESSION_TOUCH_INTERVAL = 300  # don't extend a session more often than this
+    SESSION_PURGE_INTERVAL = 3600  # opportunistic cleanup of expired sessions
+    
+    # Buffered audit log writer (see app/audit.py)
+    AUDIT_SYNC = os.getenv('AUDIT_SYNC', 'false').lower() == 'true'  # write each record immediately
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 2.0))  # seconds
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))  # records beyond this are dropped
+    
+    # Pushed notification events (see app/events.py)
+    EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'sqlite')  # local (single process only), sqlite, postgres
+    EVENTS_SQLITE_PATH = os.getenv('EVENTS_SQLITE_PATH')  # defaults to instance/events.db
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 1.0))  # seconds, sqlite broker only
+    EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS', 24))  # per worker, keep below gunicorn threads
+    EVENTS_QUEUE_SIZE = 100  # undelivered events per stream before the client is told to refetch
+    EVENTS_HEARTBEAT = int(os.getenv('EVENTS_HEARTBEAT', 15))  # seconds between keep-alive comments
+    EVENTS_STREAM_MAX_AGE = int(os.getenv('EVENTS_STREAM_MAX_AGE', 300))  # seconds before the client is made to reconnect
+    
+    # Notifications (see app/lost_and_found/notifier.py and retention.py)
+    NOTIFICATION_DEDUPE_WINDOW = int(os.getenv('NOTIFICATION_DEDUPE_WINDOW', 300))  # seconds, 0 disables
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))  # read ones older than this are pruned, 0 keeps them
+    NOTIFICATION_KEEP_PER_USER = int(os.getenv('NOTIFICATION_KEEP_PER_USER', 200))  # read ones kept per user, 0 for no limit
+    NOTIFICATION_ARCHIVE = os.getenv('NOTIFICATION_ARCHIVE', 'false').lower() == 'true'  # copy pruned rows to notifications_archive
+    NOTIFICATION_PRUNE_BATCH = int(os.getenv('NOTIFICATION_PRUNE_BATCH', 500))  # rows per delete transaction
+    NOTIFICATION_PRUNE_PAUSE = float(os.getenv('NOTIFICATION_PRUNE_PAUSE', 0.1))  # seconds between batches
+    NOTIFICATION_PRUNE_INTERVAL = int(os.getenv('NOTIFICATION_PRUNE_INTERVAL', 24 * 3600))  # seconds between scheduled prunes, 0 disables
+    
+    # Claims
+    CLAIM_EXPIRY_INTERVAL = int(os.getenv('CLAIM_EXPIRY_INTERVAL', 300))  # seconds between expiry sweeps, 0 disables
+    CLAIM_EXPIRY_BATCH = int(os.getenv('CLAIM_EXPIRY_BATCH', 200))  # claims expired per transaction
+    
+    # Background jobs (see app/scheduler.py)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'false').lower() == 'true'  # run jobs in the web workers
+    SCHEDULER_TICK = int(os.getenv('SCHEDULER_TICK', 30))  # seconds between checks for due jobs
+    SCHEDULER_EXTERNAL = os.getenv('SCHEDULER_EXTERNAL', 'false').lower() == 'true'  # a separate `flask scheduler run` process runs the jobs
+    
+    # Categories and locations cached per worker (see app/lost_and_found/reference.py)
+    REFERENCE_CHECK_INTERVAL = float(os.getenv('REFERENCE_CHECK_INTERVAL', 5))  # seconds between version stamp checks
+    REFERENCE_MAX_AGE = int(os.getenv('REFERENCE_MAX_AGE', 60))  # browser cache lifetime of the categories/locations endpoints
+    REFERENCE_STALE_WHILE_REVALIDATE = int(os.getenv('REFERENCE_STALE_WHILE_REVALIDATE', 600))  # seconds a stale copy may be served while revalidating
     
     # Upload folder
-    UPLOAD_FOLDER = os.path.join(BASE_DIR, 'app', 'static', 'images', 'uploads')
+    # Must sit inside app/static so the renditions can be served
+    UPLOAD_FOLDER = os.path.join(Path(__file__).resolve().parent, 'app', 'static', 'images', 'uploads')
+    
+    # Image worker (see app/lost_and_found/image_jobs.py)
+    IMAGE_JOBS_INLINE = os.getenv('IMAGE_JOBS_INLINE', 'false').lower() == 'true'  # process in-request, no worker needed
+    IMAGE_JOB_MAX_ATTEMPTS = int(os.getenv('IMAGE_JOB_MAX_ATTEMPTS', 5))
+    IMAGE_JOB_BACKOFF = int(os.getenv('IMAGE_JOB_BACKOFF', 30))  # seconds, doubled after each failed attempt
+    IMAGE_JOB_TIMEOUT = int(os.getenv('IMAGE_JOB_TIMEOUT', 300))  # reclaim jobs held longer than this
+    IMAGE_WORKER_POLL_INTERVAL = float(os.getenv('IMAGE_WORKER_POLL_INTERVAL', 2.0))
+    IMAGE_WORKER_EMBEDDED = os.getenv('IMAGE_WORKER_EMBEDDED', 'true').lower() == 'true'  # a worker thread in each gunicorn worker; false when `flask images worker` runs separately
+    
+    # Content-addressed upload storage (see app/storage.py)
+    BLOB_STORE_ROOT = os.getenv('BLOB_STORE_ROOT')  # original uploads, defaults to instance/blobs
+    BLOB_GC_GRACE = int(os.getenv('BLOB_GC_GRACE', 3600))  # seconds an unreferenced blob is kept
+    
+    # Upload asset serving (see app/assets.py)
+    ASSET_SENDFILE = os.getenv('ASSET_SENDFILE')  # None (serve from Python), 'x-accel' (nginx) or 'x-sendfile'
+    ASSET_ACCEL_PREFIX = os.getenv('ASSET_ACCEL_PREFIX', '/_uploads/')  # internal nginx location aliased to UPLOAD_FOLDER
     
     # SQLAlchemy
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine and connection pool (see app/database.py)
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', 4))  # shared with gunicorn.conf.py
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 32))
+    DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 90))  # across all workers, keep below the server's limit
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))  # per worker, 0 derives it from the two above
+    DB_POOL_OVERFLOW = int(os.getenv('DB_POOL_OVERFLOW', 0))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 15000))  # ms, PostgreSQL only, 0 disables
+    DB_SQLITE_BUSY_TIMEOUT = int(os.getenv('DB_SQLITE_BUSY_TIMEOUT', 5000))  # ms to wait for the write lock
+    DB_SQLITE_MMAP_SIZE = int(os.getenv('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes, 0 disables
+    
+    # Read replicas (see app/replicas.py)
+    REPLICA_URLS = os.getenv('REPLICA_URLS')  # comma-separated, unset reads everything from the primary
+    REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 10))  # seconds a replica may be behind and still serve reads
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 5))  # seconds between lag checks per worker
+    REPLICA_HEARTBEAT_INTERVAL = int(os.getenv('REPLICA_HEARTBEAT_INTERVAL', 5))  # seconds, run by the scheduler; keep well below REPLICA_MAX_LAG
+    
     # Flask settings
     DEBUG = os.getenv('FLASK_ENV') == 'development'
     
@@ -35,6 +124,7 @@ class Config:
     
     # Upload size limit
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_FILE_SIZE = int(os.getenv('MAX_UPLOAD_FILE_SIZE', 10 * 1024 * 1024))  # per image, checked while streaming
 
     @classmethod
     def init_app(cls, app):
@@ -1,9 +1,29 @@
 # Gunicorn configuration
-workers = 4
-worker_class = 'sync'
+import os
+
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+# Notification streams (Server-Sent Events) hold a thread each while open, so
+# sync workers would be tied up by a single tab. Keep EVENTS_MAX_STREAMS below
+# `threads` so ordinary requests always find a free thread.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 32))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
 errorlog = '-'
 accesslog = '-'
-loglevel = 'info'
\ No newline at end of file
+loglevel = 'info'
+
+
+def post_worker_init(worker):
+    """Process queued image uploads in this worker (see app/lost_and_found/image_jobs.py)"""
+    app = worker.wsgi
+    if app.config.get('IMAGE_WORKER_EMBEDDED') and not app.config.get('IMAGE_JOBS_INLINE'):
+        from app.lost_and_found.image_jobs import start_worker
+        start_worker(app)
+
+
+def worker_exit(server, worker):
+    """Write out buffered audit records before the worker goes away"""
+    from app import audit_sink
+    audit_sink.shutdown()
@@ -0,0 +1,46 @@
+"""notification retention
+
+Revision ID: 0c5d8e3f7a21
+Revises: f49b7a2c1d86
+Create Date: 2026-10-17 20:26:03.915472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5d8e3f7a21'
+down_revision = 'f49b7a2c1d86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=True),
+    sa.Column('claim_id', sa.Integer(), nullable=True),
+    sa.Column('notification_type', sa.String(length=30), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notifications_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_archive_user_created', ['user_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_read_created', ['is_read', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_read_created')
+
+    with op.batch_alter_table('notifications_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_archive_user_created')
+
+    op.drop_table('notifications_archive')
@@ -0,0 +1,28 @@
+"""replica heartbeats
+
+Revision ID: 3d7f0b6e1c92
+Revises: a5f1c8e2d934
+Create Date: 2026-10-18 01:12:37.504211
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d7f0b6e1c92'
+down_revision = 'a5f1c8e2d934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('replica_heartbeats',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('beat_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('replica_heartbeats')
@@ -0,0 +1,60 @@
+"""items full-text search
+
+Revision ID: 4c2e8f1a9b3d
+Revises: 739b779230af
+Create Date: 2026-10-17 09:12:04.518233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c2e8f1a9b3d'
+down_revision = '739b779230af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "name, description, details, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO items_fts (rowid, name, description, details) "
+            "SELECT i.id, i.name, COALESCE(i.description, ''), "
+            "COALESCE((SELECT group_concat(COALESCE(r.additional_details, '') || ' ' || "
+            "COALESCE(r.specific_spot, '') || ' ' || COALESCE(l.name, ''), ' ') "
+            "FROM reports r LEFT JOIN locations l ON l.id = r.location_id "
+            "WHERE r.item_id = i.id), '') "
+            "FROM items i"
+        )
+
+    elif dialect == 'postgresql':
+        op.add_column('items', sa.Column('search_vector', sa.dialects.postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            "UPDATE items i SET search_vector = "
+            "setweight(to_tsvector('simple', i.name), 'A') || "
+            "setweight(to_tsvector('simple', COALESCE(i.description, '')), 'B') || "
+            "setweight(to_tsvector('simple', COALESCE((SELECT string_agg("
+            "COALESCE(r.additional_details, '') || ' ' || COALESCE(r.specific_spot, '') || ' ' || "
+            "COALESCE(l.name, ''), ' ') "
+            "FROM reports r LEFT JOIN locations l ON l.id = r.location_id "
+            "WHERE r.item_id = i.id), '')), 'C')"
+        )
+        op.create_index('ix_items_search_vector', 'items', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS items_fts")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_items_search_vector', table_name='items')
+        op.drop_column('items', 'search_vector')
@@ -0,0 +1,64 @@
+"""claim expiry
+
+Revision ID: 7e2b9d4c6f58
+Revises: 0c5d8e3f7a21
+Create Date: 2026-10-17 21:47:15.336092
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2b9d4c6f58'
+down_revision = '0c5d8e3f7a21'
+branch_labels = None
+depends_on = None
+
+NOTIFICATION_TYPES = "'item_found', 'claim_request', 'claim_request_anonymous', 'claim_accepted', 'claim_rejected', 'claim_cancelled', 'claim_accepted_confirmation', 'item_returned', 'item_claimed', 'item_recovered'"
+
+
+def upgrade():
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('holder', sa.String(length=255), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    with op.batch_alter_table('claims', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_claims_valid_status', type_='check')
+        batch_op.create_check_constraint(
+            'ck_claims_valid_status',
+            "status IN ('pending', 'accepted', 'rejected', 'cancelled', 'expired')"
+        )
+        batch_op.create_index('ix_claims_status_expires', ['status', 'expires_at'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_notifications_valid_type', type_='check')
+        batch_op.create_check_constraint(
+            'ck_notifications_valid_type',
+            f"notification_type IN ({NOTIFICATION_TYPES}, 'claim_expired')"
+        )
+
+
+def downgrade():
+    op.execute("DELETE FROM notifications WHERE notification_type = 'claim_expired'")
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_notifications_valid_type', type_='check')
+        batch_op.create_check_constraint(
+            'ck_notifications_valid_type',
+            f"notification_type IN ({NOTIFICATION_TYPES})"
+        )
+
+    op.execute("UPDATE claims SET status = 'rejected' WHERE status = 'expired'")
+    with op.batch_alter_table('claims', schema=None) as batch_op:
+        batch_op.drop_index('ix_claims_status_expires')
+        batch_op.drop_constraint('ck_claims_valid_status', type_='check')
+        batch_op.create_check_constraint(
+            'ck_claims_valid_status',
+            "status IN ('pending', 'accepted', 'rejected', 'cancelled')"
+        )
+
+    op.drop_table('scheduler_leases')
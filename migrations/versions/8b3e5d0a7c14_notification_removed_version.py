@@ -0,0 +1,26 @@
+"""notification removed version
+
+Revision ID: 8b3e5d0a7c14
+Revises: 3d7f0b6e1c92
+Create Date: 2026-10-18 09:41:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3e5d0a7c14'
+down_revision = '3d7f0b6e1c92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notifications_removed_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user_stats', schema=None) as batch_op:
+        batch_op.drop_column('notifications_removed_version')
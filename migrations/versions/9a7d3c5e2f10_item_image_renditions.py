@@ -0,0 +1,30 @@
+"""item image renditions
+
+Revision ID: 9a7d3c5e2f10
+Revises: 4c2e8f1a9b3d
+Create Date: 2026-10-17 11:40:27.904316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d3c5e2f10'
+down_revision = '4c2e8f1a9b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumb_url', sa.String(length=2000), nullable=True))
+        batch_op.add_column(sa.Column('card_url', sa.String(length=2000), nullable=True))
+        batch_op.add_column(sa.Column('full_url', sa.String(length=2000), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.drop_column('full_url')
+        batch_op.drop_column('card_url')
+        batch_op.drop_column('thumb_url')
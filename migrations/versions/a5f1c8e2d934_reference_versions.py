@@ -0,0 +1,29 @@
+"""reference versions
+
+Revision ID: a5f1c8e2d934
+Revises: 7e2b9d4c6f58
+Create Date: 2026-10-17 23:05:42.118906
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5f1c8e2d934'
+down_revision = '7e2b9d4c6f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reference_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO reference_versions (name, version) VALUES ('reference', 1)")
+
+
+def downgrade():
+    op.drop_table('reference_versions')
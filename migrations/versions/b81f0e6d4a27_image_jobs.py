@@ -0,0 +1,53 @@
+"""image jobs
+
+Revision ID: b81f0e6d4a27
+Revises: 9a7d3c5e2f10
+Create Date: 2026-10-17 14:05:51.270118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f0e6d4a27'
+down_revision = '9a7d3c5e2f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+        batch_op.create_check_constraint('ck_item_images_valid_status', "status IN ('processing', 'ready', 'failed')")
+
+    op.create_table('image_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('image_id', sa.Integer(), nullable=False),
+    sa.Column('source_path', sa.String(length=2000), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.CheckConstraint("status IN ('queued', 'processing', 'done', 'dead')", name='ck_image_jobs_valid_status'),
+    sa.ForeignKeyConstraint(['image_id'], ['item_images.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_image_jobs_status_run_after', ['status', 'run_after'], unique=False)
+        batch_op.create_index(batch_op.f('ix_image_jobs_image_id'), ['image_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_image_jobs_image_id'))
+        batch_op.drop_index('ix_image_jobs_status_run_after')
+
+    op.drop_table('image_jobs')
+
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.drop_constraint('ck_item_images_valid_status', type_='check')
+        batch_op.drop_column('status')
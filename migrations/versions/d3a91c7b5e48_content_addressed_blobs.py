@@ -0,0 +1,47 @@
+"""content addressed blobs
+
+Revision ID: d3a91c7b5e48
+Revises: b81f0e6d4a27
+Create Date: 2026-10-17 16:22:09.631540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a91c7b5e48'
+down_revision = 'b81f0e6d4a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.create_index('ix_blobs_ref_count_released', ['ref_count', 'released_at'], unique=False)
+
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_item_images_blob_hash'), ['blob_hash'], unique=False)
+        batch_op.create_foreign_key('fk_item_images_blob_hash_blobs', 'blobs', ['blob_hash'], ['hash'])
+
+
+def downgrade():
+    with op.batch_alter_table('item_images', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_item_images_blob_hash_blobs', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_item_images_blob_hash'))
+        batch_op.drop_column('blob_hash')
+
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_blobs_ref_count_released')
+
+    op.drop_table('blobs')
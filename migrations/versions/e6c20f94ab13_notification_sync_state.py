@@ -0,0 +1,45 @@
+"""notification sync state
+
+Revision ID: e6c20f94ab13
+Revises: d3a91c7b5e48
+Create Date: 2026-10-17 18:04:51.207316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c20f94ab13'
+down_revision = 'd3a91c7b5e48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread_notifications', sa.Integer(), nullable=False),
+    sa.Column('notifications_version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_notifications_user_version', ['user_id', 'version'], unique=False)
+
+    # Existing notifications all start at version 0
+    op.execute(
+        "INSERT INTO user_stats (user_id, unread_notifications, notifications_version) "
+        "SELECT user_id, SUM(CASE WHEN is_read THEN 0 ELSE 1 END), 0 "
+        "FROM notifications GROUP BY user_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_version')
+        batch_op.drop_column('version')
+
+    op.drop_table('user_stats')
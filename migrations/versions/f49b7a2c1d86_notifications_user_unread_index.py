@@ -0,0 +1,28 @@
+"""notifications user unread index
+
+Revision ID: f49b7a2c1d86
+Revises: e6c20f94ab13
+Create Date: 2026-10-17 19:12:37.480215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f49b7a2c1d86'
+down_revision = 'e6c20f94ab13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_is_read')
+        batch_op.create_index('ix_notifications_user_unread', ['user_id', 'is_read'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_unread')
+        batch_op.create_index('ix_notifications_is_read', ['is_read'], unique=False)
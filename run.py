@@ -10,6 +10,11 @@ if __name__ == '__main__':
     # Determine if we're in production
     debug = os.getenv('FLASK_ENV') == 'development'
     
+    # Under gunicorn this is done by gunicorn.conf.py
+    if app.config.get('IMAGE_WORKER_EMBEDDED') and not app.config.get('IMAGE_JOBS_INLINE'):
+        from app.lost_and_found.image_jobs import start_worker
+        start_worker(app)
+    
     # For production, use a production WSGI server instead
     # This should be run with: gunicorn run:app
     app.run(port=port, debug=debug, use_reloader=debug, host='0.0.0.0')
\ No newline at end of file
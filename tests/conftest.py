@@ -0,0 +1,107 @@
+# tests/conftest.py
+"""
+Shared fixtures: an app on a throwaway SQLite database (migrated with the real
+migrations), a test client, and helpers to log in and create items.
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from flask_migrate import upgrade
+
+from app import create_app, db, session_store
+from app.lost_and_found.reference import reference_data
+from config import Config
+
+MIGRATIONS = str(Path(__file__).resolve().parent.parent / 'migrations')
+
+
+@pytest.fixture
+def app_config():
+    """Config overrides; override this fixture in a test module"""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    class TestConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'test'
+        WTF_CSRF_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+        SQLALCHEMY_BINDS = {}
+        REPLICA_URLS = None
+        SESSION_BACKEND = 'memory'
+        EVENTS_BROKER = 'local'
+        AUDIT_SYNC = True
+        IMAGE_JOBS_INLINE = True
+        SCHEDULER_ENABLED = False
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        BLOB_STORE_ROOT = str(tmp_path / 'blobs')
+
+    for name, value in app_config.items():
+        setattr(TestConfig, name, value)
+
+    app = create_app(TestConfig)
+    # Process-wide cache; a snapshot of another test's database could share its version
+    reference_data._snapshot = None
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    from app.auth.models import User
+    from app.lost_and_found.models import Category, Location
+
+    with app.app_context():
+        alice = User(google_id='1', email='alice@example.com', name='Alice')
+        bob = User(google_id='2', email='bob@example.com', name='Bob')
+        db.session.add_all([alice, bob, Category(name='Keys'), Location(name='Library')])
+        db.session.commit()
+        return alice.id, bob.id
+
+
+@pytest.fixture
+def login(app, client):
+    """Log `client` in as a user id"""
+    from app.auth.models import User
+
+    def login(user_id):
+        with app.test_request_context():
+            user = db.session.get(User, user_id)
+            session_id = session_store.create({'sub': user.google_id, 'user_id': user.id})
+        client.set_cookie(session_store.cookie_name, session_id)
+    return login
+
+
+@pytest.fixture
+def make_items(app, users):
+    """Create `count` lost items, one minute apart (newest last). Returns their ids."""
+    from app.lost_and_found.models import Item, Report
+
+    def make_items(count, reporter_id=None):
+        reporter_id = reporter_id or users[0]
+        start = datetime.utcnow() - timedelta(hours=1)
+        ids = []
+        with app.app_context():
+            for n in range(count):
+                item = Item(name=f"Item {n}", description='', status='lost', category_id=1,
+                            reporter_id=reporter_id, created_at=start + timedelta(minutes=n))
+                db.session.add(item)
+                db.session.flush()
+                db.session.add(Report(item_id=item.id, reporter_id=reporter_id, report_type='lost',
+                                      contact_info='0555123456', location_id=1))
+                ids.append(item.id)
+            db.session.commit()
+        return ids
+    return make_items
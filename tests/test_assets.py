@@ -0,0 +1,65 @@
+# tests/test_assets.py
+import os
+
+import pytest
+
+from app import blob_store
+from app.assets import IMMUTABLE, asset_url
+
+SHA = 'ab' * 32
+FILENAME = f"{SHA}_card.webp"
+
+
+@pytest.fixture
+def rendition(app):
+    """A stored card rendition; returns its path"""
+    with app.app_context():
+        path = os.path.join(os.path.dirname(blob_store.rendition_stem(SHA)), FILENAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as fh:
+        fh.write(b'RIFF\0\0\0\0WEBPVP8 ')
+    return path
+
+
+def test_rendition_is_served_immutable_with_its_stem_as_etag(app, client, rendition):
+    with app.app_context():
+        assert asset_url(rendition) == f"/assets/{FILENAME}"
+
+    response = client.get(f"/assets/{FILENAME}")
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == IMMUTABLE
+    assert response.headers['ETag'] == f'"{SHA}_card"'
+    assert response.mimetype == 'image/webp'
+    assert response.data.startswith(b'RIFF')
+
+
+def test_matching_if_none_match_is_answered_with_304(client, rendition):
+    response = client.get(f"/assets/{FILENAME}", headers={'If-None-Match': f'"{SHA}_card"'})
+    assert response.status_code == 304
+    assert response.headers['Cache-Control'] == IMMUTABLE
+    assert not response.data
+
+
+def test_x_accel_redirect(app, client, rendition):
+    app.config.update(ASSET_SENDFILE='x-accel', ASSET_ACCEL_PREFIX='/_uploads/')
+    response = client.get(f"/assets/{FILENAME}")
+    relative = os.path.relpath(rendition, blob_store.public_root).replace(os.sep, '/')
+    assert response.headers['X-Accel-Redirect'] == f"/_uploads/{relative}"
+    assert not response.data
+
+
+def test_x_sendfile(app, client, rendition):
+    app.config['ASSET_SENDFILE'] = 'x-sendfile'
+    response = client.get(f"/assets/{FILENAME}")
+    assert response.headers['X-Sendfile'] == rendition
+    assert not response.data
+
+
+@pytest.mark.parametrize('filename', [
+    f"{SHA}_thumb.webp",       # rendition that isn't stored
+    f"{'cd' * 32}_card.webp",  # unknown sha
+    f"{SHA}_card.png",         # not a rendition format
+    '..%2Fapp.db',
+])
+def test_unknown_assets_are_404(client, rendition, filename):
+    assert client.get(f"/assets/{filename}").status_code == 404
@@ -0,0 +1,84 @@
+# tests/test_autocomplete.py
+from collections import namedtuple
+
+import pytest
+
+from app import db
+from app.lost_and_found.autocomplete import LocationIndex, fold
+from app.lost_and_found.models import Location
+
+Place = namedtuple('Place', 'name description')
+
+PLACES = [
+    Place('Bibliothèque centrale', 'Salle de lecture'),
+    Place('المكتبة المركزية', 'قاعة المطالعة'),
+    Place('Amphithéâtre A', 'Près de la bibliothèque'),
+    Place('Cour intérieure', 'Cœur du campus'),
+    Place('Centre de calcul', ''),
+]
+
+
+@pytest.fixture
+def index():
+    return LocationIndex(PLACES)
+
+
+def names(results):
+    return [place.name for place in results]
+
+
+@pytest.mark.parametrize('text, folded', [
+    ('Bibliothèque', 'bibliotheque'),
+    ('ÉCOLE', 'ecole'),
+    ('Cœur', 'coeur'),
+    ('أحمد إبراهيم آمنة', 'احمد ابراهيم امنه'),
+    ('مكتبة', 'مكتبه'),
+    ('مكـــتبة', 'مكتبه'),
+    ('مَكْتَبَة', 'مكتبه'),
+    ('مستشفى', 'مستشفي'),
+])
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+@pytest.mark.parametrize('query', ['bibliotheque', 'BIBLIO', 'bibliothèque cent'])
+def test_french_accents_and_case_are_ignored(index, query):
+    assert names(index.search(query))[0] == 'Bibliothèque centrale'
+
+
+@pytest.mark.parametrize('query', ['المكتبة', 'مكتبة', 'مكتبه', 'مكـتبة', 'المركزيه', 'مكت مرك'])
+def test_arabic_spellings_and_the_article_are_folded(index, query):
+    assert names(index.search(query)) == ['المكتبة المركزية']
+
+
+def test_ligatures_match_their_spelled_out_form(index):
+    assert names(index.search('coeur')) == ['Cour intérieure']
+
+
+def test_ranking_whole_name_then_name_then_description(index):
+    assert names(index.search('bib')) == ['Bibliothèque centrale', 'Amphithéâtre A']
+    # "Centre de calcul" starts with the query; "Bibliothèque centrale" only has a word that does
+    assert names(index.search('cent')) == ['Centre de calcul', 'Bibliothèque centrale']
+
+
+def test_every_word_must_match(index):
+    assert names(index.search('bibliotheque lecture')) == ['Bibliothèque centrale']
+    assert index.search('bibliotheque calcul') == []
+
+
+def test_empty_query_and_limit(index):
+    assert len(index.search('')) == len(PLACES)
+    assert len(index.search('', limit=2)) == 2
+    assert len(index.search('c', limit=1)) == 1
+
+
+def test_locations_endpoint_searches_the_index(app, client, users, login):
+    login(users[0])
+    with app.app_context():
+        db.session.add(Location(name='المكتبة المركزية'))
+        db.session.commit()
+
+    response = client.get('/lost_and_found/locations', query_string={'search': 'مكتبه'})
+    assert [location['name'] for location in response.get_json()] == ['المكتبة المركزية']
+    response = client.get('/lost_and_found/locations', query_string={'search': 'libr'})
+    assert [location['name'] for location in response.get_json()] == ['Library']
@@ -0,0 +1,82 @@
+# tests/test_claim_expiry.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.lost_and_found import claim_expiry
+from app.lost_and_found.claim_expiry import expire_claims
+from app.lost_and_found.models import Claim, Notification
+
+
+@pytest.fixture
+def claims(app, users, make_items):
+    """Bob's claims on Alice's items: three overdue, one overdue but accepted, one not due"""
+    alice, bob = users
+    first, second = make_items(2)
+    past = datetime.utcnow() - timedelta(days=1)
+    future = datetime.utcnow() + timedelta(days=1)
+    specs = {
+        'overdue': [(first, past), (first, past - timedelta(hours=1)), (second, past)],
+        'accepted': [(second, past)],
+        'not_due': [(second, future)],
+    }
+    ids = {}
+    with app.app_context():
+        for kind, rows in specs.items():
+            claims = [
+                Claim(item_id=item_id, claimant_id=bob, reporter_id=alice, expires_at=expires_at,
+                      status='accepted' if kind == 'accepted' else 'pending')
+                for item_id, expires_at in rows
+            ]
+            db.session.add_all(claims)
+            db.session.flush()
+            ids[kind] = [claim.id for claim in claims]
+        db.session.commit()
+    return ids
+
+
+def statuses(app):
+    with app.app_context():
+        return dict(db.session.execute(db.select(Claim.id, Claim.status)).all())
+
+
+def test_overdue_pending_claims_expire_in_batches(app, claims, monkeypatch):
+    batches = []
+    notify_expired = claim_expiry._notify_expired
+    monkeypatch.setattr(claim_expiry, '_notify_expired', lambda rows: batches.append(len(rows)) or notify_expired(rows))
+
+    with app.app_context():
+        assert expire_claims(batch_size=2) == 3
+    assert batches == [2, 1]
+
+    status = statuses(app)
+    assert all(status[claim_id] == 'expired' for claim_id in claims['overdue'])
+    assert status[claims['accepted'][0]] == 'accepted'
+    assert status[claims['not_due'][0]] == 'pending'
+
+
+def test_each_expired_claim_notifies_both_parties_once(app, users, claims):
+    alice, bob = users
+    with app.app_context():
+        expire_claims()
+        expire_claims()
+        rows = db.session.execute(
+            db.select(Notification.user_id, Notification.claim_id)
+            .where(Notification.notification_type == 'claim_expired')
+        ).all()
+    assert sorted(rows) == sorted(
+        [(bob, claim_id) for claim_id in claims['overdue']] + [(alice, claim_id) for claim_id in claims['overdue']]
+    )
+
+
+def test_expire_command_dry_run_changes_nothing(app, claims):
+    runner = app.test_cli_runner()
+    before = statuses(app)
+
+    result = runner.invoke(args=['claims', 'expire', '--dry-run'])
+    assert '3 claim(s) are due to expire.' in result.output
+    assert statuses(app) == before
+
+    result = runner.invoke(args=['claims', 'expire'])
+    assert 'Expired 3 claim(s).' in result.output
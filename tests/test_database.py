@@ -0,0 +1,55 @@
+# tests/test_database.py
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import db
+from app.database import engine_options, pool_size, tune_engine
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_app_database_is_tuned(app):
+    with app.app_context():
+        assert pragma(db.engine, 'journal_mode') == 'wal'
+        assert pragma(db.engine, 'synchronous') == 1  # NORMAL
+
+
+def test_file_database_gets_the_configured_pragmas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    tune_engine(engine, {'DB_SQLITE_BUSY_TIMEOUT': 1234, 'DB_SQLITE_MMAP_SIZE': 4096})
+    assert pragma(engine, 'journal_mode') == 'wal'
+    assert pragma(engine, 'busy_timeout') == 1234
+    assert pragma(engine, 'mmap_size') == 4096
+
+
+def test_memory_database_is_left_alone():
+    engine = create_engine('sqlite://')
+    tune_engine(engine, {'DB_SQLITE_BUSY_TIMEOUT': 1234})
+    assert pragma(engine, 'journal_mode') == 'memory'
+    assert pragma(engine, 'busy_timeout') != 1234
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}) == {'pool_pre_ping': True}
+
+
+@pytest.mark.parametrize('config, expected', [
+    ({}, 22),                                                             # 90 // 4 workers
+    ({'GUNICORN_WORKERS': 2, 'GUNICORN_THREADS': 8}, 8),                  # threads fit the budget
+    ({'GUNICORN_WORKERS': 16, 'DB_MAX_CONNECTIONS': 90}, 5),
+    ({'GUNICORN_WORKERS': 200, 'DB_MAX_CONNECTIONS': 90}, 1),             # never below one
+    ({'GUNICORN_WORKERS': 0, 'GUNICORN_THREADS': 4}, 4),
+    ({'DB_POOL_SIZE': 7, 'GUNICORN_WORKERS': 1}, 7),                      # explicit size wins
+])
+def test_pool_size_stays_within_the_connection_budget(config, expected):
+    assert pool_size(config) == expected
+
+
+def test_engine_options_for_a_server_database():
+    options = engine_options({
+        'SQLALCHEMY_DATABASE_URI': 'postgresql://db/app',
+        'GUNICORN_WORKERS': 3, 'DB_MAX_CONNECTIONS': 30, 'DB_STATEMENT_TIMEOUT': 15000,
+    })
+    assert options['pool_size'] == 10
+    assert options['max_overflow'] == 0
+    assert options['connect_args'] == {'options': '-c statement_timeout=15000'}
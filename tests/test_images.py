@@ -0,0 +1,84 @@
+# tests/test_images.py
+import io
+import os
+import runpy
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app import blob_store, db
+from app.lost_and_found.models import ItemImage
+
+GUNICORN_CONF = str(Path(__file__).resolve().parent.parent / 'gunicorn.conf.py')
+
+
+def png(color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def report(client, *images):
+    return client.post('/lost_and_found/api', data={
+        'report_type': 'lost', 'name': 'Wallet', 'description': 'Brown',
+        'category_id': '1', 'location_id': '1', 'contact_info': '0555123456',
+        'additional_details': '', 'specific_spot': '',
+        'images': [(image, f"photo{n}.png") for n, image in enumerate(images)],
+    }, content_type='multipart/form-data')
+
+
+@pytest.fixture
+def app_config():
+    return {'IMAGE_JOBS_INLINE': False}
+
+
+def test_gunicorn_workers_process_queued_uploads(app, client, users, login):
+    login(users[0])
+    assert report(client, png()).status_code == 302
+    with app.app_context():
+        assert db.session.scalars(db.select(ItemImage.status)).all() == ['processing']
+
+    class Worker:
+        wsgi = app
+
+    runpy.run_path(GUNICORN_CONF)['post_worker_init'](Worker())
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with app.app_context():
+            status = db.session.scalars(db.select(ItemImage.status)).one()
+        if status == 'ready':
+            break
+        time.sleep(0.1)
+    assert status == 'ready'
+
+
+def tmp_files(app):
+    return os.listdir(blob_store.tmp_dir)
+
+
+@pytest.mark.parametrize('content', [b'%PDF-1.7 not an image at all', b'GIF', b''])
+def test_non_image_upload_is_rejected(app, client, users, login, content):
+    login(users[0])
+    response = report(client, io.BytesIO(content))
+    assert response.status_code == 415
+    assert not tmp_files(app)
+    with app.app_context():
+        assert db.session.scalar(db.select(db.func.count()).select_from(ItemImage)) == 0
+
+
+def test_oversized_upload_is_rejected(app, client, users, login):
+    login(users[0])
+    app.config['MAX_UPLOAD_FILE_SIZE'] = 1024
+    big = io.BytesIO(b'\x89PNG\r\n\x1a\n' + b'\0' * 4096)
+    assert report(client, big).status_code == 413
+    assert not tmp_files(app)
+
+
+def test_accepted_upload_leaves_no_tmp_files(app, client, users, login):
+    login(users[0])
+    assert report(client, png()).status_code == 302
+    assert not tmp_files(app)
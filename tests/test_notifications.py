@@ -0,0 +1,80 @@
+# tests/test_notifications.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.lost_and_found.models import Notification, UserStats
+from app.lost_and_found.notification_sync import bump, get_stats
+from app.lost_and_found.notifier import notify
+
+
+def unread_count(client):
+    return client.get('/lost_and_found/api/notifications/count').get_json()['unread_count']
+
+
+def test_bump_creates_the_row_from_stored_notifications(app, users):
+    alice, _ = users
+    with app.app_context():
+        db.session.add(Notification(user_id=alice, notification_type='claim_request', message='hi', is_read=False))
+        db.session.commit()
+        # The flush hook created the row; start over as if it predated the counters
+        db.session.execute(db.delete(UserStats))
+        db.session.commit()
+
+        assert bump(db.session, alice) == 1
+        assert bump(db.session, alice, unread_delta=2) == 2
+        db.session.commit()
+        assert get_stats(alice) == (3, 2)
+
+        assert bump(db.session, alice, unread=0) == 3
+        db.session.commit()
+        assert get_stats(alice) == (0, 3)
+
+
+def test_bump_reraises_when_the_row_cannot_be_created(app, users):
+    alice, _ = users
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE TRIGGER reject_stats BEFORE INSERT ON user_stats "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        ))
+        db.session.commit()
+
+        with pytest.raises(IntegrityError):
+            bump(db.session, alice, unread_delta=1)
+        db.session.rollback()
+
+
+def test_unread_counter_follows_notifications(app, client, users, login):
+    alice, bob = users
+    with app.app_context():
+        notify('claim_request', [alice, alice, bob], claimant='Bob', item='Wallet')
+        notify('claim_cancelled', [alice], item='Keys')
+        db.session.commit()
+        ids = db.session.scalars(db.select(Notification.id).where(Notification.user_id == alice)).all()
+        _, version = get_stats(alice)
+    # Duplicate recipients in one batch are notified once
+    assert len(ids) == 2
+
+    login(alice)
+    assert unread_count(client) == 2
+
+    listing = client.get('/lost_and_found/api/notifications')
+    assert listing.get_json()['sync_token'] == version
+    assert client.get('/lost_and_found/api/notifications',
+                      headers={'If-None-Match': listing.headers['ETag']}).status_code == 304
+
+    response = client.post(f"/lost_and_found/api/notifications/{ids[0]}/read")
+    assert response.get_json()['unread_count'] == 1
+    # Marking it again doesn't count twice
+    response = client.post(f"/lost_and_found/api/notifications/{ids[0]}/read")
+    assert response.get_json()['unread_count'] == 1
+
+    delta = client.get('/lost_and_found/api/notifications', query_string={'since': version}).get_json()
+    assert [n['id'] for n in delta['notifications']] == [ids[0]] and not delta['full']
+
+    assert client.post('/lost_and_found/api/notifications/read_all').status_code == 200
+    assert unread_count(client) == 0
+    with app.app_context():
+        assert get_stats(bob)[0] == 1
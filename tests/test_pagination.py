@@ -0,0 +1,70 @@
+# tests/test_pagination.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.lost_and_found.pagination import decode_cursor, encode_cursor
+
+
+def feed_ids(client, **params):
+    response = client.get('/lost_and_found/api', query_string={'per_page': 2, **params})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    return [item['id'] for item in body['items']], body['next_cursor']
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_malformed_cursor_is_rejected(client, users, login):
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+    login(users[0])
+    assert client.get('/lost_and_found/api', query_string={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+def test_cursor_pages_are_newest_first_and_disjoint(client, users, login, make_items):
+    ids = make_items(5)
+    login(users[0])
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = feed_ids(client, **({'cursor': cursor} if cursor else {}))
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == list(reversed(ids))
+
+
+def test_page_number_matches_cursor_paging(client, users, login, make_items):
+    make_items(5)
+    login(users[0])
+
+    first, cursor = feed_ids(client)
+    by_cursor, _ = feed_ids(client, cursor=cursor)
+    by_page, _ = feed_ids(client, page=2)
+    assert by_page == by_cursor
+    assert not set(by_page) & set(first)
+
+    last_page, next_cursor = feed_ids(client, page=3)
+    assert len(last_page) == 1 and next_cursor is None
+
+
+def test_paging_across_timestamp_formats(app, client, users, login, make_items):
+    # Same second, stored both as a CURRENT_TIMESTAMP default and from Python
+    ids = make_items(4)
+    with app.app_context():
+        for item_id, stored in zip(ids, ['2026-01-01 10:00:00.000000'] * 2 + ['2026-01-01 10:00:00'] * 2):
+            db.session.execute(text("UPDATE items SET created_at = :stored WHERE id = :id"),
+                               {'stored': stored, 'id': item_id})
+        db.session.commit()
+    login(users[0])
+
+    first, cursor = feed_ids(client)
+    second, _ = feed_ids(client, cursor=cursor)
+    assert first + second == list(reversed(ids))
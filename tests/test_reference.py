@@ -0,0 +1,104 @@
+# tests/test_reference.py
+import time
+
+from sqlalchemy import text
+
+from app import db
+from app.lost_and_found import reference
+from app.lost_and_found.models import Category, Location
+from app.lost_and_found.reference import reference_data
+
+
+def location_names(app):
+    with app.app_context():
+        return [location.name for location in reference_data.get().locations]
+
+
+def test_category_and_location_writes_replace_the_snapshot(app, users):
+    with app.app_context():
+        before = reference_data.get()
+        db.session.add(Location(name='Cafeteria'))
+        db.session.get(Category, 1).name = 'House keys'
+        db.session.commit()
+
+        after = reference_data.get()
+    assert after is not before and after.version > before.version
+    assert [l.name for l in after.locations] == ['Cafeteria', 'Library']
+    assert after.category_choices == ((1, 'House keys'),)
+
+
+def test_rolled_back_writes_keep_the_snapshot(app, users):
+    with app.app_context():
+        before = reference_data.get()
+        db.session.add(Location(name='Cafeteria'))
+        db.session.flush()
+        db.session.rollback()
+        assert reference_data.get() is before
+
+
+def test_other_workers_changes_show_up_after_the_check_interval(app, users, monkeypatch):
+    app.config['REFERENCE_CHECK_INTERVAL'] = 60
+    assert location_names(app) == ['Library']
+
+    # Written by another process: no hook runs here, only the stamp moves
+    with app.app_context():
+        db.session.execute(text("INSERT INTO locations (name) VALUES ('Gym')"))
+        db.session.execute(text("UPDATE reference_versions SET version = version + 1"))
+        db.session.commit()
+    assert location_names(app) == ['Library']
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert location_names(app) == ['Gym', 'Library']
+
+
+# ---------- HTTP representation ---------- #
+
+def test_reference_endpoints_use_the_version_as_etag(app, client, users, login):
+    login(users[0])
+    with app.app_context():
+        etag = reference_data.get().etag
+
+    for url in ('/lost_and_found/categories', '/lost_and_found/locations'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{etag}"'
+        assert response.headers['Cache-Control'].startswith('private, max-age=')
+
+        revalidated = client.get(url, headers={'If-None-Match': f'"{etag}"'})
+        assert revalidated.status_code == 304 and not revalidated.data
+        assert revalidated.headers['ETag'] == f'"{etag}"'
+
+
+def test_a_change_invalidates_the_etag(app, client, users, login):
+    login(users[0])
+    first = client.get('/lost_and_found/categories')
+    with app.app_context():
+        db.session.add(Category(name='Phones'))
+        db.session.commit()
+
+    response = client.get('/lost_and_found/categories', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    assert [c['name'] for c in response.get_json()] == ['Keys', 'Phones']
+
+
+def test_serialized_bodies_are_built_once_and_bounded(app, users, monkeypatch):
+    monkeypatch.setattr(reference, 'SERIALIZED_LIMIT', 2)
+    builds = []
+
+    def build(key):
+        def build():
+            builds.append(key)
+            return [key]
+        return build
+
+    with app.test_request_context():
+        snapshot = reference_data.get()
+        assert snapshot.serialized('a', build('a')) == b'["a"]\n'
+        snapshot.serialized('a', build('a'))
+        snapshot.serialized('b', build('b'))
+        snapshot.serialized('c', build('c'))
+        snapshot.serialized('c', build('c'))
+    # 'c' arrived once the cache was full, so it is rebuilt on every call
+    assert builds == ['a', 'b', 'c', 'c']
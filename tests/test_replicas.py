@@ -0,0 +1,124 @@
+# tests/test_replicas.py
+"""Replica routing with two SQLite files standing in for primary and replica"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db, replica_router
+from app.replicas import STICKY_COOKIE
+from config import Config
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {
+        'REPLICA_URLS': f"sqlite:///{tmp_path / 'replica.db'}",
+        'REPLICA_MAX_LAG': 10,
+        'REPLICA_CHECK_INTERVAL': 0,
+    }
+
+
+@pytest.fixture
+def replicate(app, tmp_path):
+    """Copy the primary into the replica file, as replication would"""
+    def replicate():
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        source = sqlite3.connect(tmp_path / 'app.db')
+        target = sqlite3.connect(tmp_path / 'replica.db')
+        source.backup(target)
+        target.close()
+        source.close()
+    return replicate
+
+
+def set_heartbeat(path, beat_at):
+    connection = sqlite3.connect(path)
+    connection.execute("UPDATE replica_heartbeats SET beat_at = ?", (beat_at.strftime('%Y-%m-%d %H:%M:%S.%f'),))
+    connection.commit()
+    connection.close()
+
+
+def feed_names(client):
+    response = client.get('/lost_and_found/api', query_string={'per_page': 50})
+    assert response.status_code == 200
+    return sorted(item['name'] for item in response.get_json()['items'])
+
+
+@pytest.fixture
+def primary_only(app, users, make_items, replicate):
+    """Item 0 is on both databases, Item 1 only on the primary; heartbeats are fresh"""
+    make_items(1)
+    with app.app_context():
+        replica_router.beat()
+    replicate()
+    with app.app_context():
+        from app.lost_and_found.models import Item
+        db.session.add(Item(name='Item 1', description='', status='lost', category_id=1, reporter_id=users[0]))
+        db.session.commit()
+        replica_router.beat()
+
+
+def test_marked_reads_use_a_fresh_replica(app, client, users, login, primary_only):
+    login(users[0])
+    assert feed_names(client) == ['Item 0']
+
+
+def test_stopped_heartbeat_makes_lag_unknown(app, client, users, login, primary_only, tmp_path):
+    stale = datetime.utcnow() - timedelta(seconds=60)
+    set_heartbeat(tmp_path / 'app.db', stale)
+    set_heartbeat(tmp_path / 'replica.db', stale)
+    with app.app_context():
+        assert replica_router.lags(db) == {'replica_0': None}
+    login(users[0])
+    assert feed_names(client) == ['Item 0', 'Item 1']
+
+
+def test_stalled_replica_is_skipped(app, client, users, login, primary_only, tmp_path):
+    set_heartbeat(tmp_path / 'replica.db', datetime.utcnow() - timedelta(seconds=60))
+    with app.app_context():
+        assert replica_router.lags(db)['replica_0'] >= 60
+    login(users[0])
+    assert feed_names(client) == ['Item 0', 'Item 1']
+
+
+def test_replica_is_chosen_once_per_request(app, client, users, login, primary_only, monkeypatch):
+    choices = []
+    choose = replica_router.choose
+
+    def counting_choose(database):
+        engine = choose(database)
+        choices.append(engine)
+        return engine
+
+    monkeypatch.setattr(replica_router, 'choose', counting_choose)
+    login(users[0])
+    assert feed_names(client) == ['Item 0']
+    assert len(choices) == 1
+
+
+def test_write_keeps_client_on_primary(app, client, users, login, primary_only):
+    login(users[0])
+    response = client.post('/lost_and_found/api/notifications/read_all')
+    assert response.status_code == 200
+    assert client.get_cookie(STICKY_COOKIE) is not None
+    assert feed_names(client) == ['Item 0', 'Item 1']
+
+    client.delete_cookie(STICKY_COOKIE)
+    assert feed_names(client) == ['Item 0']
+
+
+@pytest.mark.parametrize('overrides, warned', [
+    ({}, True),
+    ({'SCHEDULER_ENABLED': True}, False),
+    ({'SCHEDULER_EXTERNAL': True}, False),
+    ({'SCHEDULER_ENABLED': True, 'REPLICA_HEARTBEAT_INTERVAL': 0}, True),
+])
+def test_startup_warns_without_a_heartbeat_runner(app, caplog, monkeypatch, overrides, warned):
+    # Alembic's logging config disables existing loggers during the migration
+    monkeypatch.setattr(app.logger, 'disabled', False)
+    config = type('ReplicaConfig', (Config,), {**app.config, 'SCHEDULER_ENABLED': False, **overrides})
+    create_app(config)
+    assert ('nothing writes the replica heartbeat' in caplog.text) == warned
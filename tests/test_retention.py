@@ -0,0 +1,100 @@
+# tests/test_retention.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.lost_and_found import retention
+from app.lost_and_found.models import Notification, NotificationArchive
+from app.lost_and_found.retention import prune_beyond, prune_older_than
+
+
+@pytest.fixture
+def add_notifications(app):
+    """Add notifications aged `days` days (oldest first). Returns their ids."""
+    def add_notifications(user_id, *days, is_read=True):
+        now = datetime.utcnow()
+        with app.app_context():
+            rows = [
+                Notification(user_id=user_id, notification_type='claim_request', message=f"{age} days",
+                             is_read=is_read, created_at=now - timedelta(days=age))
+                for age in days
+            ]
+            db.session.add_all(rows)
+            db.session.commit()
+            return [row.id for row in rows]
+    return add_notifications
+
+
+def remaining(app):
+    with app.app_context():
+        return set(db.session.scalars(db.select(Notification.id)))
+
+
+def test_prune_older_than_keeps_recent_and_unread(app, users, add_notifications):
+    alice, _ = users
+    old = add_notifications(alice, 40, 35, 31)
+    recent = add_notifications(alice, 5)
+    unread = add_notifications(alice, 60, is_read=False)
+
+    with app.app_context():
+        assert prune_older_than(30, batch_size=100) == 3
+    assert remaining(app) == set(recent + unread)
+    assert not set(old) & remaining(app)
+
+
+def test_prune_beyond_keeps_the_newest_per_user(app, users, add_notifications):
+    alice, bob = users
+    alice_ids = add_notifications(alice, 5, 4, 3, 2, 1)
+    bob_ids = add_notifications(bob, 9)
+
+    with app.app_context():
+        assert prune_beyond(2, batch_size=100) == 3
+    assert remaining(app) == set(alice_ids[-2:] + bob_ids)
+
+
+def test_archive_copies_rows_before_deleting(app, users, add_notifications):
+    alice, _ = users
+    ids = add_notifications(alice, 40, 35)
+
+    with app.app_context():
+        prune_older_than(30, batch_size=100, archive=True)
+        archived = db.session.scalars(db.select(NotificationArchive.id)).all()
+    assert sorted(archived) == sorted(ids)
+    assert not remaining(app)
+
+
+def test_rows_are_removed_in_bounded_batches(app, users, add_notifications, monkeypatch):
+    alice, _ = users
+    add_notifications(alice, 50, 49, 48, 47, 46)
+    batches = []
+    remove = retention._remove
+    monkeypatch.setattr(retention, '_remove', lambda ids, archive: batches.append(len(ids)) or remove(ids, archive))
+
+    with app.app_context():
+        assert prune_older_than(30, batch_size=2) == 5
+    assert batches == [2, 2, 1]
+
+
+def test_delta_clients_resync_after_a_prune(app, client, users, login, add_notifications):
+    alice, _ = users
+    old = add_notifications(alice, 40)
+    kept = add_notifications(alice, 1)
+    login(alice)
+    first = client.get('/lost_and_found/api/notifications')
+    token = first.get_json()['sync_token']
+
+    with app.app_context():
+        prune_older_than(30, batch_size=100)
+
+    response = client.get('/lost_and_found/api/notifications', query_string={'since': token},
+                          headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['sync_token'] > token and body['full']
+    assert [n['id'] for n in body['notifications']] == kept
+    assert old[0] not in [n['id'] for n in body['notifications']]
+
+    # Later deltas are incremental again
+    again = client.get('/lost_and_found/api/notifications', query_string={'since': body['sync_token']})
+    assert again.get_json()['notifications'] == [] and not again.get_json()['full']
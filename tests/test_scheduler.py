@@ -0,0 +1,26 @@
+# tests/test_scheduler.py
+from datetime import datetime, timedelta
+
+from app import db, scheduler
+from app.auth.models import SchedulerLease
+
+
+def test_lease_is_held_until_it_expires(app):
+    with app.app_context():
+        assert scheduler.acquire('job', 60)
+        assert not scheduler.acquire('job', 60)
+
+        db.session.execute(db.update(SchedulerLease).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+        assert scheduler.acquire('job', 60)
+
+
+def test_run_pending_runs_each_job_once_per_interval(app):
+    runs = []
+    scheduler.add_job('test_job', 60, lambda: runs.append(1))
+    try:
+        assert 'test_job' in scheduler.run_pending()
+        assert 'test_job' not in scheduler.run_pending()
+        assert runs == [1]
+    finally:
+        scheduler.jobs.pop('test_job')
@@ -0,0 +1,81 @@
+# tests/test_search.py
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.lost_and_found.models import Item, Location, Report
+from app.lost_and_found.search import FTS_TABLE, match_items
+
+
+@pytest.fixture
+def items(app, users):
+    """A brown wallet and a set of keys, both reported at the Library"""
+    alice, _ = users
+    with app.app_context():
+        ids = []
+        for name, description in [('Wallet', 'Brown leather'), ('Keys', 'Three keys on a ring')]:
+            item = Item(name=name, description=description, status='lost', category_id=1, reporter_id=alice)
+            db.session.add(item)
+            db.session.flush()
+            db.session.add(Report(item_id=item.id, reporter_id=alice, report_type='lost',
+                                  contact_info='0555123456', location_id=1, specific_spot='second floor'))
+            ids.append(item.id)
+        db.session.commit()
+        return ids
+
+
+def search(app, search_text):
+    with app.app_context():
+        matches = match_items(search_text)
+        return [row.item_id for row in db.session.execute(db.select(matches.c.item_id).order_by(matches.c.rank))]
+
+
+def test_every_word_matches_as_a_prefix(app, items):
+    wallet, keys = items
+    assert search(app, 'wal') == [wallet]
+    assert search(app, 'brown leath') == [wallet]
+    assert search(app, 'brown ring') == []
+    assert sorted(search(app, 'second flo')) == sorted(items)
+
+
+@pytest.mark.parametrize('query', ['wallet OR', 'wallet or', 'NOT wallet', 'wallet AND brown', 'NEAR wallet'])
+def test_operator_words_are_ignored(app, items, query):
+    assert search(app, query) == [items[0]]
+
+
+def test_punctuation_only_matches_nothing(app, items):
+    assert search(app, '"*') == []
+
+
+def test_item_edits_are_reindexed(app, items):
+    wallet, _ = items
+    with app.app_context():
+        db.session.get(Item, wallet).name = 'Purse'
+        db.session.commit()
+    assert search(app, 'purse') == [wallet]
+    assert search(app, 'wallet') == []
+
+
+def test_location_rename_reindexes_its_items(app, items):
+    with app.app_context():
+        db.session.get(Location, 1).name = 'Bibliotheque'
+        db.session.commit()
+    assert sorted(search(app, 'biblio')) == sorted(items)
+    assert search(app, 'library') == []
+
+
+def test_search_through_the_feed(app, client, users, login, items):
+    login(users[0])
+    response = client.get('/lost_and_found/api', query_string={'search': 'wallet OR'})
+    assert [item['id'] for item in response.get_json()['items']] == [items[0]]
+
+
+def test_reindex_command_rebuilds_the_index(app, items):
+    with app.app_context():
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        db.session.commit()
+    assert search(app, 'wallet') == []
+
+    result = app.test_cli_runner().invoke(args=['search', 'reindex'])
+    assert 'Reindexed 2 item(s).' in result.output
+    assert search(app, 'wallet') == [items[0]]
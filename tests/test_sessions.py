@@ -0,0 +1,133 @@
+# tests/test_sessions.py
+import time
+
+import pytest
+from itsdangerous import Signer
+
+from app import db, session_store, token_cache
+from app.sessions import MemorySessionBackend, RedisSessionBackend, SessionStore, SQLiteSessionBackend
+
+
+class FakeRedis:
+    """The slice of redis-py the backend uses, with expiry by wall clock"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value, expires_at = self.values.get(key, (None, 0))
+        return value if expires_at > time.time() else None
+
+    def setex(self, key, ttl, value):
+        self.values[key] = (value, time.time() + ttl)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionBackend()
+    if request.param == 'sqlite':
+        return SQLiteSessionBackend(str(tmp_path / 'sessions.db'))
+    return RedisSessionBackend(client=FakeRedis())
+
+
+@pytest.fixture
+def store(backend):
+    store = SessionStore()
+    store.signer = Signer('test', salt='session-id')
+    store.backend = backend
+    store.lifetime = 3600
+    store.touch_interval = 300
+    return store
+
+
+def test_backend_round_trip(backend):
+    now = time.time()
+    backend.set('a', {'sub': '1', 'user_id': 1}, now + 60)
+    assert backend.get('a') == ({'sub': '1', 'user_id': 1}, now + 60)
+
+    backend.touch('a', now + 120)
+    assert backend.get('a')[1] == now + 120
+
+    backend.delete('a')
+    assert backend.get('a') is None
+
+
+def test_purge_removes_only_expired(backend):
+    now = time.time()
+    backend.set('old', {}, now + 1)
+    backend.set('new', {}, now + 3600)
+    backend.purge_expired(now + 2)
+    assert backend.get('new') is not None
+    if not isinstance(backend, RedisSessionBackend):  # Redis expires keys itself
+        assert backend.get('old') is None
+
+
+def test_session_slides_at_most_once_per_touch_interval(app, store, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now)
+    with app.test_request_context():
+        cookie = store.create({'sub': '1', 'user_id': 1})
+        assert store.load(cookie)['expires_at'] == now + 3600
+
+    monkeypatch.setattr(time, 'time', lambda: now + 100)
+    with app.test_request_context():
+        assert store.load(cookie)['expires_at'] == now + 3600
+
+    monkeypatch.setattr(time, 'time', lambda: now + 400)
+    with app.test_request_context():
+        assert store.load(cookie)['expires_at'] == now + 400 + 3600
+
+    monkeypatch.setattr(time, 'time', lambda: now + 400 + 3601)
+    with app.test_request_context():
+        assert store.load(cookie) is None
+
+
+def test_destroy_and_tampered_cookies(app, store):
+    with app.test_request_context():
+        cookie = store.create({'sub': '1', 'user_id': 1})
+        assert store.load(cookie[:-1] + ('A' if cookie[-1] != 'A' else 'B')) is None
+        store.destroy(cookie)
+        assert store.load(cookie) is None
+
+
+def test_purge_command(app):
+    with app.test_request_context():
+        session_store.create({'sub': '1', 'user_id': 1})
+        session_store.backend.set('stale', {}, time.time() - 1)
+
+    result = app.test_cli_runner().invoke(args=['sessions', 'purge'])
+    assert result.exit_code == 0
+    assert 'Removed 1 expired session(s).' in result.output
+
+
+def test_session_holds_only_the_user_reference(app, client, users, login):
+    login(users[0])
+    sid = session_store.signer.unsign(client.get_cookie(session_store.cookie_name).value).decode()
+    data, _ = session_store.backend.get(sid)
+    assert data == {'sub': '1', 'user_id': users[0]}
+
+
+@pytest.mark.parametrize('change', ['deactivate', 'delete'])
+def test_missing_or_inactive_user_is_rejected_on_cache_miss(app, client, users, login, change):
+    from app.auth.models import User
+
+    login(users[0])
+    sid = session_store.signer.unsign(client.get_cookie(session_store.cookie_name).value).decode()
+    assert client.get('/profile').status_code == 200
+
+    with app.app_context():
+        user = db.session.get(User, users[0])
+        if change == 'deactivate':
+            user.is_active = False
+        else:
+            db.session.delete(user)
+        db.session.commit()
+    token_cache.clear()
+
+    response = client.get('/profile')
+    assert response.status_code == 302 and '/login' in response.location
+    assert session_store.backend.get(sid) is None
@@ -0,0 +1,51 @@
+# tests/test_storage.py
+import io
+import os
+
+from PIL import Image
+
+from app import blob_store
+from app.lost_and_found.models import Blob, ItemImage, Report
+
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (80, 60), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def report(client, *images):
+    response = client.post('/lost_and_found/api', data={
+        'report_type': 'lost', 'name': 'Wallet', 'description': 'Brown',
+        'category_id': '1', 'location_id': '1', 'contact_info': '0555123456',
+        'additional_details': '', 'specific_spot': '',
+        'images': [(io.BytesIO(data), f"photo{n}.jpg") for n, data in enumerate(images)],
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+
+
+def blobs():
+    return {blob.hash: (blob.ref_count, blob.released_at is not None) for blob in Blob.query.all()}
+
+
+def test_blob_references_follow_uploads_and_deletes(app, client, users, login):
+    login(users[0])
+    red, blue = jpeg('red'), jpeg('blue')
+
+    report(client, red, blue)
+    report(client, red)
+    with app.app_context():
+        counts = sorted(blobs().values())
+        assert counts == [(1, False), (2, False)]
+        # Identical uploads share one stored original
+        assert len({image.blob_hash for image in ItemImage.query.all()}) == 2
+        assert all(os.path.exists(blob_store.path(blob_hash)) for blob_hash in blobs())
+        report_ids = [r.id for r in Report.query.order_by(Report.id).all()]
+
+    assert client.delete(f"/lost_and_found/api?report_id={report_ids[0]}").status_code == 200
+    with app.app_context():
+        assert sorted(blobs().values()) == [(0, True), (1, False)]
+
+    assert client.delete(f"/lost_and_found/api?report_id={report_ids[1]}").status_code == 200
+    with app.app_context():
+        assert sorted(blobs().values()) == [(0, True), (0, True)]
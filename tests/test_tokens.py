@@ -0,0 +1,184 @@
+# tests/test_tokens.py
+import json
+import time
+
+import pytest
+from authlib.jose import JsonWebKey, JsonWebToken
+
+from app import google_keys, oauth, session_store, token_cache
+from app.tokens import InvalidTokenError, TokenCache, TokenExpiredError
+
+CLIENT_ID = 'client-id.apps.googleusercontent.com'
+
+
+def rsa_key(kid):
+    return JsonWebKey.generate_key('RSA', 2048, options={'kid': kid}, is_private=True)
+
+
+@pytest.fixture(scope='module')
+def signing_key():
+    return rsa_key('k1')
+
+
+def write_jwks(path, *keys):
+    path.write_text(json.dumps({'keys': [key.as_dict(is_private=False) for key in keys]}))
+
+
+@pytest.fixture
+def jwks_file(tmp_path, signing_key):
+    path = tmp_path / 'jwks.json'
+    write_jwks(path, signing_key)
+    return path
+
+
+@pytest.fixture
+def app_config(jwks_file):
+    return {'GOOGLE_CLIENT_ID': CLIENT_ID, 'GOOGLE_JWKS_FILE': str(jwks_file)}
+
+
+def id_token(key, **claims):
+    now = int(time.time())
+    payload = {'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': '1',
+               'email': 'alice@example.com', 'iat': now, 'exp': now + 600, **claims}
+    header = {'alg': 'RS256', 'kid': key.as_dict()['kid']}
+    return JsonWebToken(['RS256']).encode(header, payload, key).decode('ascii')
+
+
+# ---------- GoogleKeySet ---------- #
+
+def test_valid_token_is_verified(app, signing_key):
+    assert google_keys.verify(id_token(signing_key))['sub'] == '1'
+
+
+@pytest.mark.parametrize('claims', [
+    {'iss': 'https://evil.example.com'},
+    {'aud': 'someone-else.apps.googleusercontent.com'},
+])
+def test_wrong_issuer_or_audience_is_rejected(app, signing_key, claims):
+    with pytest.raises(InvalidTokenError):
+        google_keys.verify(id_token(signing_key, **claims))
+
+
+def test_expired_token_is_rejected(app, signing_key):
+    with pytest.raises(TokenExpiredError):
+        google_keys.verify(id_token(signing_key, iat=int(time.time()) - 7200, exp=int(time.time()) - 3600))
+
+
+def test_bad_signature_is_rejected(app):
+    forged = rsa_key('k1')
+    with pytest.raises(InvalidTokenError):
+        google_keys.verify(id_token(forged))
+
+
+def test_missing_client_id_fails_closed(app, signing_key):
+    google_keys.audience = None
+    with pytest.raises(InvalidTokenError):
+        google_keys.verify(id_token(signing_key))
+
+
+def test_unknown_kid_triggers_a_refresh(app, signing_key, jwks_file):
+    rotated = rsa_key('k2')
+    token = id_token(rotated)
+    with pytest.raises(InvalidTokenError):
+        google_keys.verify(token)
+
+    # Google publishes the new key; the next miss after the refresh floor reloads
+    write_jwks(jwks_file, signing_key, rotated)
+    google_keys._last_fetch -= 120
+    assert google_keys.verify(token)['sub'] == '1'
+
+
+# ---------- OAuth callback ---------- #
+
+class FakeGoogle:
+    def __init__(self, token):
+        self.token = token
+
+    def authorize_access_token(self):
+        return self.token
+
+
+def test_callback_rejects_a_subject_mismatch(app, client, users, signing_key, monkeypatch):
+    token = {'id_token': id_token(signing_key, sub='1'), 'userinfo': {'sub': '2', 'email': 'bob@example.com'}}
+    monkeypatch.setattr(oauth, 'create_client', lambda name: FakeGoogle(token))
+
+    response = client.get('/callback')
+    assert response.status_code == 302 and '/login' in response.location
+    assert client.get_cookie(session_store.cookie_name) is None
+
+
+def test_callback_creates_a_session(app, client, users, signing_key, monkeypatch):
+    token = {'id_token': id_token(signing_key, sub='1'), 'userinfo': {'sub': '1', 'email': 'alice@example.com'}}
+    monkeypatch.setattr(oauth, 'create_client', lambda name: FakeGoogle(token))
+
+    response = client.get('/callback')
+    assert response.status_code == 302
+    assert client.get_cookie(session_store.cookie_name) is not None
+    assert client.get('/profile').status_code == 200
+
+
+# ---------- TokenCache ---------- #
+
+
+def test_entry_expires_with_ttl_or_credential(monkeypatch):
+    cache = TokenCache()
+    cache.ttl = 60
+    now = time.time()
+    cache.put('long', 'sub-1', {'id': 1}, exp=now + 3600)
+    cache.put('short', 'sub-2', {'id': 2}, exp=now + 10)
+
+    monkeypatch.setattr(time, 'time', lambda: now + 30)
+    assert cache.get('long') == ('sub-1', {'id': 1})
+    assert cache.get('short') is None
+
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('long') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache()
+    cache.max_size = 2
+    exp = time.time() + 3600
+    cache.put('a', 'sub-a', {}, exp)
+    cache.put('b', 'sub-b', {}, exp)
+    cache.get('a')
+    cache.put('c', 'sub-c', {}, exp)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_hits_and_misses_are_counted(app, client, users, login):
+    login(users[0])
+    token_cache.clear()
+    before = token_cache.stats()
+
+    assert client.get('/profile').status_code == 200
+    assert client.get('/profile').status_code == 200
+    stats = token_cache.stats()
+    assert stats['misses'] - before['misses'] == 1
+    assert stats['hits'] - before['hits'] == 1
+
+
+def test_views_do_not_change_the_cached_user(app, client, users, login):
+    login(users[0])
+    token_cache.clear()
+    client.get('/profile')
+    session_id = client.get_cookie(session_store.cookie_name).value
+    cached = dict(token_cache.get(session_id)[1])
+
+    client.get('/profile')
+    assert token_cache.get(session_id)[1] == cached
+    assert 'items_claimed' not in cached
+
+
+def test_logout_invalidates_the_cached_session(app, client, users, login):
+    login(users[0])
+    client.get('/profile')
+    session_id = client.get_cookie(session_store.cookie_name).value
+    assert token_cache.get(session_id) is not None
+
+    client.get('/logout')
+    assert token_cache.get(session_id) is None
+    assert client.get('/profile').status_code == 302
@@ -0,0 +1,53 @@
+# tests/test_transaction_hooks.py
+"""Work queued on a session survives savepoint rollbacks and is dropped with the transaction"""
+from app import audit_sink, db, event_hub
+from app.auth.models import AuditLog
+from app.lost_and_found.models import Category
+from app.lost_and_found.reference import reference_data
+
+
+def audit_count():
+    return db.session.scalar(db.select(db.func.count()).select_from(AuditLog))
+
+
+def test_audit_rows_survive_a_savepoint_rollback(app, users):
+    with app.app_context():
+        audit_sink.record(users[0], 'items', 1, 'create', session=db.session)
+        db.session.begin_nested().rollback()
+        db.session.commit()
+        assert audit_count() == 1
+
+        db.session.add(Category(name='Bags'))
+        db.session.flush()
+        audit_sink.record(users[0], 'items', 2, 'create', session=db.session)
+        db.session.rollback()
+        db.session.commit()
+        assert audit_count() == 1
+
+
+def test_events_survive_a_savepoint_rollback(app, users, monkeypatch):
+    sent = []
+    monkeypatch.setattr(event_hub, 'send', lambda messages: sent.extend(messages or ()))
+    with app.app_context():
+        event_hub.publish(users[0], 'claims', session=db.session)
+        db.session.begin_nested().rollback()
+        db.session.commit()
+        assert [message['event'] for message in sent] == ['claims']
+
+        db.session.add(Category(name='Bags'))
+        db.session.flush()
+        event_hub.publish(users[0], 'claims', session=db.session)
+        db.session.rollback()
+        db.session.commit()
+        assert len(sent) == 1
+
+
+def test_reference_change_survives_a_savepoint_rollback(app, users, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(reference_data, 'invalidate', lambda: invalidated.append(True))
+    with app.app_context():
+        db.session.add(Category(name='Bags'))
+        db.session.flush()
+        db.session.begin_nested().rollback()
+        db.session.commit()
+    assert invalidated == [True]